@@ -5,472 +5,4733 @@ AFL++ 퍼징을 위한 하이브리드 FastMCP 서버
 """
 
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+import hashlib
 import json
+import math
+import re
+import shlex
+import struct
 import time
 import uuid
 import os
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from enum import Enum
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+import argparse
 import asyncio
+import atexit
+import base64
+import bisect
+import functools
+import heapq
 import logging
+import sqlite3
+import sys
+import threading
+import tracemalloc
+import zlib
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = FastMCP("afl-plus-plus-hybrid-server")
+
+# 에이전트가 보고할 수 있는 진행 상황 필드
+PROGRESS_FIELDS = (
+    "execs_done", "execs_per_sec", "paths_total", "paths_found", "crashes", "hangs", "instances",
+    "cmin_total", "cmin_done", "cmin_cached", "cmin_kept",  # 코퍼스 최소화 진행 상황
+    "tmin_pending",  # afl-tmin 대기/실행 중인 크래시 입력 수
+    "tmpfs_written_bytes", "checkpoint_bytes", "tmpfs_used_bytes"  # tmpfs 작업 디렉토리 I/O (tmpfs_mb 세션)
+)
+
+# 서버(사용자)가 정한 뒤에는 에이전트 보고로 바뀌지 않는 종료 상태
+TERMINAL_STATUSES = ("completed", "stopped", "error")
+
+# 세션 배치 정책: spread는 여유 코어가 가장 많은 에이전트, binpack은 요청을 수용하는 가장 꽉 찬 에이전트
+PLACEMENT_POLICIES = ("spread", "binpack")
+DEFAULT_PLACEMENT_POLICY = os.environ.get("AFL_MCP_PLACEMENT", "spread")
+
+class AgentScheduler:
+    """에이전트가 보고한 자원 정보로 세션을 배치할 에이전트를 고릅니다.
+
+    빈 코어 수마다 버킷을 두고, 버킷 안은 (코어당 부하, 실행 중 세션 수, -여유 메모리) 순의 힙으로 관리합니다.
+    자원 보고가 오면 새 항목을 넣고 이전 항목은 버전 번호로 지연 삭제하므로 갱신과 선택 모두 O(log n)입니다
+    (버킷 수는 서로 다른 빈 코어 수의 개수로, 에이전트 수와 무관합니다).
+    """
+
+    def __init__(self, policy: str = DEFAULT_PLACEMENT_POLICY):
+        self.policy = policy if policy in PLACEMENT_POLICIES else "spread"
+        self._entries: Dict[str, tuple] = {}  # agent_id -> (버전, 빈 코어, 정렬 키, 자원 정보)
+        self._buckets: Dict[int, list] = {}  # 빈 코어 수 -> [(정렬 키, 버전, agent_id)] 힙
+        self._levels: List[int] = []  # 항목이 있는 빈 코어 수 (오름차순)
+        self._version = 0
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, agent_id: str, resources: dict):
+        """에이전트의 최신 자원 정보를 반영합니다."""
+        cpu_count = max(1, int(resources.get("cpu_count", 1)))
+        free_cores = max(0, int(resources.get("free_cores", cpu_count)))
+        key = (
+            round(float(resources.get("load_avg", 0.0)) / cpu_count, 3),
+            int(resources.get("sessions", 0)),
+            -int(resources.get("mem_available", 0))
+        )
+        if agent_id in self._entries:
+            self._stale += 1
+        self._version += 1
+        self._entries[agent_id] = (self._version, free_cores, key, dict(resources))
+        if free_cores not in self._buckets:
+            self._buckets[free_cores] = []
+            bisect.insort(self._levels, free_cores)
+        heapq.heappush(self._buckets[free_cores], (key, self._version, agent_id))
+        if self._stale > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def remove(self, agent_id: str):
+        """배치 대상에서 에이전트를 제외합니다."""
+        if self._entries.pop(agent_id, None) is not None:
+            self._stale += 1
+
+    def reserve(self, agent_id: str, cores: int) -> Optional[dict]:
+        """다음 자원 보고가 오기 전까지 방금 배치한 세션만큼 자원을 차감해 두고, 차감한 자원 정보를 반환합니다."""
+        entry = self._entries.get(agent_id)
+        if entry is None:
+            return None
+        resources = dict(entry[3])
+        resources["free_cores"] = max(0, entry[1] - cores)
+        resources["sessions"] = int(resources.get("sessions", 0)) + 1
+        self.update(agent_id, resources)
+        return resources
+
+    def _peek(self, free_cores: int) -> Optional[str]:
+        """버킷에서 유효한 최상위 에이전트를 찾고, 앞에 쌓인 오래된 항목은 버립니다."""
+        heap = self._buckets.get(free_cores)
+        while heap:
+            _, version, agent_id = heap[0]
+            entry = self._entries.get(agent_id)
+            if entry is not None and entry[0] == version:
+                return agent_id
+            heapq.heappop(heap)
+            self._stale -= 1
+        self._buckets.pop(free_cores, None)
+        index = bisect.bisect_left(self._levels, free_cores)
+        if index < len(self._levels) and self._levels[index] == free_cores:
+            del self._levels[index]
+        return None
+
+    def select(self, cores: int = 1, policy: str = None) -> Optional[str]:
+        """정책에 따라 cores개의 코어를 받을 에이전트를 고릅니다.
+
+        요청을 수용할 수 있는 에이전트가 없으면 빈 코어가 가장 많은 에이전트를 반환합니다.
+        """
+        policy = policy or self.policy
+        if policy == "binpack":
+            start = bisect.bisect_left(self._levels, cores)
+            for free_cores in list(self._levels[start:]):
+                agent_id = self._peek(free_cores)
+                if agent_id is not None:
+                    return agent_id
+        for free_cores in reversed(list(self._levels)):
+            agent_id = self._peek(free_cores)
+            if agent_id is not None:
+                return agent_id
+        return None
+
+    def _compact(self):
+        self._buckets = {}
+        for agent_id, (version, free_cores, key, _) in self._entries.items():
+            self._buckets.setdefault(free_cores, []).append((key, version, agent_id))
+        for heap in self._buckets.values():
+            heapq.heapify(heap)
+        self._levels = sorted(self._buckets)
+        self._stale = 0
+
+# 하트비트가 이 시간(초) 동안 오지 않으면 에이전트 연결이 끊긴 것으로 봅니다 (에이전트 하트비트 주기 30초의 3배)
+AGENT_HEARTBEAT_TIMEOUT = float(os.environ.get("AFL_MCP_HEARTBEAT_TIMEOUT", "90"))
+
+# 에이전트가 끊기면 error로 바뀌는 세션 상태
+ACTIVE_STATUSES = ("created", "starting", "minimizing", "running")
+
+# 세션 상태별 이모지
+STATUS_EMOJI = {
+    "created": "🆕",
+    "starting": "🚀",
+    "minimizing": "🗜️",
+    "running": "🔄",
+    "completed": "✅",
+    "stopped": "⏹️",
+    "error": "❌"
+}
+
+# 에이전트가 타겟 바이너리의 AFL++ 표식으로 판별한 실행 방식
+HARNESS_MODES = {
+    "persistent": "🚀 persistent 모드 (__AFL_LOOP)",
+    "deferred": "⏩ 지연 포크서버 (__AFL_INIT)",
+    "forkserver": "🐢 포크서버 (실행마다 fork)",
+    "uninstrumented": "⚠️ 계측 없음 (-Q/-O/-n 모드 필요)",
+    "unknown": "❓ 판별 불가"
+}
+FORKING_HARNESS_MODES = ("deferred", "forkserver")  # persistent 하네스로 바꾸면 보통 10~50배 빨라지는 모드
+
+# 적응형 스케줄 세션에서 에이전트가 보고하는 설정(파워 스케줄 x 변이기)별 통계의 보관 한도
+SCHEDULE_ARM_LIMIT = 16
+SCHEDULE_HISTORY_LIMIT = 20  # 설정마다 보관하는 최근 보상 수
+
+def sanitize_schedule_arms(arms) -> Optional[list]:
+    """에이전트가 보고한 설정별 밴딧 통계를 검증해 저장할 형태로 바꿉니다. 형식이 틀리면 None을 반환합니다."""
+    if not isinstance(arms, list):
+        return None
+    try:
+        return [
+            {
+                "arm": str(arm["arm"])[:64],
+                "args": str(arm.get("args", ""))[:128],
+                "instances": [str(name)[:64] for name in arm.get("instances", [])[:64]],
+                "pulls": int(arm.get("pulls", 0)),
+                "paths": int(arm.get("paths", 0)),
+                "cpu_seconds": float(arm.get("cpu_seconds", 0)),
+                "execs": int(arm.get("execs", 0)),
+                "score": float(arm.get("score", 0)),
+                "history": [float(value) for value in arm.get("history", [])[-SCHEDULE_HISTORY_LIMIT:]]
+            }
+            for arm in arms[:SCHEDULE_ARM_LIMIT]
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+class SessionStatus(str, Enum):
+    """세션 상태입니다. 문자열과 같게 비교/해시되므로 색인 키와 JSON 응답에 그대로 씁니다."""
+
+    CREATED = "created"
+    STARTING = "starting"
+    MINIMIZING = "minimizing"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    STOPPED = "stopped"
+    ERROR = "error"
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+_SESSION_STATUSES = {status.value: status for status in SessionStatus}  # Enum 생성자보다 빠른 값 → 멤버 조회
+
+class AgentStatus(str, Enum):
+    ACTIVE = "active"
+    DISCONNECTED = "disconnected"
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+# 레코드의 시각은 단조 시계 기준 밀리초 정수로 두고, 표시하거나 저장할 때만 벽시계 시각 문자열로 바꿉니다
+_CLOCK_ANCHOR = (time.time(), time.monotonic_ns() // 1_000_000)
+
+def now_ms() -> int:
+    return time.monotonic_ns() // 1_000_000
+
+def timestamp_seconds(ms: int) -> float:
+    """단조 시계 밀리초를 UNIX 시각(초)으로 바꿉니다."""
+    return _CLOCK_ANCHOR[0] + (ms - _CLOCK_ANCHOR[1]) / 1000
+
+@functools.lru_cache(maxsize=4096)  # 목록 도구가 같은 세션 시각을 반복해서 그리므로 문자열을 캐시한다
+def format_timestamp(ms: Optional[int], timespec: str = "seconds") -> Optional[str]:
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(timestamp_seconds(ms)).isoformat(timespec=timespec)
+
+def parse_timestamp(text: Optional[str]) -> Optional[int]:
+    """저장된 ISO-8601 시각을 현재 프로세스의 단조 시계 밀리초로 바꿉니다."""
+    if not text:
+        return None
+    return _CLOCK_ANCHOR[1] + round((datetime.fromisoformat(text).timestamp() - _CLOCK_ANCHOR[0]) * 1000)
+
+def format_bytes(size: float) -> str:
+    """바이트 수를 B/KiB/MiB/GiB 중 알맞은 단위로 표시합니다."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GiB"
+
+_PROGRESS_INDEX = {field: index for index, field in enumerate(PROGRESS_FIELDS)}
+FLOAT_PROGRESS_FIELDS = frozenset({"execs_per_sec"})
+_ZERO_PROGRESS = array("d", [0.0]) * len(PROGRESS_FIELDS)
+_EXECS_DONE, _CRASHES, _EXECS_PER_SEC = (_PROGRESS_INDEX[field] for field in ("execs_done", "crashes", "execs_per_sec"))
+
+def _is_progress_value(value) -> bool:
+    """진행 상황 배열(array('d'))에 넣을 수 있는 유한한 숫자인지 확인합니다 (bool은 제외)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+class SessionProgress(Mapping):
+    """세션 진행 상황입니다.
+
+    PROGRESS_FIELDS 순서의 array('d') 하나에 값을 담아 필드마다 int/float 객체를 두지 않으며,
+    읽을 때 FLOAT_PROGRESS_FIELDS가 아닌 필드는 int로 돌려줍니다. 읽기는 dict와 같은 Mapping입니다.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: dict = None):
+        self.values = array("d", _ZERO_PROGRESS)
+        if values:
+            self.update(values)
+
+    def __getitem__(self, field: str):
+        value = self.values[_PROGRESS_INDEX[field]]
+        return value if field in FLOAT_PROGRESS_FIELDS else int(value)
+
+    def __setitem__(self, field: str, value):
+        self.values[_PROGRESS_INDEX[field]] = float(value)
+
+    def __contains__(self, field) -> bool:
+        return field in _PROGRESS_INDEX
+
+    def __iter__(self):
+        return iter(PROGRESS_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PROGRESS_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"SessionProgress({dict(self)})"
+
+    def update(self, values: dict):
+        """알려진 필드만 반영합니다."""
+        for field, value in values.items():
+            if field in _PROGRESS_INDEX:
+                self[field] = value
+
+@dataclass(slots=True)
+class SessionRecord:
+    """퍼징 세션 레코드입니다. 시각은 now_ms() 값이고, 에이전트/타겟/코퍼스 문자열은 세션끼리 공유하도록 intern합니다."""
+
+    id: str
+    agent_id: str
+    target_binary: str
+    input_dir: str
+    output_dir: str
+    instances: int = 1
+    corpus: str = ""
+    minimize: bool = False
+    reminimize_interval: int = 0
+    tmpfs_mb: int = 0  # 0이 아니면 에이전트가 tmpfs에서 퍼징하고 output_dir로 체크포인트 (MiB 단위 한도)
+    adaptive_schedules: bool = False  # 보조 인스턴스의 파워 스케줄/변이기를 밴딧으로 고름
+    status: SessionStatus = SessionStatus.CREATED
+    created_at: int = field(default_factory=now_ms)
+    updated_at: Optional[int] = None
+    error: Optional[str] = None
+    harness_mode: Optional[str] = None  # 에이전트가 판별한 HARNESS_MODES 중 하나 (시작 전에는 None)
+    schedule_arms: Optional[list] = None  # 적응형 스케줄 세션의 설정별 통계 (sanitize_schedule_arms 형식)
+    progress: SessionProgress = field(default_factory=SessionProgress)
+
+    def __post_init__(self):
+        self.agent_id = sys.intern(self.agent_id)
+        self.target_binary = sys.intern(self.target_binary)
+        self.corpus = sys.intern(self.corpus or "")
+
+    def to_dict(self) -> dict:
+        """저장소에 기록하는 형태(진행 상황 제외, 시각은 ISO-8601)로 바꿉니다."""
+        return {
+            "id": self.id,
+            "agent_id": self.agent_id,
+            "target_binary": self.target_binary,
+            "input_dir": self.input_dir,
+            "output_dir": self.output_dir,
+            "instances": self.instances,
+            "corpus": self.corpus,
+            "minimize": self.minimize,
+            "reminimize_interval": self.reminimize_interval,
+            "tmpfs_mb": self.tmpfs_mb,
+            "adaptive_schedules": self.adaptive_schedules,
+            "status": self.status.value,
+            "created_at": format_timestamp(self.created_at, "milliseconds"),
+            "updated_at": format_timestamp(self.updated_at, "milliseconds"),
+            "error": self.error,
+            "harness_mode": self.harness_mode,
+            "schedule_arms": self.schedule_arms
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionRecord":
+        return cls(
+            id=data["id"],
+            agent_id=data["agent_id"],
+            target_binary=data["target_binary"],
+            input_dir=data["input_dir"],
+            output_dir=data["output_dir"],
+            instances=data.get("instances", 1),
+            corpus=data.get("corpus", ""),
+            minimize=data.get("minimize", False),
+            reminimize_interval=data.get("reminimize_interval", 0),
+            tmpfs_mb=data.get("tmpfs_mb", 0),
+            adaptive_schedules=data.get("adaptive_schedules", False),
+            status=SessionStatus(data["status"]),
+            created_at=parse_timestamp(data.get("created_at")) or now_ms(),
+            updated_at=parse_timestamp(data.get("updated_at")),
+            error=data.get("error"),
+            harness_mode=data.get("harness_mode"),
+            schedule_arms=data.get("schedule_arms"),
+            progress=SessionProgress(data.get("progress"))
+        )
+
+@dataclass(slots=True)
+class AgentRecord:
+    """등록된 로컬 에이전트 레코드입니다."""
+
+    id: str
+    info: dict
+    registered_at: int = field(default_factory=now_ms)
+    last_heartbeat: int = field(default_factory=now_ms)
+    status: AgentStatus = AgentStatus.ACTIVE
+    resources: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "info": self.info,
+            "registered_at": format_timestamp(self.registered_at, "milliseconds"),
+            "last_heartbeat": format_timestamp(self.last_heartbeat, "milliseconds"),
+            "status": self.status.value,
+            "resources": self.resources
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AgentRecord":
+        return cls(
+            id=data["id"],
+            info=data.get("info", {}),
+            registered_at=parse_timestamp(data.get("registered_at")) or now_ms(),
+            last_heartbeat=parse_timestamp(data.get("last_heartbeat")) or now_ms(),
+            status=AgentStatus(data.get("status", "active")),
+            resources=data.get("resources", {})
+        )
+
+class TimingWheel:
+    """만료 시각을 관리하는 해시 타이밍 휠입니다.
+
+    키마다 만료 틱이 속한 슬롯 하나에만 들어 있으므로 예약/갱신/취소는 O(1)이고,
+    예약 전에 휠을 현재 틱까지 돌려 두고 슬롯 수 × 틱 길이를 최대 지연보다 길게 잡으므로
+    방문한 슬롯의 키는 모두 만료된 것입니다. 따라서 휠 회전 비용은 지나간 틱 수(최대 슬롯 수)와
+    만료된 키 수에만 비례합니다.
+    """
+
+    def __init__(self, max_delay: float, tick: float = 1.0, clock=time.monotonic):
+        self.tick = tick
+        self._clock = clock
+        self._max_ticks = max(1, int(-(-max_delay // tick)))
+        self._slots: List[set] = [set() for _ in range(self._max_ticks + 1)]
+        self._deadlines: Dict[str, int] = {}  # 키 -> 만료 틱
+        self._current = self._now_tick()  # 마지막으로 처리한 틱
+        self._due: List[str] = []  # 돌리는 중 만료됐지만 아직 advance()로 넘기지 않은 키
+
+    def _now_tick(self) -> int:
+        return int(self._clock() / self.tick)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key: str, delay: float):
+        """key가 delay초 뒤에 만료되도록 예약합니다. 이미 예약돼 있으면 만료 시각을 옮깁니다."""
+        self.cancel(key)
+        self._rotate()
+        deadline = self._current + min(self._max_ticks, max(1, int(-(-delay // self.tick))))
+        self._deadlines[key] = deadline
+        self._slots[deadline % len(self._slots)].add(key)
+
+    def cancel(self, key: str):
+        deadline = self._deadlines.pop(key, None)
+        if deadline is not None:
+            self._slots[deadline % len(self._slots)].discard(key)
+
+    def _rotate(self):
+        now = self._now_tick()
+        for tick in range(max(self._current + 1, now - len(self._slots) + 1), now + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            for key in slot:
+                del self._deadlines[key]
+            self._due.extend(slot)
+            slot.clear()
+        self._current = max(self._current, now)
+
+    def advance(self) -> List[str]:
+        """현재 시각까지 휠을 돌리고 만료된 키 목록을 반환합니다."""
+        self._rotate()
+        # 돌린 뒤 다시 예약된 키(만료 직후 하트비트가 온 경우)는 만료로 보지 않는다
+        expired = [key for key in self._due if key not in self._deadlines]
+        self._due = []
+        return expired
+
+# 진행 상황 이력 해상도: (이름, 버킷 길이(초), 버킷 수) -> 1시간, 1일, 7일
+HISTORY_RESOLUTIONS = (("1s", 1, 3600), ("1m", 60, 1440), ("15m", 900, 672))
+# 이력에 기록하는 지표 (첫 번째 지표는 버킷 내 평균, 나머지 누적 카운터는 버킷의 마지막 값)
+HISTORY_METRICS = ("execs_per_sec", "execs_done", "paths_total", "paths_found", "crashes", "hangs")
+_HISTORY_SAMPLE = itemgetter(*(_PROGRESS_INDEX[metric] for metric in HISTORY_METRICS))  # 진행 배열 → 이력 샘플
+
+class _HistoryLevel:
+    """한 해상도의 링 버퍼입니다. 지표별 array('f') 하나씩만 쓰고, 비어 있는 버킷은 NaN입니다."""
+
+    __slots__ = ("step", "size", "values", "last_bucket", "count")
+
+    def __init__(self, step: int, size: int):
+        self.step = step
+        self.size = size
+        self.values = [array("f", [math.nan]) * size for _ in HISTORY_METRICS]
+        self.last_bucket = -1
+        self.count = 0  # 현재 버킷에 들어온 표본 수
+
+    def to_dict(self) -> dict:
+        return {
+            "last_bucket": self.last_bucket,
+            "count": self.count,
+            "values": [base64.b64encode(values.tobytes()).decode() for values in self.values]
+        }
+
+    def load(self, data: dict):
+        self.last_bucket = data["last_bucket"]
+        self.count = data["count"]
+        for values, encoded in zip(self.values, data["values"]):
+            values.frombytes(base64.b64decode(encoded))
+            del values[:-self.size]
+
+    def record(self, now: float, sample: tuple):
+        bucket = int(now // self.step)
+        if bucket < self.last_bucket:
+            return
+        if bucket != self.last_bucket:
+            # 건너뛴 버킷은 이전 회차 값이 남지 않도록 비운다 (최대 한 바퀴)
+            if self.last_bucket >= 0:
+                for skipped in range(self.last_bucket + 1, min(bucket, self.last_bucket + 1 + self.size)):
+                    for values in self.values:
+                        values[skipped % self.size] = math.nan
+            self.last_bucket = bucket
+            self.count = 0
+        index = bucket % self.size
+        self.count += 1
+        rate = self.values[0]
+        rate[index] = sample[0] if self.count == 1 else rate[index] + (sample[0] - rate[index]) / self.count
+        for values, value in zip(self.values[1:], sample[1:]):
+            values[index] = value
+
+    def window(self, start: float, end: float, metrics: List[int]) -> dict:
+        first = max(int(start // self.step), self.last_bucket - self.size + 1, 0)
+        last = min(int(end // self.step), self.last_bucket)
+        timestamps = []
+        series = [[] for _ in metrics]
+        for bucket in range(first, last + 1):
+            index = bucket % self.size
+            if math.isnan(self.values[0][index]):
+                continue
+            timestamps.append(bucket * self.step)
+            for out, metric in zip(series, metrics):
+                out.append(round(self.values[metric][index], 2))
+        return {"timestamps": timestamps, "series": series}
+
+class ProgressHistory:
+    """세션 진행 상황을 여러 해상도(1초/1분/15분)의 고정 크기 링 버퍼에 기록합니다.
+
+    표본마다 모든 해상도에 바로 기록하고, 해상도별 버킷 안에서 다운샘플링합니다.
+    세션당 메모리는 해상도별 버킷 수 × 지표 수 × 4바이트로 고정입니다.
+    """
+
+    __slots__ = ("levels",)
+
+    def __init__(self):
+        self.levels = {name: _HistoryLevel(step, size) for name, step, size in HISTORY_RESOLUTIONS}
+
+    def record(self, now: float, progress: SessionProgress):
+        sample = _HISTORY_SAMPLE(progress.values)
+        for level in self.levels.values():
+            level.record(now, sample)
+
+    def window(self, seconds: float, resolution: str = "auto", metrics=HISTORY_METRICS, now: float = None) -> dict:
+        """최근 seconds초 구간의 이력을 반환합니다. auto면 구간을 담을 수 있는 가장 고운 해상도를 고릅니다."""
+        now = time.time() if now is None else now
+        if resolution == "auto":
+            resolution = next(
+                (name for name, step, size in HISTORY_RESOLUTIONS if step * size >= seconds),
+                HISTORY_RESOLUTIONS[-1][0]
+            )
+        level = self.levels[resolution]
+        data = level.window(now - seconds, now, [HISTORY_METRICS.index(m) for m in metrics])
+        return {
+            "resolution": resolution,
+            "step": level.step,
+            "timestamps": data["timestamps"],
+            "metrics": dict(zip(metrics, data["series"]))
+        }
+
+    def to_dict(self) -> dict:
+        """보관 파일에 쓰는 형태입니다. 링 버퍼는 base64로 인코딩한 float32 배열입니다."""
+        return {name: level.to_dict() for name, level in self.levels.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProgressHistory":
+        history = cls()
+        for name, level in history.levels.items():
+            if name in data:
+                level.load(data[name])
+        return history
+
+HISTORY_BYTES = sum(size for _, _, size in HISTORY_RESOLUTIONS) * len(HISTORY_METRICS) * 4  # 세션 하나의 이력 배열 크기
+
+# 끝난 세션 보관 설정 (0이면 그 한도는 쓰지 않음)
+SESSION_ARCHIVE_DIR = os.environ.get("AFL_MCP_ARCHIVE_DIR", "session_archive")  # 빈 값이면 보관하지 않고 메모리에 둠
+ARCHIVE_CACHE_SIZE = int(os.environ.get("AFL_MCP_ARCHIVE_CACHE", "32"))  # 디스크에서 읽은 세션을 메모리에 두는 수
+RETAIN_SESSIONS = int(os.environ.get("AFL_MCP_RETAIN_SESSIONS", "1000"))  # 메모리에 두는 끝난 세션 최대 수
+RETAIN_SECONDS = float(os.environ.get("AFL_MCP_RETAIN_SECONDS", "86400"))  # 끝난 뒤 메모리에 두는 최대 시간
+RETAIN_MEMORY_MB = float(os.environ.get("AFL_MCP_RETAIN_MEMORY_MB", "256"))  # 끝난 세션이 쓰는 추정 메모리 한도
+RETENTION_BATCH = 64  # 한 번에 보관하는 최대 세션 수 (나머지는 다음 호출에서)
+SESSION_RECORD_BYTES = 1024  # 레코드, 색인, 카운터 항목의 추정 크기 (benchmarks/bench_memory.py 참고)
+CRASH_BUCKET_BYTES = 1024  # 크래시 버킷 하나의 추정 크기
+_ARCHIVE_ID_RE = re.compile(r"[\w-]+")
+
+@dataclass(slots=True)
+class ArchivedSession:
+    """디스크에 보관된 끝난 세션입니다."""
+
+    record: SessionRecord
+    history: Optional[ProgressHistory]
+    crash_buckets: Dict[str, dict]
+    classified_crashes: int  # 분류된 크래시 입력 수
+    archived_at: str
+
+class SessionArchive:
+    """끝난 세션을 세션마다 zlib으로 압축한 JSON 파일 하나로 보관합니다.
+
+    레코드, 진행 상황, 이력 링 버퍼, 크래시 버킷을 함께 담으며, 읽은 세션은 cache_size개짜리 LRU 캐시에 둡니다.
+    """
+
+    def __init__(self, root: str = SESSION_ARCHIVE_DIR, cache_size: int = ARCHIVE_CACHE_SIZE):
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, ArchivedSession]" = OrderedDict()
+        self._count: Optional[int] = None  # 보관된 세션 수 (처음 물어볼 때 디렉토리를 센다)
+        self._lock = threading.Lock()
+
+    def path(self, session_id: str) -> str:
+        return os.path.join(self.root, session_id[:2], f"{session_id}.json.z")
+
+    def count(self) -> int:
+        with self._lock:
+            if self._count is None:
+                try:
+                    shards = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+                except OSError:
+                    shards = []
+                self._count = sum(1 for shard in shards for entry in os.scandir(shard) if entry.name.endswith(".json.z"))
+            return self._count
+
+    def put(self, archived: ArchivedSession) -> int:
+        """세션을 기록하고 압축된 크기를 반환합니다."""
+        session_id = archived.record.id
+        data = archived.record.to_dict()
+        data["progress"] = dict(archived.record.progress)
+        payload = zlib.compress(json.dumps({
+            "session": data,
+            "history": archived.history.to_dict() if archived.history is not None else None,
+            "crash_buckets": archived.crash_buckets,
+            "classified_crashes": archived.classified_crashes,
+            "archived_at": archived.archived_at
+        }, ensure_ascii=False).encode())
+        path = self.path(session_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        existed = os.path.exists(path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._cache.pop(session_id, None)
+            if self._count is not None and not existed:
+                self._count += 1
+        return len(payload)
+
+    def get(self, session_id: str) -> Optional[ArchivedSession]:
+        if not _ARCHIVE_ID_RE.fullmatch(session_id):
+            return None
+        with self._lock:
+            archived = self._cache.get(session_id)
+            if archived is not None:
+                self._cache.move_to_end(session_id)
+                return archived
+        try:
+            with open(self.path(session_id), "rb") as f:
+                data = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        archived = ArchivedSession(
+            record=SessionRecord.from_dict(data["session"]),
+            history=ProgressHistory.from_dict(data["history"]) if data.get("history") else None,
+            crash_buckets=data.get("crash_buckets", {}),
+            classified_crashes=data.get("classified_crashes", 0),
+            archived_at=data.get("archived_at", "")
+        )
+        with self._lock:
+            self._cache[session_id] = archived
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return archived
+
+    def delete(self, session_id: str) -> bool:
+        if not _ARCHIVE_ID_RE.fullmatch(session_id):
+            return False
+        with self._lock:
+            self._cache.pop(session_id, None)
+        try:
+            os.remove(self.path(session_id))
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._count is not None:
+                self._count -= 1
+        return True
+
+class RetentionPolicy:
+    """메모리에 남길 끝난 세션의 수, 나이, 추정 메모리 한도입니다.
+
+    끝난 세션을 끝난 순서대로 들고 있다가, 한도를 넘은 만큼 가장 먼저 끝난 세션부터 보관할 대상으로 고릅니다.
+    """
+
+    def __init__(self, max_sessions: int = RETAIN_SESSIONS, max_age: float = RETAIN_SECONDS,
+                 max_bytes: int = int(RETAIN_MEMORY_MB * 1024 * 1024)):
+        self.max_sessions = max_sessions
+        self.max_age_ms = int(max_age * 1000)
+        self.max_bytes = max_bytes
+        self.finished: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()  # session_id -> (끝난 시각, 추정 바이트)
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.finished)
+
+    def add(self, session_id: str, finished_at: int, size: int):
+        self.discard(session_id)
+        self.finished[session_id] = (finished_at, size)
+        self.bytes += size
+
+    def discard(self, session_id: str):
+        entry = self.finished.pop(session_id, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def due(self, now: int, limit: int = RETENTION_BATCH) -> List[str]:
+        """한도를 넘긴 세션 ID를 오래된 순서로 최대 limit개 반환합니다 (목록에서 빼지는 않습니다)."""
+        due = []
+        count, total = len(self.finished), self.bytes
+        for session_id, (finished_at, size) in self.finished.items():
+            if len(due) >= limit:
+                break
+            if not ((self.max_sessions and count > self.max_sessions)
+                    or (self.max_bytes and total > self.max_bytes)
+                    or (self.max_age_ms and now - finished_at > self.max_age_ms)):
+                break
+            due.append(session_id)
+            count -= 1
+            total -= size
+        return due
+
+# 크래시 입력 저장 위치와 버킷 설정
+CRASH_STORE_DIR = os.environ.get("AFL_MCP_CRASH_DIR", "crash_store")
+CRASH_BUCKET_FRAMES = 5  # 버킷을 가르는 상위 스택 프레임 수
+CRASH_SAMPLES_PER_BUCKET = 3  # 버킷마다 서버로 받아 두는 크래시 입력 수
+MAX_CRASH_INPUT_SIZE = 10 * 1024 * 1024
+
+# 버그 위치가 아니라 새니타이저/런타임/abort 경로에 해당하는 프레임
+_IGNORED_FRAME_PREFIXES = (
+    "__asan", "__ubsan", "__sanitizer", "__interceptor", "__lsan", "__msan", "asan_", "ubsan_",
+    "__libc_start", "_start", "__GI_", "abort", "raise", "gsignal", "__assert", "__pthread_kill"
+)
+
+def _normalize_frame(frame: str) -> str:
+    """함수 이름에서 인자 목록, 템플릿 인자, 오프셋, 주소처럼 빌드마다 달라지는 부분을 지웁니다."""
+    name = frame.strip()
+    name = re.sub(r"\(.*\)$", "", name)
+    name = re.sub(r"<.*>", "<>", name)
+    name = re.sub(r"\+0x[0-9a-fA-F]+", "", name)
+    name = re.sub(r"\.(?:constprop|isra|part|cold)\.\d+", "", name)
+    if name.startswith("0x"):
+        return "??"
+    return name
+
+def crash_bucket_id(kind: str, frames: List[str]) -> Tuple[str, List[str]]:
+    """크래시 종류와 정규화한 상위 N개 프레임으로 퍼지 버킷 ID를 만듭니다.
+
+    주소, 라인 번호, 인자 목록, 새니타이저 내부 프레임은 버킷 계산에서 제외하므로
+    같은 버그가 다른 입력이나 빌드에서 조금씩 다른 스택을 남겨도 같은 버킷으로 모입니다.
+    """
+    top = []
+    for frame in frames:
+        name = _normalize_frame(frame)
+        if not name or name == "??" or name.startswith(_IGNORED_FRAME_PREFIXES):
+            continue
+        top.append(name)
+        if len(top) == CRASH_BUCKET_FRAMES:
+            break
+    key = (kind or "unknown") + "|" + "|".join(top)
+    return hashlib.sha1(key.encode()).hexdigest()[:16], top
+
+class ContentStore:
+    """SHA-256으로 주소를 매기는 입력 파일 저장소입니다. 같은 입력은 한 번만 저장됩니다."""
+
+    def __init__(self, root: str = CRASH_STORE_DIR):
+        self.root = root
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def has(self, sha256: str) -> bool:
+        return os.path.exists(self.path(sha256))
+
+    def get(self, sha256: str) -> bytes:
+        with open(self.path(sha256), "rb") as f:
+            return f.read()
+
+    def list(self) -> List[Tuple[str, int]]:
+        """저장된 항목의 (SHA-256, 크기)를 저장된 순서(mtime)대로 반환합니다."""
+        entries = []
+        try:
+            shards = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return entries
+        for shard in shards:
+            for entry in os.scandir(shard):
+                if len(entry.name) == 64:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        entries.sort()
+        return [(sha256, size) for _, sha256, size in entries]
+
+    def put(self, data: bytes) -> str:
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return sha256
+
+# 에이전트 간 코퍼스 동기화 설정
+CORPUS_STORE_DIR = os.environ.get("AFL_MCP_CORPUS_DIR", "corpus_store")
+MAX_CORPUS_ENTRY_SIZE = 1024 * 1024  # AFL++ 기본 최대 입력 크기
+MAX_CORPUS_BATCH_SIZE = 8 * 1024 * 1024  # 압축을 푼 업로드/다운로드 배치 한 번의 최대 크기
+
+def default_corpus_key(target_binary: str) -> str:
+    """타겟 명령줄의 실행 파일 이름을 코퍼스 공유 그룹 이름으로 사용합니다."""
+    args = shlex.split(target_binary)
+    return os.path.basename(args[0]) if args else ""
+
+def pack_corpus_batch(blobs: List[bytes]) -> bytes:
+    """코퍼스 항목들을 (4바이트 길이 + 내용) 프레임으로 이어 붙여 zlib으로 압축합니다."""
+    return zlib.compress(b"".join(struct.pack(">I", len(blob)) + blob for blob in blobs))
+
+def unpack_corpus_batch(data: bytes, max_size: int = MAX_CORPUS_BATCH_SIZE) -> List[bytes]:
+    """pack_corpus_batch로 만든 배치를 풉니다. 압축을 푼 크기가 max_size를 넘으면 ValueError를 냅니다."""
+    decompressor = zlib.decompressobj()
+    raw = decompressor.decompress(data, max_size)
+    if decompressor.unconsumed_tail:
+        raise ValueError("corpus batch too large")
+    blobs, offset = [], 0
+    while offset < len(raw):
+        (size,) = struct.unpack_from(">I", raw, offset)
+        offset += 4
+        if offset + size > len(raw):
+            raise ValueError("truncated corpus batch")
+        blobs.append(raw[offset:offset + size])
+        offset += size
+    return blobs
+
+class CorpusIndex:
+    """코퍼스 공유 그룹 하나의 전역 색인입니다.
+
+    항목은 추가된 순서대로 로그에 쌓이고, 에이전트는 로그 위치(커서) 이후의 항목만 받아 가므로
+    전송량은 코퍼스 전체 크기가 아니라 새로 발견된 커버리지에 비례합니다.
+    epoch는 서버가 색인을 다시 만들 때마다 바뀌며, 에이전트는 epoch가 바뀌면 커서를 처음으로 되돌립니다.
+    """
+
+    __slots__ = ("store", "epoch", "hashes", "log", "sizes", "origins")
+
+    def __init__(self, store: ContentStore):
+        self.store = store
+        self.epoch = uuid.uuid4().hex[:8]
+        # 재시작 전에 받은 항목은 저장된 순서대로 복원한다
+        entries = store.list()
+        self.log = [sha256 for sha256, _ in entries]
+        self.sizes = array("L", (size for _, size in entries))
+        self.origins: List[Optional[str]] = [None] * len(self.log)  # 항목을 올린 session_id
+        self.hashes = set(self.log)
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    def missing(self, hashes: List[str]) -> List[str]:
+        return [sha256 for sha256 in hashes if sha256 not in self.hashes]
+
+    def add(self, sha256: str, size: int, session_id: str) -> bool:
+        """저장소에 이미 쓰인 항목을 로그에 추가합니다. 이미 있는 항목이면 False를 반환합니다."""
+        if sha256 in self.hashes:
+            return False
+        self.hashes.add(sha256)
+        self.log.append(sha256)
+        self.sizes.append(size)
+        self.origins.append(session_id)
+        return True
+
+    def since(self, cursor: int, session_id: str, known: set, max_bytes: int) -> Tuple[List[str], int]:
+        """커서 이후 항목 중 세션이 아직 갖고 있지 않은 것을 max_bytes 안에서 고르고 다음 커서를 반환합니다."""
+        selected, total = [], 0
+        while cursor < len(self.log):
+            sha256 = self.log[cursor]
+            if self.origins[cursor] != session_id and sha256 not in known:
+                size = self.sizes[cursor]
+                if selected and total + size > max_bytes:
+                    break
+                selected.append(sha256)
+                total += size
+            cursor += 1
+        return selected, cursor
+
+# 상태 저장소 경로 (빈 문자열이면 영속화하지 않음)
+STATE_DB_PATH = os.environ.get("AFL_MCP_STATE_DB", "afl_mcp_state.db")
+
+class SessionStore(ABC):
+    """에이전트/세션 상태를 영속화하는 저장소 인터페이스입니다.
+
+    save_*/delete_* 메서드는 도구 호출 경로에서 불리므로 즉시 반환해야 하며,
+    실제 기록은 구현체가 백그라운드에서 모아서 처리합니다.
+    """
+
+    @abstractmethod
+    def save_agent(self, agent: dict):
+        """에이전트 레코드(AgentRecord.to_dict())를 저장합니다."""
+
+    @abstractmethod
+    def delete_agent(self, agent_id: str):
+        """에이전트 레코드를 지웁니다."""
+
+    @abstractmethod
+    def save_session(self, session: dict):
+        """진행 상황을 뺀 세션 레코드(SessionRecord.to_dict())를 저장합니다."""
+
+    @abstractmethod
+    def save_progress(self, session_id: str, progress: dict):
+        """세션 진행 상황만 저장합니다."""
+
+    @abstractmethod
+    def delete_session(self, session_id: str):
+        """세션 레코드와 진행 상황을 지웁니다."""
+
+    @abstractmethod
+    def load(self) -> Tuple[List[dict], List[dict]]:
+        """저장된 (에이전트 목록, 진행 상황이 포함된 세션 목록)을 반환합니다."""
+
+    def flush(self):
+        """대기 중인 기록을 모두 디스크에 반영합니다."""
+
+    def close(self):
+        self.flush()
+
+class SQLiteSessionStore(SessionStore):
+    """WAL 모드 SQLite 저장소입니다.
+
+    변경 사항은 (테이블, 키)별로 마지막 값만 남기고 모아 두었다가 기록 스레드가
+    batch_interval마다 한 트랜잭션으로 커밋합니다(그룹 커밋). 같은 세션의 진행 상황이
+    여러 번 바뀌어도 배치당 한 번만 기록됩니다.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS agents (
+        agent_id TEXT PRIMARY KEY,
+        status TEXT,
+        last_heartbeat TEXT,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        agent_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        target_binary TEXT,
+        created_at TEXT,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS progress (
+        session_id TEXT PRIMARY KEY,
+        updated_at REAL NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_agent ON sessions(agent_id);
+    CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+    CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at);
+    """
+
+    def __init__(self, path: str, batch_interval: float = 0.5):
+        self.path = path
+        self.batch_interval = batch_interval
+        self._pending: Dict[tuple, Optional[tuple]] = {}  # (테이블, 키) -> 기록할 행 (None이면 삭제)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._writer = threading.Thread(target=self._run_writer, name="state-store-writer", daemon=True)
+        self._writer.start()
+
+    def _enqueue(self, table: str, key: str, row: Optional[tuple]):
+        with self._lock:
+            self._pending[(table, key)] = row
+
+    def save_agent(self, agent: dict):
+        self._enqueue("agents", agent["id"], (agent["status"], agent["last_heartbeat"], dict(agent)))
+
+    def delete_agent(self, agent_id: str):
+        self._enqueue("agents", agent_id, None)
+
+    def save_session(self, session: dict):
+        data = {k: v for k, v in session.items() if k != "progress"}
+        self._enqueue("sessions", session["id"], (session["agent_id"], session["status"], session["target_binary"], session["created_at"], data))
+
+    def save_progress(self, session_id: str, progress: dict):
+        self._enqueue("progress", session_id, (time.time(), dict(progress)))
+
+    def delete_session(self, session_id: str):
+        self._enqueue("sessions", session_id, None)
+        self._enqueue("progress", session_id, None)
+
+    def _run_writer(self):
+        while not self._closed:
+            self._wakeup.wait(self.batch_interval)
+            self._wakeup.clear()
+            try:
+                self._write_batch()
+            except Exception as e:
+                logger.error(f"상태 저장 실패: {e}")
+
+    def _write_batch(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        upserts = {"agents": [], "sessions": [], "progress": []}
+        deletes = {"agents": [], "sessions": [], "progress": []}
+        for (table, key), row in batch.items():
+            if row is None:
+                deletes[table].append((key,))
+            else:
+                *columns, data = row
+                upserts[table].append((key, *columns, json.dumps(data, ensure_ascii=False)))
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("REPLACE INTO agents VALUES (?, ?, ?, ?)", upserts["agents"])
+            conn.executemany("REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", upserts["sessions"])
+            conn.executemany("REPLACE INTO progress VALUES (?, ?, ?)", upserts["progress"])
+            conn.executemany("DELETE FROM agents WHERE agent_id = ?", deletes["agents"])
+            conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes["sessions"])
+            conn.executemany("DELETE FROM progress WHERE session_id = ?", deletes["progress"])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load(self) -> Tuple[List[dict], List[dict]]:
+        agents = [json.loads(data) for (data,) in self._conn.execute("SELECT data FROM agents")]
+        progress = {sid: json.loads(data) for sid, data in self._conn.execute("SELECT session_id, data FROM progress")}
+        sessions = []
+        for session_id, data in self._conn.execute("SELECT session_id, data FROM sessions ORDER BY created_at"):
+            session = json.loads(data)
+            session["progress"] = {field: 0 for field in PROGRESS_FIELDS}
+            session["progress"].update(progress.get(session_id, {}))
+            sessions.append(session)
+        return agents, sessions
+
+    def flush(self):
+        self._write_batch()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self._write_batch()
+        self._conn.close()
+
+# 전역 상태 관리
+# 세션 목록 정렬 기준 (newest/oldest는 색인 순서를 그대로 쓰고, 나머지는 조건에 맞는 세션만 골라 정렬)
+SESSION_SORT_KEYS = ("newest", "oldest", "updated", "execs_per_sec", "paths_total", "crashes")
+
+class SessionIndex:
+    """세션 보조 색인입니다.
+
+    세션마다 생성 순번을 매기고, 전체 목록과 상태별 목록을 순번으로 정렬된 배열로 유지합니다.
+    생성 순번은 created_at 순서와 같으므로 "가장 최근의 running 세션 20개" 같은 조회는
+    전체 세션 수와 관계없이 해당 상태 배열의 끝에서부터 limit개만 읽으면 됩니다.
+    에이전트별 색인은 HybridFuzzingManager.agent_sessions를 그대로 사용합니다.
+    """
+
+    def __init__(self):
+        self._next_seq = 0
+        self.seq_of: Dict[str, int] = {}
+        self.by_seq: Dict[int, str] = {}
+        self.all = array("Q")  # 모든 세션의 생성 순번 (오름차순)
+        self.by_status: Dict[str, array] = {}  # 상태 -> 생성 순번 배열 (오름차순)
+        self.by_target: Dict[str, set] = {}  # target_binary -> session_id 집합
+
+    def __len__(self) -> int:
+        return len(self.all)
+
+    @staticmethod
+    def _insert(seqs: array, seq: int):
+        seqs.insert(bisect.bisect_left(seqs, seq), seq)
+
+    @staticmethod
+    def _discard(seqs: array, seq: int):
+        position = bisect.bisect_left(seqs, seq)
+        if position < len(seqs) and seqs[position] == seq:
+            del seqs[position]
+
+    def add(self, session: SessionRecord):
+        seq = self._next_seq
+        self._next_seq += 1
+        self.seq_of[session.id] = seq
+        self.by_seq[seq] = session.id
+        self.all.append(seq)
+        self.by_status.setdefault(session.status, array("Q")).append(seq)
+        self.by_target.setdefault(session.target_binary, set()).add(session.id)
+
+    def remove(self, session: SessionRecord):
+        seq = self.seq_of.pop(session.id, None)
+        if seq is None:
+            return
+        del self.by_seq[seq]
+        self._discard(self.all, seq)
+        self._discard(self.by_status.get(session.status, array("Q")), seq)
+        targets = self.by_target.get(session.target_binary)
+        if targets is not None:
+            targets.discard(session.id)
+            if not targets:
+                del self.by_target[session.target_binary]
+
+    def move(self, session_id: str, old_status: str, new_status: str):
+        seq = self.seq_of.get(session_id)
+        if seq is None:
+            return
+        self._discard(self.by_status.get(old_status, array("Q")), seq)
+        self._insert(self.by_status.setdefault(new_status, array("Q")), seq)
+
+    def ordered(self, status: Optional[str] = None, candidates: Optional[set] = None):
+        """조건에 맞을 수 있는 세션의 생성 순번 배열을 고릅니다. 가장 작은 후보 집합을 사용합니다."""
+        seqs = self.all if status is None else self.by_status.get(status, array("Q"))
+        if candidates is not None and len(candidates) < len(seqs):
+            seqs = array("Q", sorted(self.seq_of[sid] for sid in candidates if sid in self.seq_of))
+        return seqs
+
+# 세션 이벤트 스트림 설정
+EVENT_QUEUE_LIMIT = 256  # 구독자마다 쌓아 둘 수 있는 (이벤트 종류, 세션) 키 수
+MAX_EVENT_SUBSCRIBERS = 64
+EVENT_KEEPALIVE_INTERVAL = 15.0
+
+class _EventSubscriber:
+    __slots__ = ("sessions", "pending", "dropped", "loop", "wakeup")
+
+    def __init__(self, sessions: Optional[set], loop: asyncio.AbstractEventLoop):
+        self.sessions = sessions  # None이면 모든 세션
+        self.pending: "OrderedDict[tuple, dict]" = OrderedDict()  # (이벤트 종류, session_id) -> 합쳐진 데이터
+        self.dropped = 0
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+
+class EventBroker:
+    """세션 상태 변화, 진행 상황 델타, 새 크래시 버킷을 구독자에게 밀어 주는 브로커입니다.
+
+    구독자별 대기열은 (이벤트 종류, 세션)마다 하나의 항목만 두고 새 이벤트를 기존 항목에 합치므로
+    (상태는 최신 값으로 덮고 진행 상황 델타는 병합) 느린 구독자도 세션 수에 비례하는 메모리만 씁니다.
+    키가 EVENT_QUEUE_LIMIT를 넘으면 가장 오래된 항목을 버리고, 다음 전송에 overflow 이벤트로 알려
+    클라이언트가 상태를 다시 조회하게 합니다.
+    """
+
+    def __init__(self, queue_limit: int = EVENT_QUEUE_LIMIT):
+        self.queue_limit = queue_limit
+        self._subscribers: List[_EventSubscriber] = []
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, sessions: Optional[set] = None) -> _EventSubscriber:
+        subscriber = _EventSubscriber(sessions, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _EventSubscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @staticmethod
+    def _merge(kind: str, current: dict, data: dict):
+        if kind == "crash":
+            current["new_buckets"].extend(data["new_buckets"])
+            current["crashes"] += data["crashes"]
+        else:
+            current.update(data)
+
+    def publish(self, kind: str, session_id: str, data: dict):
+        """이벤트를 관심 있는 구독자들의 대기열에 넣습니다. 어느 스레드에서 불러도 됩니다."""
+        if not self._subscribers:
+            return
+        key = (kind, session_id)
+        with self._lock:
+            for subscriber in self._subscribers:
+                if subscriber.sessions is not None and session_id not in subscriber.sessions:
+                    continue
+                current = subscriber.pending.get(key)
+                if current is None:
+                    if len(subscriber.pending) >= self.queue_limit:
+                        subscriber.pending.popitem(last=False)
+                        subscriber.dropped += 1
+                    subscriber.pending[key] = {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+                else:
+                    self._merge(kind, current, data)
+                subscriber.loop.call_soon_threadsafe(subscriber.wakeup.set)
+
+    def drain(self, subscriber: _EventSubscriber) -> List[Tuple[int, str, dict]]:
+        """대기 중인 이벤트를 (순번, 종류, 데이터) 목록으로 꺼냅니다."""
+        with self._lock:
+            pending, subscriber.pending = subscriber.pending, OrderedDict()
+            dropped, subscriber.dropped = subscriber.dropped, 0
+            subscriber.wakeup.clear()
+            events = []
+            if dropped:
+                self._seq += 1
+                events.append((self._seq, "overflow", {"dropped": dropped}))
+            for (kind, session_id), data in pending.items():
+                self._seq += 1
+                events.append((self._seq, kind, dict(data, session_id=session_id)))
+            return events
+
+# 참이면 상태가 바뀔 때마다 카운터를 처음부터 다시 계산해 대조합니다 (테스트/디버깅용)
+CHECK_COUNTERS = os.environ.get("AFL_MCP_CHECK_COUNTERS", "") == "1"
+
+class ManagerCounters:
+    """get_system_status가 O(1)로 읽는 집계 카운터입니다.
+
+    세션은 상태가 바뀌거나 진행 상황이 반영될 때 변경 전 값을 빼고 변경 후 값을 더하며,
+    초당 실행 합계는 활성 상태(ACTIVE_STATUSES) 세션만 포함합니다.
+    """
+
+    __slots__ = ("sessions_by_status", "agents_connected", "agents_total", "execs_done", "crashes", "execs_per_sec")
+
+    def __init__(self):
+        self.sessions_by_status: Dict[str, int] = {}
+        self.agents_connected = 0
+        self.agents_total = 0
+        self.execs_done = 0
+        self.crashes = 0
+        self.execs_per_sec = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "sessions_by_status": {k: v for k, v in self.sessions_by_status.items() if v},
+            "agents_connected": self.agents_connected,
+            "agents_total": self.agents_total,
+            "execs_done": self.execs_done,
+            "crashes": self.crashes,
+            "execs_per_sec": self.execs_per_sec
+        }
+
+    def add_session(self, session: SessionRecord, sign: int = 1):
+        status = session.status
+        values = session.progress.values
+        self.sessions_by_status[status] = self.sessions_by_status.get(status, 0) + sign
+        self.execs_done += sign * int(values[_EXECS_DONE])
+        self.crashes += sign * int(values[_CRASHES])
+        if status in ACTIVE_STATUSES:
+            self.execs_per_sec += sign * values[_EXECS_PER_SEC]
+
+    def remove_session(self, session: SessionRecord):
+        self.add_session(session, -1)
+
+    def set_connection(self, previous: Optional[bool], current: Optional[bool]):
+        """에이전트 연결 상태 변화(None은 미등록)를 반영합니다."""
+        self.agents_total += (current is not None) - (previous is not None)
+        self.agents_connected += bool(current) - bool(previous)
+
+    @classmethod
+    def recompute(cls, sessions: Dict[str, SessionRecord], agent_connections: Dict[str, bool]) -> "ManagerCounters":
+        counters = cls()
+        for session in sessions.values():
+            counters.add_session(session)
+        for connected in agent_connections.values():
+            counters.set_connection(None, connected)
+        return counters
+
+# Prometheus /metrics 설정
+METRICS_MAX_SESSIONS = int(os.environ.get("AFL_MCP_METRICS_MAX_SESSIONS", "200"))  # session_id 레이블을 붙이는 최대 활성 세션 수
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_OTHER_SESSION = "_other"  # 레이블 한도를 넘은 세션을 합산하는 레이블 값
+TOOL_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 세션별로 내보내는 진행 상황 필드: (필드, 메트릭 이름, 설명)
+SESSION_METRICS = (
+    ("execs_per_sec", "afl_session_execs_per_sec", "Executions per second reported by the session"),
+    ("paths_total", "afl_session_paths_total", "Corpus entries (paths) in the session"),
+    ("crashes", "afl_session_crashes", "Unique crashes found by the session"),
+    ("hangs", "afl_session_hangs", "Unique hangs found by the session")
+)
+
+def _metric_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _metric_header(name: str, kind: str, help_text: str) -> str:
+    return f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n"
+
+class MetricsExporter:
+    """/metrics 응답에 들어갈 세션 메트릭을 증분으로 관리합니다.
+
+    활성 세션 중 METRICS_MAX_SESSIONS개까지만 session_id 레이블을 받고, 나머지는
+    session_id="_other" 합계에 더해 레이블 수가 세션 수와 함께 늘지 않게 합니다.
+    레이블이 붙은 세션의 샘플 줄은 진행 상황이 바뀔 때만 다시 만들고, 스크레이프는 캐시된 줄을 이어 붙이므로
+    전체 세션을 훑지 않습니다. 한도를 넘은 세션은 다음 보고 때 빈 자리가 있으면 레이블을 받습니다.
+    """
+
+    def __init__(self, max_sessions: int = METRICS_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.labelled: Dict[str, list] = {}  # session_id -> [세션, 캐시된 샘플 줄 (None이면 다시 생성)]
+        self.overflow: set = set()  # 합계로만 내보내는 활성 세션 ID
+        self.overflow_totals = [0] * len(SESSION_METRICS)
+
+    def add_session(self, session: SessionRecord):
+        """세션의 현재 상태를 반영합니다. remove_session과 짝을 이뤄 상태 전이마다 호출합니다."""
+        session_id = session.id
+        if session.status not in ACTIVE_STATUSES:
+            self.labelled.pop(session_id, None)
+            return
+        entry = self.labelled.get(session_id)
+        if entry is not None:
+            entry[1] = None
+        elif len(self.labelled) < self.max_sessions:
+            self.labelled[session_id] = [session, None]
+        else:
+            self.overflow.add(session_id)
+            progress = session.progress
+            for i, (field, _, _) in enumerate(SESSION_METRICS):
+                self.overflow_totals[i] += progress[field]
+
+    def remove_session(self, session: SessionRecord):
+        """합계에 들어간 세션의 기여분을 뺍니다 (레이블이 붙은 세션은 add_session에서 갱신됩니다)."""
+        if session.id in self.overflow:
+            self.overflow.discard(session.id)
+            progress = session.progress
+            for i, (field, _, _) in enumerate(SESSION_METRICS):
+                self.overflow_totals[i] -= progress[field]
+
+    def forget(self, session_id: str):
+        self.labelled.pop(session_id, None)
+
+    @staticmethod
+    def _session_lines(session: SessionRecord) -> Tuple[str, ...]:
+        labels = (f'session_id="{_metric_label(session.id)}",agent_id="{_metric_label(session.agent_id)}",'
+                  f'target="{_metric_label(os.path.basename(session.target_binary))}"')
+        progress = session.progress
+        return tuple(f"{name}{{{labels}}} {progress[field]}\n" for field, name, _ in SESSION_METRICS)
+
+    def render_sessions(self) -> str:
+        for entry in self.labelled.values():
+            if entry[1] is None:
+                entry[1] = self._session_lines(entry[0])
+        parts = []
+        for i, (_, name, help_text) in enumerate(SESSION_METRICS):
+            parts.append(_metric_header(name, "gauge", help_text))
+            parts.extend(entry[1][i] for entry in self.labelled.values())
+            if self.overflow:
+                parts.append(f'{name}{{session_id="{METRICS_OTHER_SESSION}"}} {self.overflow_totals[i]}\n')
+        parts.append(_metric_header("afl_session_labels_overflow", "gauge",
+                                    "Active sessions folded into session_id=\"_other\" by the label cap"))
+        parts.append(f"afl_session_labels_overflow {len(self.overflow)}\n")
+        return "".join(parts)
+
+class ToolMetrics:
+    """MCP 도구별 호출 수, 실패 수(❌ 응답 또는 예외), 지연 시간 히스토그램입니다."""
+
+    def __init__(self, buckets: Tuple[float, ...] = TOOL_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._tools: Dict[str, list] = {}  # 도구 이름 -> [호출 수, 실패 수, 지연 합계, 버킷별 개수]
+
+    def observe(self, tool: str, seconds: float, failed: bool):
+        with self._lock:
+            stats = self._tools.get(tool)
+            if stats is None:
+                stats = self._tools[tool] = [0, 0, 0.0, [0] * len(self.buckets)]
+            stats[0] += 1
+            stats[1] += failed
+            stats[2] += seconds
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                stats[3][index] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            tools = {name: (calls, failures, total, list(counts)) for name, (calls, failures, total, counts) in self._tools.items()}
+        calls_lines, failure_lines, histogram_lines = [], [], []
+        for name, (calls, failures, total, counts) in sorted(tools.items()):
+            label = f'tool="{_metric_label(name)}"'
+            calls_lines.append(f"afl_mcp_tool_calls_total{{{label}}} {calls}\n")
+            failure_lines.append(f"afl_mcp_tool_failures_total{{{label}}} {failures}\n")
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                histogram_lines.append(f'afl_mcp_tool_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}\n')
+            histogram_lines.append(f'afl_mcp_tool_latency_seconds_bucket{{{label},le="+Inf"}} {calls}\n')
+            histogram_lines.append(f"afl_mcp_tool_latency_seconds_sum{{{label}}} {total}\n")
+            histogram_lines.append(f"afl_mcp_tool_latency_seconds_count{{{label}}} {calls}\n")
+        return "".join([
+            _metric_header("afl_mcp_tool_calls_total", "counter", "MCP tool invocations"), *calls_lines,
+            _metric_header("afl_mcp_tool_failures_total", "counter", "MCP tool invocations that raised or returned an error"), *failure_lines,
+            _metric_header("afl_mcp_tool_latency_seconds", "histogram", "MCP tool latency in seconds"), *histogram_lines
+        ])
+
+tool_metrics = ToolMetrics()
+
+# 도구 프로파일링 설정 (기본 꺼짐)
+PROFILE_TOOLS = os.environ.get("AFL_MCP_PROFILE", "") == "1"
+PROFILE_SLOW_MS = float(os.environ.get("AFL_MCP_PROFILE_SLOW_MS", "0"))  # 0보다 크면 이보다 느린 호출의 스택 샘플을 저장
+PROFILE_DIR = os.environ.get("AFL_MCP_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = 0.005  # 스택 샘플링 간격(초)
+PROFILE_SLOW_CALLS = 20  # 메모리에 남겨 두는 최근 느린 호출 수
+
+class HdrHistogram:
+    """HdrHistogram과 같은 로그-선형 버킷 히스토그램입니다.
+
+    2의 거듭제곱 구간마다 2^(sub_bucket_bits-1)개의 버킷을 두므로 기록한 값의 상대 오차가
+    2^-(sub_bucket_bits-1) 이하이고, 버킷 수는 값 범위의 로그에만 비례합니다.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 6):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.counts = array("Q")
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.half + (value >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def record(self, value: int):
+        value = max(0, int(value))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.total += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> int:
+        """q(0~100) 백분위 값을 버킷의 상한으로 반환합니다 (최댓값을 넘지 않음)."""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(self.total * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+class _StackSampler:
+    """도구 호출 중인 스레드의 스택을 주기적으로 모으는 샘플링 프로파일러입니다 (필요할 때 스레드 하나를 띄움)."""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._active: Dict[int, Dict[str, int]] = {}  # 스레드 ID -> 접힌 스택 -> 샘플 수
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int):
+        with self._lock:
+            self._active[thread_id] = {}
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tool-stack-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, thread_id: int) -> Dict[str, int]:
+        with self._lock:
+            return self._active.pop(thread_id, {})
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stack = self._fold(frame)
+                        stacks[stack] = stacks.get(stack, 0) + 1
+            time.sleep(self.interval)
+
+class ToolProfiler:
+    """도구 호출의 실제 시간, CPU 시간, tracemalloc 최대 할당량, 오류 종류를 도구별 HDR 히스토그램에 모읍니다.
+
+    도구는 예외를 잡아 ❌ 문자열로 돌려주므로, 예외 대신 ❌ 응답은 오류 종류 "ErrorResponse"로 셉니다.
+    tracemalloc 최대값은 프로세스 전체 기준이라 동시에 실행된 호출의 할당이 섞일 수 있습니다.
+    slow_ms가 0보다 크면 호출마다 스택을 샘플링하고, 그보다 느린 호출은 flamegraph.pl/speedscope가 읽는
+    접힌 스택(.folded) 파일로 out_dir에 저장합니다.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_TOOLS, slow_ms: float = PROFILE_SLOW_MS, out_dir: str = PROFILE_DIR):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.out_dir = out_dir
+        self.sampler = _StackSampler()
+        self._lock = threading.Lock()
+        self._tools: Dict[str, dict] = {}
+        self.slow_calls: List[dict] = []
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stats(self, tool: str) -> dict:
+        stats = self._tools.get(tool)
+        if stats is None:
+            stats = self._tools[tool] = {
+                "wall_us": HdrHistogram(), "cpu_us": HdrHistogram(), "alloc_peak": HdrHistogram(), "errors": {}
+            }
+        return stats
+
+    def begin(self) -> tuple:
+        thread_id = threading.get_ident()
+        if self.slow_ms > 0:
+            self.sampler.start(thread_id)
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        if traced is not None:
+            tracemalloc.reset_peak()
+        return thread_id, time.thread_time(), traced
+
+    def end(self, call: tuple, tool: str, wall: float, error: Optional[str]):
+        thread_id, cpu_started, traced = call
+        cpu = time.thread_time() - cpu_started
+        alloc_peak = max(0, tracemalloc.get_traced_memory()[1] - traced) if traced is not None else 0
+        stacks = self.sampler.stop(thread_id) if self.slow_ms > 0 else {}
+        with self._lock:
+            stats = self._stats(tool)
+            stats["wall_us"].record(wall * 1e6)
+            stats["cpu_us"].record(cpu * 1e6)
+            stats["alloc_peak"].record(alloc_peak)
+            if error:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+        if stacks and wall * 1000 >= self.slow_ms:
+            self._dump_slow_call(tool, wall, stacks)
+
+    def _dump_slow_call(self, tool: str, wall: float, stacks: Dict[str, int]):
+        path = None
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, f"{tool}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.folded")
+            with open(path, "w") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+        except OSError as e:
+            logger.warning(f"느린 호출 스택 저장 실패: {e}")
+            path = None
+        with self._lock:
+            self.slow_calls.append({"tool": tool, "wall_ms": round(wall * 1000, 1), "at": datetime.now().isoformat(),
+                                    "samples": sum(stacks.values()), "path": path})
+            del self.slow_calls[:-PROFILE_SLOW_CALLS]
+
+    def snapshot(self) -> Dict[str, dict]:
+        """도구별 요약(호출 수, 백분위, 오류 종류)을 반환합니다."""
+        with self._lock:
+            result = {}
+            for tool, stats in self._tools.items():
+                wall, cpu, alloc = stats["wall_us"], stats["cpu_us"], stats["alloc_peak"]
+                result[tool] = {
+                    "calls": wall.total,
+                    "wall_us": {"p50": wall.percentile(50), "p90": wall.percentile(90), "p99": wall.percentile(99), "max": wall.max},
+                    "cpu_us": {"p50": cpu.percentile(50), "p99": cpu.percentile(99), "max": cpu.max},
+                    "alloc_peak": {"p50": alloc.percentile(50), "max": alloc.max},
+                    "errors": dict(stats["errors"])
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._tools.clear()
+            self.slow_calls.clear()
+
+tool_profiler = ToolProfiler()
+
+def instrument_tool(func):
+    """도구 호출 수와 지연 시간을 tool_metrics에 기록합니다. @app.tool() 바로 아래에 붙입니다.
+
+    프로파일링이 켜져 있으면 tool_profiler에도 기록합니다.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call = tool_profiler.begin() if tool_profiler.enabled else None
+        started = time.perf_counter()
+        error = "ErrorResponse"
+        try:
+            result = func(*args, **kwargs)
+            if not (isinstance(result, str) and result.startswith("❌")):
+                error = None
+            return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            tool_metrics.observe(func.__name__, elapsed, error is not None)
+            if call is not None:
+                tool_profiler.end(call, func.__name__, elapsed, error)
+    return wrapper
+
+SESSION_LOCK_STRIPES = 64  # 세션별 갱신을 직렬화하는 락 수 (세션 ID 해시로 나눠 씀)
+
+class LockStripes:
+    """키를 해시해 고정된 수의 락 중 하나를 돌려줍니다. 키마다 락을 만들거나 지우지 않아도 됩니다."""
+
+    def __init__(self, count: int = SESSION_LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(count)]
+
+    def __call__(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+class HybridFuzzingManager:
+    """에이전트와 퍼징 세션 상태를 관리합니다.
+
+    도구 호출은 스레드 풀에서, 에이전트 HTTP 엔드포인트는 이벤트 루프에서 동시에 들어오므로 두 단계로 잠급니다.
+    _lock(재진입 가능)은 여러 세션/에이전트가 공유하는 구조(에이전트/세션 딕셔너리, 색인, 카운터, 스케줄러,
+    하트비트 휠, 메트릭)를 지키며 짧게만 잡습니다. 세션 하나의 갱신(진행 상황 병합, 이력 기록, 이벤트 발행,
+    크래시 분류, 정리)은 세션 ID로 고른 스트라이프 락으로 직렬화해 같은 세션의 이벤트 순서를 지키고,
+    이력 기록이나 크래시 저장소 확인처럼 오래 걸리는 일은 _lock 밖에서 합니다.
+    에이전트 텔레메트리 한 건은 에이전트 스트라이프 락 안에서 통째로 반영합니다.
+    락 순서는 항상 에이전트 스트라이프 락 → 세션 스트라이프 락 → _lock이며, 반대 방향으로 잡지 않습니다.
+    """
+
+    def __init__(self):
+        self.agents: Dict[str, AgentRecord] = {}  # 등록된 에이전트들
+        self.sessions: Dict[str, SessionRecord] = {}  # 퍼징 세션들
+        self.agent_connections: Dict[str, bool] = {}  # 에이전트 연결 상태
+        self.scheduler = AgentScheduler()  # 세션 배치용 에이전트 순위
+        self.heartbeat_wheel = TimingWheel(AGENT_HEARTBEAT_TIMEOUT)  # 에이전트 하트비트 만료 관리
+        self.agent_sessions: Dict[str, set] = {}  # agent_id -> 해당 에이전트의 세션 ID들
+        self.store: Optional[SessionStore] = None  # 상태 저장소 (attach_store로 연결)
+        self.histories: Dict[str, ProgressHistory] = {}  # session_id -> 진행 상황 이력 (첫 보고 때 생성)
+        self.crash_store = ContentStore(CRASH_STORE_DIR)
+        self.crash_buckets: Dict[str, Dict[str, dict]] = {}  # session_id -> bucket_id -> 버킷 정보
+        self.crash_hashes: Dict[str, set] = {}  # session_id -> 이미 분류한 크래시 입력의 SHA-256
+        self.corpora: Dict[str, CorpusIndex] = {}  # 코퍼스 그룹 이름 -> 전역 색인 (처음 사용할 때 생성)
+        self.corpus_known: Dict[str, set] = {}  # session_id -> 세션이 이미 가진 코퍼스 항목의 SHA-256
+        self.events = EventBroker()  # /events 구독자에게 보낼 세션 이벤트
+        self.index = SessionIndex()  # 상태/타겟/생성 순서별 세션 색인
+        self.counters = ManagerCounters()  # 시스템 요약용 집계
+        self.metrics = MetricsExporter()  # /metrics용 세션 메트릭
+        self.check_counters = CHECK_COUNTERS
+        self._lock = threading.RLock()  # 공유 구조용 락
+        self._session_locks = LockStripes()  # 세션별 갱신 직렬화
+        self._agent_locks = LockStripes()  # 에이전트별 텔레메트리 반영 직렬화
+        self.telemetry_acks: Dict[str, Tuple[str, int, dict]] = {}  # agent_id -> (epoch, 마지막 seq, 그 응답)
+        self.retention = RetentionPolicy()  # 메모리에 남길 끝난 세션 한도
+        self.archive: Optional[SessionArchive] = SessionArchive() if SESSION_ARCHIVE_DIR else None  # 한도를 넘은 끝난 세션 보관소
+        self._retention_lock = threading.Lock()  # 보관은 한 스레드만 한다
+        self._retention_thread: Optional[threading.Thread] = None
+
+    def attach_store(self, store: SessionStore) -> int:
+        """저장소를 연결하고 저장된 상태로 매니저를 복원합니다. 복원한 세션 수를 반환합니다.
+
+        복원된 에이전트는 하트비트가 다시 올 때까지 연결 끊김 상태이며, 하트비트 제한 시간 안에
+        돌아오지 않으면 그 에이전트의 활성 세션은 error가 됩니다.
+        """
+        agents, sessions = store.load()
+        with self._lock:
+            self._restore(agents, sessions)
+            self.store = store
+            self._verify_counters()
+        logger.info(f"상태 복원됨: 에이전트 {len(agents)}개, 세션 {len(sessions)}개")
+        return len(sessions)
+
+    def _restore(self, agents: List[dict], sessions: List[dict]):
+        for data in agents:
+            agent = AgentRecord.from_dict(data)
+            agent.status = AgentStatus.DISCONNECTED
+            self.agents[agent.id] = agent
+            self._set_connection(agent.id, False)
+            self.heartbeat_wheel.schedule(agent.id, AGENT_HEARTBEAT_TIMEOUT)
+        for data in sessions:
+            session = SessionRecord.from_dict(data)
+            self.sessions[session.id] = session
+            self.agent_sessions.setdefault(session.agent_id, set()).add(session.id)
+            self.index.add(session)
+            self.counters.add_session(session)
+            self.metrics.add_session(session)
+            if session.status in TERMINAL_STATUSES:
+                self.retention.add(session.id, session.updated_at or session.created_at, SESSION_RECORD_BYTES)
+
+    def _set_connection(self, agent_id: str, connected: Optional[bool]):
+        """에이전트 연결 상태를 바꾸고 카운터에 반영합니다. None이면 연결 정보를 지웁니다. _lock을 잡고 부릅니다."""
+        previous = self.agent_connections.get(agent_id)
+        if connected is None:
+            self.agent_connections.pop(agent_id, None)
+        else:
+            self.agent_connections[agent_id] = connected
+        self.counters.set_connection(previous, connected)
+
+    def check_consistency(self) -> List[str]:
+        """카운터를 처음부터 다시 계산한 값과 비교해 어긋난 항목을 반환합니다."""
+        with self._lock:
+            expected = ManagerCounters.recompute(self.sessions, self.agent_connections).snapshot()
+            actual = self.counters.snapshot()
+        problems = []
+        for key, value in expected.items():
+            if key == "execs_per_sec":
+                if not math.isclose(actual[key], value, rel_tol=1e-6, abs_tol=1e-3):
+                    problems.append(f"{key}: {actual[key]} != {value}")
+            elif actual[key] != value:
+                problems.append(f"{key}: {actual[key]} != {value}")
+        return problems
+
+    def _verify_counters(self):
+        if self.check_counters:
+            problems = self.check_consistency()
+            if problems:
+                raise AssertionError(f"카운터 불일치: {', '.join(problems)}")
+
+    def render_metrics(self) -> str:
+        """Prometheus 텍스트 형식의 서버/에이전트/세션 메트릭을 만듭니다. 세션 전체를 훑지 않습니다."""
+        with self._lock:
+            return self._render_metrics()
+
+    def _render_metrics(self) -> str:
+        counters = self.counters
+        parts = [_metric_header("afl_sessions", "gauge", "Fuzzing sessions by status")]
+        parts.extend(f'afl_sessions{{status="{status}"}} {counters.sessions_by_status.get(status, 0)}\n'
+                     for status in (*ACTIVE_STATUSES, *TERMINAL_STATUSES))
+        parts += [
+            _metric_header("afl_agents", "gauge", "Registered agents"), f"afl_agents {counters.agents_total}\n",
+            _metric_header("afl_agents_connected", "gauge", "Agents with a live heartbeat"), f"afl_agents_connected {counters.agents_connected}\n",
+            _metric_header("afl_execs_per_sec", "gauge", "Summed executions per second of active sessions"), f"afl_execs_per_sec {counters.execs_per_sec}\n",
+            _metric_header("afl_execs_done", "gauge", "Executions reported by all sessions"), f"afl_execs_done {counters.execs_done}\n",
+            _metric_header("afl_crashes", "gauge", "Crashes reported by all sessions"), f"afl_crashes {counters.crashes}\n",
+            _metric_header("afl_event_subscribers", "gauge", "Connected /events subscribers"), f"afl_event_subscribers {len(self.events)}\n"
+        ]
+        now = now_ms()
+        agent_metrics = (
+            ("afl_agent_up", "Whether the agent heartbeat is live", lambda agent_id, agent, resources: int(self.agent_connections.get(agent_id, False))),
+            ("afl_agent_heartbeat_age_seconds", "Seconds since the last agent heartbeat",
+             lambda agent_id, agent, resources: (now - agent.last_heartbeat) / 1000),
+            ("afl_agent_load", "Agent load average", lambda agent_id, agent, resources: resources.get("load_avg", 0.0)),
+            ("afl_agent_free_cores", "Agent cores not running a fuzzer", lambda agent_id, agent, resources: resources.get("free_cores", 0)),
+            ("afl_agent_sessions", "Sessions running on the agent", lambda agent_id, agent, resources: resources.get("sessions", 0))
+        )
+        for name, help_text, value in agent_metrics:
+            parts.append(_metric_header(name, "gauge", help_text))
+            for agent_id, agent in self.agents.items():
+                parts.append(f'{name}{{agent_id="{_metric_label(agent_id)}"}} {value(agent_id, agent, agent.resources or {})}\n')
+        parts.append(self.metrics.render_sessions())
+        return "".join(parts)
+
+    def _persist_agent(self, agent_id: str):
+        if self.store is not None and agent_id in self.agents:
+            self.store.save_agent(self.agents[agent_id].to_dict())
+
+    def _persist_session(self, session_id: str, progress_only: bool = False):
+        if self.store is None or session_id not in self.sessions:
+            return
+        session = self.sessions[session_id]
+        if not progress_only:
+            self.store.save_session(session.to_dict())
+        self.store.save_progress(session_id, dict(session.progress))
+        
+    def register_agent(self, agent_id: str, agent_info: dict) -> bool:
+        """로컬 에이전트를 등록합니다."""
+        try:
+            with self._lock:
+                self.agents[agent_id] = AgentRecord(agent_id, agent_info)
+                self._set_connection(agent_id, True)
+                self.heartbeat_wheel.schedule(agent_id, AGENT_HEARTBEAT_TIMEOUT)
+                self.update_agent_resources(agent_id, agent_info.get("resources", {}))
+                self._persist_agent(agent_id)
+            logger.info(f"에이전트 등록됨: {agent_id}")
+            return True
+        except Exception as e:
+            logger.error(f"에이전트 등록 실패: {e}")
+            return False
+    
+    def unregister_agent(self, agent_id: str) -> bool:
+        """로컬 에이전트를 제거합니다."""
+        try:
+            with self._lock:
+                if agent_id not in self.agents:
+                    return False
+                del self.agents[agent_id]
+                self.telemetry_acks.pop(agent_id, None)
+                self._set_connection(agent_id, None)
+                self.scheduler.remove(agent_id)
+                self.heartbeat_wheel.cancel(agent_id)
+                if self.store is not None:
+                    self.store.delete_agent(agent_id)
+                orphaned = self.agent_sessions.pop(agent_id, set())
+            logger.info(f"에이전트 제거됨: {agent_id}")
+            # 하트비트 만료로도 더 이상 닿지 않으므로 활성 세션은 여기서 끝낸다 (세션 락을 잡으므로 _lock을 놓은 뒤)
+            for session_id in orphaned:
+                self.update_session_status(session_id, "error", error=f"에이전트 제거됨 ({agent_id})",
+                                           only_from=ACTIVE_STATUSES)
+            return True
+        except Exception as e:
+            logger.error(f"에이전트 제거 실패: {e}")
+            return False
+    
+    def record_heartbeat(self, agent_id: str, resources: dict = None) -> bool:
+        """에이전트 하트비트를 기록합니다. 등록되지 않은 에이전트면 False를 반환합니다."""
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                return False
+            agent.last_heartbeat = now_ms()
+            if not self.agent_connections.get(agent_id, False):
+                self._set_connection(agent_id, True)
+                agent.status = AgentStatus.ACTIVE
+                self.scheduler.update(agent_id, agent.resources)
+                logger.info(f"에이전트 재연결됨: {agent_id}")
+            self.heartbeat_wheel.schedule(agent_id, AGENT_HEARTBEAT_TIMEOUT)
+            if resources is not None:
+                self.update_agent_resources(agent_id, resources)
+            self._persist_agent(agent_id)
+        return True
+
+    def ingest_telemetry(self, agent_id: str, telemetry: dict) -> Optional[dict]:
+        """에이전트가 한 주기 동안 모은 하트비트, 자원 정보, 세션별 상태/진행 상황 델타, 크래시 시그니처를 한 번에 반영합니다.
+
+        telemetry의 epoch는 에이전트 프로세스마다 새로 만드는 값이고 seq는 그 안에서 1씩 늘어나는 순번입니다.
+        이미 반영한 seq가 다시 오면(응답을 받지 못한 에이전트의 재시도) 아무것도 바꾸지 않고 처음 응답을 돌려주므로,
+        크래시 업로드 요청도 잃지 않습니다. 등록되지 않은 에이전트면 None을 반환합니다.
+        """
+        epoch, seq = str(telemetry.get("epoch", "")), int(telemetry["seq"])
+        with self._agent_locks(agent_id):
+            last = self.telemetry_acks.get(agent_id)
+            if last is not None and last[0] == epoch and seq <= last[1]:
+                if seq == last[1]:
+                    return dict(last[2], duplicate=True)
+                return {"ack": seq, "duplicate": True, "applied": 0, "crashes": {}}
+            if not self.record_heartbeat(agent_id, telemetry.get("resources")):
+                return None
+            # 해석한 묶음은 일부 반영에 실패해도 항상 ack한다. 실패로 응답하면 에이전트가 같은 seq를 끝없이 다시 보내
+            # 이후 하트비트와 크래시 보고가 모두 막힌다
+            applied = 0
+            try:
+                applied = self.apply_agent_updates(agent_id, telemetry.get("updates") or {})
+            except Exception as e:
+                logger.error(f"텔레메트리 세션 업데이트 반영 실패 ({agent_id}): {e}")
+            crashes = {}
+            reports = telemetry.get("crashes") or {}
+            if not isinstance(reports, dict):
+                logger.error(f"텔레메트리 크래시 목록이 올바르지 않습니다 ({agent_id})")
+                reports = {}
+            for session_id, session_crashes in reports.items():
+                try:
+                    crashes[session_id] = self.record_crashes(agent_id, session_id, session_crashes)
+                except Exception as e:
+                    logger.error(f"크래시 시그니처 반영 실패 ({agent_id}, {session_id}): {e}")
+            response = {"ack": seq, "applied": applied, "crashes": crashes}
+            self.telemetry_acks[agent_id] = (epoch, seq, response)
+            return response
+
+    def expire_stale_agents(self) -> List[str]:
+        """하트비트가 끊긴 에이전트를 연결 끊김으로 표시하고, 그 에이전트의 활성 세션을 error로 바꿉니다."""
+        affected = []
+        with self._lock:
+            expired = self.heartbeat_wheel.advance()
+            for agent_id in expired:
+                agent = self.agents.get(agent_id)
+                if agent is None:
+                    continue
+                self._set_connection(agent_id, False)
+                agent.status = AgentStatus.DISCONNECTED
+                self.scheduler.remove(agent_id)
+                self._persist_agent(agent_id)
+                logger.warning(f"에이전트 하트비트 만료: {agent_id}")
+                affected += [(agent_id, session_id) for session_id in self.agent_sessions.get(agent_id, ())]
+        # 세션 갱신은 세션 스트라이프 락을 먼저 잡아야 하므로 _lock을 놓은 뒤에 한다
+        for agent_id, session_id in affected:
+            self.update_session_status(session_id, "error", error=f"에이전트 연결 끊김 ({agent_id})",
+                                       only_from=ACTIVE_STATUSES)
+        self.schedule_retention()
+        return expired
+
+    def update_agent_resources(self, agent_id: str, resources: dict):
+        """에이전트가 보고한 자원 정보(빈 코어, 부하, 메모리, 세션 수)를 저장하고 스케줄러에 반영합니다."""
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                return
+            agent.resources = resources
+            if self.agent_connections.get(agent_id, False):
+                self.scheduler.update(agent_id, resources)
+
+    def select_agent(self, cores: int = 1, policy: str = None) -> Optional[str]:
+        """세션을 배치할 연결된 에이전트를 고릅니다."""
+        with self._lock:
+            return self.scheduler.select(cores, policy)
+
+    def list_agents(self) -> List[Tuple[dict, bool]]:
+        """(에이전트 정보, 연결 여부) 목록의 스냅샷을 반환합니다."""
+        with self._lock:
+            return [(agent, self.agent_connections.get(agent_id, False)) for agent_id, agent in self.agents.items()]
+
+    def create_session(self, agent_id: str, target_binary: str, input_dir: str, output_dir: str,
+                       instances: int = 1, corpus: str = "", minimize: bool = False,
+                       reminimize_interval: int = 0, tmpfs_mb: int = 0, adaptive_schedules: bool = False) -> str:
+        """새로운 퍼징 세션을 생성합니다.
+
+        에이전트가 등록되어 있고 연결된 상태인지는 세션을 추가할 때 같은 락 안에서 다시 확인하므로,
+        확인과 생성 사이에 에이전트가 제거되거나 끊겨도 고아 세션이 생기지 않습니다. 그런 경우 None을 반환합니다.
+        """
+        try:
+            session_id = str(uuid.uuid4())
+            session = SessionRecord(session_id, agent_id, target_binary, input_dir, output_dir, instances, corpus,
+                                    minimize, reminimize_interval, tmpfs_mb, adaptive_schedules)
+            with self._lock:
+                if not self.agent_connections.get(agent_id, False):
+                    logger.warning(f"세션 생성 거부: 에이전트 {agent_id}가 연결되어 있지 않습니다")
+                    return None
+                self.sessions[session_id] = session
+                self.agent_sessions.setdefault(agent_id, set()).add(session_id)
+                self.index.add(session)
+                self.counters.add_session(session)
+                self.metrics.add_session(session)
+                reserved = self.scheduler.reserve(agent_id, instances)
+                if reserved is not None:
+                    # list_available_agents도 다음 하트비트 전까지 차감한 값을 보여 주도록 레코드에도 반영한다
+                    self.agents[agent_id].resources = reserved
+                self._persist_session(session_id)
+            self.events.publish("status", session_id, {"status": "created", "error": None})
+            logger.info(f"세션 생성됨: {session_id}")
+            return session_id
+        except Exception as e:
+            logger.error(f"세션 생성 실패: {e}")
+            return None
+    
+    def update_session_status(self, session_id: str, status: Optional[str], progress: dict = None,
+                              error: str = None, only_from: Tuple[str, ...] = None, harness_mode: str = None,
+                              schedule_arms: list = None) -> bool:
+        """세션 상태를 업데이트합니다.
+
+        status가 None이면 상태는 그대로 두고, progress는 바뀐 필드만 담은 델타로 반영합니다.
+        harness_mode는 에이전트가 판별한 타겟의 실행 방식(HARNESS_MODES)이고,
+        schedule_arms는 적응형 스케줄 세션의 설정별 통계(sanitize_schedule_arms 형식)입니다.
+        only_from을 주면 현재 상태가 그 중 하나일 때만 바꾸며, 확인과 변경이 같은 락 안에서 일어납니다.
+        반영했으면 True를 반환합니다.
+        """
+        if status:
+            status = _SESSION_STATUSES.get(status) or SessionStatus(status)
+        # 카운터에서 세션을 뺀 뒤에는 실패하지 않도록 값 검증은 변경 전에 끝낸다
+        fields = []
+        for field, value in (progress or {}).items():
+            index = _PROGRESS_INDEX.get(field)
+            if index is None:
+                continue
+            if not _is_progress_value(value):
+                logger.warning(f"잘못된 진행 상황 값을 무시합니다: {session_id} {field}={value!r}")
+                continue
+            fields.append((field, index, value))
+        with self._session_locks(session_id):
+            with self._lock:
+                session = self.sessions.get(session_id)
+                if session is None or (only_from is not None and session.status not in only_from):
+                    return False
+                status_changed = bool(status) and status != session.status
+                self.counters.remove_session(session)
+                self.metrics.remove_session(session)
+                if error is not None:
+                    session.error = error
+                mode_changed = harness_mode is not None and harness_mode != session.harness_mode
+                if mode_changed:
+                    session.harness_mode = harness_mode
+                arms_changed = schedule_arms is not None and schedule_arms != session.schedule_arms
+                if arms_changed:
+                    session.schedule_arms = schedule_arms
+                if status_changed:
+                    self.index.move(session_id, session.status, status)
+                    session.status = status
+                    if status in TERMINAL_STATUSES:
+                        self.retention.add(session_id, now_ms(), self._session_footprint(session_id))
+                    else:
+                        self.retention.discard(session_id)
+                delta = {}
+                values = session.progress.values
+                for field, index, value in fields:
+                    if values[index] != value:
+                        values[index] = delta[field] = value
+                self.counters.add_session(session)
+                self.metrics.add_session(session)
+                self._verify_counters()
+                session.updated_at = now_ms()
+            # 이벤트 발행, 이력 기록, 저장은 세션 락만 잡고 해서 다른 세션의 갱신을 막지 않는다
+            if status_changed:
+                logger.info(f"세션 상태 업데이트: {session_id} -> {status}")
+                self.events.publish("status", session_id, {"status": status, "error": session.error})
+            if mode_changed:
+                logger.info(f"세션 하네스 모드: {session_id} -> {harness_mode}")
+            if progress:
+                if delta:
+                    self.events.publish("progress", session_id, delta)
+                history = self.histories.get(session_id)
+                if history is None:
+                    history = self.histories[session_id] = ProgressHistory()
+                history.record(time.time(), session.progress)
+            self._persist_session(session_id, progress_only=not (status_changed or mode_changed or arms_changed))
+        if status_changed and status in TERMINAL_STATUSES:
+            self.schedule_retention()
+        return True
+
+    def apply_agent_updates(self, agent_id: str, updates: dict) -> int:
+        """에이전트가 보낸 세션별 상태/진행 상황 델타를 반영하고 반영한 세션 수를 반환합니다."""
+        applied = 0
+        for session_id, update in updates.items():
+            # 한 세션의 잘못된 델타가 같은 묶음의 다른 세션 갱신을 막지 않도록 세션별로 격리한다
+            try:
+                applied += self._apply_agent_update(agent_id, session_id, update)
+            except Exception as e:
+                logger.error(f"세션 업데이트 반영 실패 ({agent_id}, {session_id}): {e}")
+        return applied
+
+    def _apply_agent_update(self, agent_id: str, session_id: str, update: dict) -> bool:
+        session = self.sessions.get(session_id)
+        if session is None or session.agent_id != agent_id:
+            return False
+        status = update.get("status")
+        if session.status in TERMINAL_STATUSES:
+            status = None
+        elif status is not None and status not in _SESSION_STATUSES:
+            logger.warning(f"알 수 없는 세션 상태를 무시합니다: {session_id} -> {status!r}")
+            status = None
+        harness_mode = update.get("harness_mode")
+        if not isinstance(harness_mode, str) or harness_mode not in HARNESS_MODES:
+            harness_mode = None
+        schedule_arms = sanitize_schedule_arms(update["schedule_arms"]) if "schedule_arms" in update else None
+        return self.update_session_status(session_id, status, update.get("progress"), harness_mode=harness_mode,
+                                          schedule_arms=schedule_arms)
+
+    def record_crashes(self, agent_id: str, session_id: str, crashes: List[dict]) -> dict:
+        """에이전트가 재현해 얻은 크래시 시그니처를 버킷에 분류합니다.
+
+        이미 본 입력은 건너뛰고, 버킷마다 처음 몇 개의 입력만 업로드를 요청하므로
+        같은 버그에서 나온 수많은 크래시 입력은 서버로 옮겨지지 않습니다.
+        버킷 샘플은 afl-tmin 최소화 대상으로도 돌려주며, 새 버킷의 첫 입력이 우선순위 0입니다.
+        """
+        with self._session_locks(session_id):
+            return self._record_crashes(agent_id, session_id, crashes)
+
+    def _record_crashes(self, agent_id: str, session_id: str, crashes: List[dict]) -> dict:
+        session = self.sessions.get(session_id)
+        if session is None or session.agent_id != agent_id:
+            return {"upload": [], "new_buckets": [], "minimize": []}
+        seen = self.crash_hashes.setdefault(session_id, set())
+        buckets = self.crash_buckets.setdefault(session_id, {})
+        upload, new_buckets, minimize = [], [], []
+        new_crashes = 0
+        now = datetime.now().isoformat()
+        for crash in crashes:
+            sha256 = crash["sha256"]
+            if sha256 in seen:
+                continue
+            seen.add(sha256)
+            new_crashes += 1
+            bucket_id, frames = crash_bucket_id(crash.get("kind", ""), crash.get("frames", []))
+            bucket = buckets.get(bucket_id)
+            if bucket is None:
+                bucket = buckets[bucket_id] = {
+                    "id": bucket_id,
+                    "kind": crash.get("kind") or "unknown",
+                    "frames": frames,
+                    "count": 0,
+                    "first_seen": now,
+                    "samples": [],
+                    "reproducers": {}  # 샘플 SHA-256 -> afl-tmin으로 최소화한 입력 정보
+                }
+                new_buckets.append(bucket_id)
+                logger.info(f"새 크래시 버킷: {session_id} {bucket_id} ({bucket['kind']})")
+            bucket["count"] += 1
+            bucket["last_seen"] = now
+            if len(bucket["samples"]) < CRASH_SAMPLES_PER_BUCKET:
+                minimize.append({"sha256": sha256, "priority": 0 if not bucket["samples"] else 1})
+                bucket["samples"].append(sha256)
+                if not self.crash_store.has(sha256):
+                    upload.append(sha256)
+        if new_crashes:
+            self.events.publish("crash", session_id, {"new_buckets": new_buckets, "crashes": new_crashes})
+        return {"upload": upload, "new_buckets": new_buckets, "minimize": minimize}
+
+    def find_sample_bucket(self, agent_id: str, session_id: str, sha256: str) -> Optional[dict]:
+        """에이전트 세션에서 sha256 입력을 샘플로 가진 크래시 버킷을 찾습니다."""
+        session = self.sessions.get(session_id)
+        if session is None or session.agent_id != agent_id:
+            return None
+        with self._session_locks(session_id):
+            for bucket in self.crash_buckets.get(session_id, {}).values():
+                if sha256 in bucket["samples"]:
+                    return bucket
+        return None
+
+    def attach_reproducer(self, agent_id: str, session_id: str, sha256: str, minimized: str, size: int) -> bool:
+        """샘플 sha256의 최소화된 입력을 버킷에 연결합니다. 그 사이 세션이 정리/보관됐으면 False를 반환합니다.
+
+        보관 스레드가 같은 버킷을 직렬화하는 중에 바꾸지 않도록 세션 락 안에서 버킷을 다시 찾습니다.
+        """
+        with self._session_locks(session_id):
+            session = self.sessions.get(session_id)
+            if session is None or session.agent_id != agent_id:
+                return False
+            for bucket in self.crash_buckets.get(session_id, {}).values():
+                if sha256 in bucket["samples"]:
+                    bucket["reproducers"][sha256] = {"sha256": minimized, "size": size}
+                    return True
+        return False
+
+    def crash_bucket_list(self, session_id: str) -> List[dict]:
+        """세션의 크래시 버킷 목록 스냅샷을 반환합니다. 보관된 세션이면 보관소에서 읽습니다."""
+        with self._session_locks(session_id):
+            buckets = self.crash_buckets.get(session_id)
+            if buckets is not None:
+                return list(buckets.values())
+        archived = self.archived_session(session_id) if session_id not in self.sessions else None
+        return list(archived.crash_buckets.values()) if archived else []
+
+    def classified_crash_count(self, session_id: str) -> int:
+        """버킷에 분류된 크래시 입력 수입니다."""
+        hashes = self.crash_hashes.get(session_id)
+        if hashes is not None:
+            return len(hashes)
+        archived = self.archived_session(session_id) if session_id not in self.sessions else None
+        return archived.classified_crashes if archived else 0
+
+    def reproducer_count(self, session_id: str) -> int:
+        return sum(len(bucket["reproducers"]) for bucket in self.crash_bucket_list(session_id))
+
+    def session_history(self, session_id: str) -> Optional[ProgressHistory]:
+        """세션의 진행 상황 이력입니다. 보관된 세션이면 보관소에서 읽습니다."""
+        history = self.histories.get(session_id)
+        if history is None and session_id not in self.sessions:
+            archived = self.archived_session(session_id)
+            history = archived.history if archived else None
+        return history
+
+    def corpus_index(self, key: str) -> CorpusIndex:
+        """코퍼스 그룹의 색인을 반환합니다. 처음 사용할 때 저장소에서 복원합니다."""
+        index = self.corpora.get(key)
+        if index is None:
+            safe_key = re.sub(r"[^\w.-]", "_", key)
+            index = self.corpora[key] = CorpusIndex(ContentStore(os.path.join(CORPUS_STORE_DIR, safe_key)))
+        return index
+
+    def corpus_session(self, agent_id: str, session_id: str) -> Optional[SessionRecord]:
+        """에이전트 소유이고 코퍼스 동기화를 쓰는 세션이면 반환합니다."""
+        session = self.sessions.get(session_id)
+        if session is None or session.agent_id != agent_id or not session.corpus:
+            return None
+        return session
+
+    def advertise_corpus(self, agent_id: str, session_id: str, hashes: List[str]) -> Optional[dict]:
+        """에이전트가 가진 코퍼스 항목을 기록하고, 서버에 없어 업로드가 필요한 항목을 반환합니다."""
+        session = self.corpus_session(agent_id, session_id)
+        if session is None:
+            return None
+        index = self.corpus_index(session.corpus)
+        self.corpus_known.setdefault(session_id, set()).update(hashes)
+        return {"upload": index.missing(hashes), "epoch": index.epoch}
+
+    def get_agent_sessions(self, agent_id: str) -> List[dict]:
+        """에이전트가 실행하거나 중지해야 할 세션 목록을 반환합니다."""
+        with self._lock:
+            return self._agent_sessions(agent_id)
+
+    def _agent_sessions(self, agent_id: str) -> List[dict]:
+        return [
+            {
+                "id": s.id,
+                "status": s.status,
+                "target_binary": s.target_binary,
+                "input_dir": s.input_dir,
+                "output_dir": s.output_dir,
+                "instances": s.instances,
+                "corpus": s.corpus,
+                "minimize": s.minimize,
+                "reminimize_interval": s.reminimize_interval,
+                "tmpfs_mb": s.tmpfs_mb,
+                "adaptive_schedules": s.adaptive_schedules
+            }
+            for s in (self.sessions[sid] for sid in self.agent_sessions.get(agent_id, ()))
+            if s.status in ("starting", "minimizing", "running", "stopped")
+        ]
+    
+    def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        """세션 정보를 반환합니다."""
+        return self.sessions.get(session_id)
+
+    def harness_report(self) -> List[dict]:
+        """활성 세션을 (타겟, 하네스 모드)별로 묶어 세션 수와 초당 실행 합계를 반환합니다.
+
+        persistent가 아닌 타겟을 먼저, 그 안에서는 초당 실행이 큰 순서로 정렬합니다.
+        """
+        groups = {}
+        with self._lock:
+            for status in ACTIVE_STATUSES:
+                for seq in self.index.by_status.get(status, ()):
+                    session = self.sessions[self.index.by_seq[seq]]
+                    key = (session.target_binary, session.harness_mode)
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = {"target_binary": session.target_binary,
+                                               "harness_mode": session.harness_mode, "sessions": 0,
+                                               "execs_per_sec": 0.0}
+                    group["sessions"] += 1
+                    group["execs_per_sec"] += session.progress.values[_EXECS_PER_SEC]
+        return sorted(groups.values(), key=lambda g: (g["harness_mode"] == "persistent", -g["execs_per_sec"]))
+
+    def archived_session(self, session_id: str) -> Optional[ArchivedSession]:
+        """보관된 세션을 반환합니다. 최근에 읽은 세션은 보관소의 LRU 캐시에서 바로 돌려줍니다."""
+        if self.archive is None:
+            return None
+        return self.archive.get(session_id)
+    
+    def list_sessions(self) -> List[SessionRecord]:
+        """모든 세션 목록을 반환합니다."""
+        return list(self.sessions.values())
+
+    def query_sessions(self, status: str = None, agent_id: str = None, target_binary: str = None,
+                       sort: str = "newest", cursor: str = None, limit: int = 20) -> Tuple[List[SessionRecord], Optional[str]]:
+        """조건에 맞는 세션을 한 페이지만 반환합니다. (세션 목록, 다음 페이지 커서)
+
+        newest/oldest 정렬은 색인 순서를 따라 limit개를 채울 때까지만 읽고, 커서는 마지막 세션의 생성 순번입니다.
+        지표 정렬은 후보 전체에서 상위 항목을 고르며, 커서는 건너뛸 개수입니다.
+        """
+        if sort not in SESSION_SORT_KEYS:
+            raise ValueError(f"지원하지 않는 정렬 기준입니다: {sort}")
+        with self._lock:
+            return self._query_sessions(status, agent_id, target_binary, sort, cursor, limit)
+
+    def count_sessions(self, status: str = None, agent_id: str = None, target_binary: str = None) -> int:
+        """조건에 맞는 세션 수를 반환합니다. 조건이 하나면 색인 크기를, 둘 이상이면 가장 작은 후보만 훑어 셉니다."""
+        with self._lock:
+            seqs, matches = self._session_candidates(status, agent_id, target_binary)
+            if agent_id is None and target_binary is None:
+                return len(seqs)
+            by_seq, sessions = self.index.by_seq, self.sessions
+            return sum(1 for seq in seqs if matches(sessions[by_seq[seq]]))
+
+    def _session_candidates(self, status: Optional[str], agent_id: Optional[str], target_binary: Optional[str]):
+        """조건에 맞을 수 있는 세션의 생성 순번 배열과 세션별 조건 검사 함수를 반환합니다."""
+        candidates = None
+        # 제거된 에이전트는 agent_sessions에 없으므로 None(전체에서 matches로 거름)으로 둔다
+        for subset in (self.agent_sessions.get(agent_id) if agent_id else None,
+                       self.index.by_target.get(target_binary, set()) if target_binary else None):
+            if subset is not None and (candidates is None or len(subset) < len(candidates)):
+                candidates = subset
+
+        def matches(session: SessionRecord) -> bool:
+            return ((status is None or session.status == status)
+                    and (agent_id is None or session.agent_id == agent_id)
+                    and (target_binary is None or session.target_binary == target_binary))
+
+        return self.index.ordered(status, candidates), matches
+
+    def _query_sessions(self, status: Optional[str], agent_id: Optional[str], target_binary: Optional[str],
+                        sort: str, cursor: Optional[str], limit: int) -> Tuple[List[SessionRecord], Optional[str]]:
+        seqs, matches = self._session_candidates(status, agent_id, target_binary)
+
+        if sort in ("newest", "oldest"):
+            page = []
+            if sort == "newest":
+                end = bisect.bisect_left(seqs, int(cursor)) if cursor else len(seqs)
+                positions = range(end - 1, -1, -1)
+            else:
+                start = bisect.bisect_right(seqs, int(cursor)) if cursor else 0
+                positions = range(start, len(seqs))
+            for position in positions:
+                session = self.sessions[self.index.by_seq[seqs[position]]]
+                if not matches(session):
+                    continue
+                if len(page) == limit:
+                    return page, str(self.index.seq_of[page[-1].id])
+                page.append(session)
+            return page, None
+
+        offset = int(cursor) if cursor else 0
+        matched = (s for s in (self.sessions[self.index.by_seq[seq]] for seq in seqs) if matches(s))
+        if sort == "updated":
+            key = lambda s: s.updated_at or s.created_at
+        else:
+            key = lambda s: s.progress.get(sort, 0)
+        top = heapq.nlargest(offset + limit + 1, matched, key=key)
+        page = top[offset:offset + limit]
+        next_cursor = str(offset + limit) if len(top) > offset + limit else None
+        return page, next_cursor
+    
+    def _forget_session(self, session_id: str) -> Optional[SessionRecord]:
+        """세션과 그에 딸린 상태를 메모리와 저장소에서 지웁니다. 세션 스트라이프 락을 잡고 부릅니다."""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                return None
+            self.index.remove(session)
+            self.counters.remove_session(session)
+            self.metrics.remove_session(session)
+            self.metrics.forget(session_id)
+            self.retention.discard(session_id)
+            self._verify_counters()
+            self.agent_sessions.get(session.agent_id, set()).discard(session_id)
+            if self.store is not None:
+                self.store.delete_session(session_id)
+        self.histories.pop(session_id, None)
+        self.crash_buckets.pop(session_id, None)
+        self.crash_hashes.pop(session_id, None)
+        self.corpus_known.pop(session_id, None)
+        return session
+
+    def cleanup_session(self, session_id: str) -> bool:
+        """세션을 정리합니다. 보관된 세션이면 보관 파일을 지웁니다."""
+        with self._session_locks(session_id):
+            removed = self._forget_session(session_id) is not None
+            if self.archive is not None and self.archive.delete(session_id):
+                removed = True
+            if not removed:
+                return False
+            self.events.publish("removed", session_id, {})
+        logger.info(f"세션 정리됨: {session_id}")
+        return True
+
+    def _session_footprint(self, session_id: str) -> int:
+        """끝난 세션이 메모리에서 차지하는 추정 바이트입니다."""
+        size = SESSION_RECORD_BYTES + len(self.crash_buckets.get(session_id, ())) * CRASH_BUCKET_BYTES
+        if session_id in self.histories:
+            size += HISTORY_BYTES
+        return size
+
+    def schedule_retention(self) -> bool:
+        """보관할 세션이 있으면 백그라운드 스레드에서 enforce_retention을 실행합니다. 스레드를 띄웠으면 True.
+
+        보관은 직렬화, 압축, 파일 쓰기를 하므로 이벤트 루프에서 부르는 곳(하트비트, 텔레메트리, 메트릭)은
+        한도 확인만 하고 이 메서드로 넘깁니다.
+        """
+        if self.archive is None:
+            return False
+        with self._lock:
+            if not self.retention.due(now_ms(), limit=1):
+                return False
+            if self._retention_thread is not None and self._retention_thread.is_alive():
+                return False
+            self._retention_thread = threading.Thread(target=self._run_retention, name="session-archiver", daemon=True)
+            self._retention_thread.start()
+        return True
+
+    def wait_for_retention(self, timeout: float = None):
+        """진행 중인 보관 스레드가 끝날 때까지 기다립니다 (종료 직전이나 검사 전에 씁니다)."""
+        thread = self._retention_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run_retention(self):
+        try:
+            while self.enforce_retention():
+                pass  # 한 번에 RETENTION_BATCH개씩, 한도 안으로 들어올 때까지
+        except Exception as e:
+            logger.error(f"세션 보관 스레드 오류: {e}")
+
+    def enforce_retention(self) -> int:
+        """보관 한도를 넘은 끝난 세션을 디스크 보관소로 옮기고 옮긴 세션 수를 반환합니다.
+
+        다른 스레드가 이미 옮기고 있으면 바로 반환합니다. 잡고 있는 세션 스트라이프 락이 없을 때 부릅니다.
+        """
+        if self.archive is None or not self._retention_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                due = self.retention.due(now_ms())
+            return sum(1 for session_id in due if self._archive_session(session_id))
+        finally:
+            self._retention_lock.release()
+
+    def _archive_session(self, session_id: str) -> bool:
+        with self._session_locks(session_id):
+            with self._lock:
+                session = self.sessions.get(session_id)
+                if session is None or session.status not in TERMINAL_STATUSES:
+                    self.retention.discard(session_id)
+                    return False
+            archived = ArchivedSession(
+                record=session,
+                history=self.histories.get(session_id),
+                crash_buckets=self.crash_buckets.get(session_id, {}),
+                classified_crashes=len(self.crash_hashes.get(session_id, ())),
+                archived_at=datetime.now().isoformat(timespec="seconds")
+            )
+            try:
+                size = self.archive.put(archived)
+            except OSError as e:
+                # 디스크에 쓸 수 없으면 메모리에 그대로 두고 다시 시도하지 않는다
+                logger.error(f"세션 보관 실패: {session_id} ({e})")
+                with self._lock:
+                    self.retention.discard(session_id)
+                return False
+            self._forget_session(session_id)
+            self.events.publish("archived", session_id, {})
+        logger.info(f"세션 보관됨: {session_id} ({size:,}바이트)")
+        return True
+
+# 전역 매니저 인스턴스
+fuzzing_manager = HybridFuzzingManager()
+
+# 로컬 에이전트용 HTTP 엔드포인트
+@app.custom_route("/register_agent", methods=["POST"])
+async def register_agent_endpoint(request: Request) -> JSONResponse:
+    """에이전트 자체 등록 요청을 처리합니다."""
+    try:
+        payload = await request.json()
+        agent_id = payload.pop("agent_id")
+        if not await asyncio.to_thread(fuzzing_manager.register_agent, agent_id, payload):
+            return JSONResponse({"error": "registration failed"}, status_code=500)
+        return JSONResponse({"agent_id": agent_id, "heartbeat_timeout": AGENT_HEARTBEAT_TIMEOUT})
+    except Exception as e:
+        logger.error(f"에이전트 등록 요청 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/heartbeat", methods=["POST"])
+async def heartbeat_endpoint(request: Request) -> JSONResponse:
+    """에이전트 하트비트를 기록합니다. 모르는 에이전트면 404로 재등록을 요청합니다."""
+    try:
+        payload = await request.json()
+        await asyncio.to_thread(fuzzing_manager.expire_stale_agents)
+        if not await asyncio.to_thread(fuzzing_manager.record_heartbeat, payload["agent_id"], payload.get("resources")):
+            return JSONResponse({"error": "unknown agent"}, status_code=404)
+        return JSONResponse({"ok": True})
+    except Exception as e:
+        logger.error(f"하트비트 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/telemetry", methods=["POST"])
+async def telemetry_endpoint(request: Request) -> JSONResponse:
+    """에이전트의 주기별 텔레메트리 묶음을 반영하고 seq로 응답합니다. 모르는 에이전트면 404로 재등록을 요청합니다."""
+    try:
+        payload = await request.json()
+        await asyncio.to_thread(fuzzing_manager.expire_stale_agents)
+        result = await asyncio.to_thread(fuzzing_manager.ingest_telemetry, payload["agent_id"], payload)
+        if result is None:
+            return JSONResponse({"error": "unknown agent"}, status_code=404)
+        return JSONResponse(result)
+    except Exception as e:
+        logger.error(f"텔레메트리 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/agent_sessions", methods=["POST"])
+async def agent_sessions_endpoint(request: Request) -> JSONResponse:
+    """에이전트에 배정된 세션 목록을 반환합니다."""
+    try:
+        payload = await request.json()
+        sessions = await asyncio.to_thread(fuzzing_manager.get_agent_sessions, payload["agent_id"])
+        return JSONResponse({"sessions": sessions})
+    except Exception as e:
+        logger.error(f"세션 목록 요청 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/session_progress", methods=["POST"])
+async def session_progress_endpoint(request: Request) -> JSONResponse:
+    """에이전트가 보낸 세션 진행 상황 델타를 반영합니다."""
+    try:
+        payload = await request.json()
+        applied = await asyncio.to_thread(fuzzing_manager.apply_agent_updates, payload["agent_id"], payload.get("updates", {}))
+        return JSONResponse({"applied": applied})
+    except Exception as e:
+        logger.error(f"진행 상황 반영 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/crash_reports", methods=["POST"])
+async def crash_reports_endpoint(request: Request) -> JSONResponse:
+    """에이전트가 보낸 크래시 시그니처를 분류하고, 업로드가 필요한 입력 목록을 돌려줍니다."""
+    try:
+        payload = await request.json()
+        result = await asyncio.to_thread(fuzzing_manager.record_crashes, payload["agent_id"], payload["session_id"],
+                                         payload.get("crashes", []))
+        return JSONResponse(result)
+    except Exception as e:
+        logger.error(f"크래시 보고 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/crash_upload", methods=["POST"])
+async def crash_upload_endpoint(request: Request) -> JSONResponse:
+    """크래시 입력 원본을 받아 내용 주소 저장소에 저장합니다."""
+    try:
+        sha256 = request.query_params["sha256"]
+        data = await request.body()
+        if len(data) > MAX_CRASH_INPUT_SIZE:
+            return JSONResponse({"error": "input too large"}, status_code=413)
+        if hashlib.sha256(data).hexdigest() != sha256:
+            return JSONResponse({"error": "sha256 mismatch"}, status_code=400)
+        await asyncio.to_thread(fuzzing_manager.crash_store.put, data)
+        return JSONResponse({"stored": sha256})
+    except Exception as e:
+        logger.error(f"크래시 입력 저장 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+def _format_sse(seq: int, kind: str, data: dict) -> str:
+    return f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.custom_route("/events", methods=["GET"])
+async def events_endpoint(request: Request) -> Response:
+    """세션 이벤트를 Server-Sent Events로 스트리밍합니다.
+
+    ?sessions=id1,id2로 세션을 고를 수 있으며(생략하면 전체), 연결 직후 선택한 세션의 현재 상태를
+    snapshot 이벤트로 보낸 뒤 status, progress(바뀐 필드만), crash, removed 이벤트를 보냅니다.
+    """
+    if len(fuzzing_manager.events) >= MAX_EVENT_SUBSCRIBERS:
+        return JSONResponse({"error": "too many subscribers"}, status_code=503)
+    selected = request.query_params.get("sessions")
+    sessions = set(filter(None, selected.split(","))) if selected else None
+    subscriber = fuzzing_manager.events.subscribe(sessions)
+
+    async def stream():
+        try:
+            snapshot = [
+                {"session_id": s.id, "status": s.status, "progress": dict(s.progress)}
+                for s in fuzzing_manager.list_sessions()
+                if sessions is None or s.id in sessions
+            ]
+            yield _format_sse(0, "snapshot", {"sessions": snapshot})
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), timeout=EVENT_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                events = fuzzing_manager.events.drain(subscriber)
+                if events:
+                    yield "".join(_format_sse(*event) for event in events)
+        finally:
+            fuzzing_manager.events.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus가 수집할 서버, 에이전트, 세션, MCP 도구 메트릭을 텍스트 형식으로 반환합니다."""
+    await asyncio.to_thread(fuzzing_manager.expire_stale_agents)
+    body = await asyncio.to_thread(lambda: fuzzing_manager.render_metrics() + tool_metrics.render())
+    return Response(body, media_type=METRICS_CONTENT_TYPE)
+
+@app.custom_route("/crash_minimized", methods=["POST"])
+async def crash_minimized_endpoint(request: Request) -> JSONResponse:
+    """에이전트가 afl-tmin으로 최소화한 크래시 입력을 받아 원본 샘플에 연결합니다."""
+    try:
+        data = await request.body()
+        if len(data) > MAX_CRASH_INPUT_SIZE:
+            return JSONResponse({"error": "input too large"}, status_code=413)
+        sha256 = request.query_params["sha256"]
+        agent_id, session_id = request.query_params["agent_id"], request.query_params["session_id"]
+        if await asyncio.to_thread(fuzzing_manager.find_sample_bucket, agent_id, session_id, sha256) is None:
+            return JSONResponse({"error": "unknown crash sample"}, status_code=404)
+        minimized = await asyncio.to_thread(fuzzing_manager.crash_store.put, data)
+        # 저장하는 동안 세션이 보관/정리됐을 수 있으므로 버킷은 락 안에서 다시 찾는다
+        if not await asyncio.to_thread(fuzzing_manager.attach_reproducer, agent_id, session_id, sha256, minimized, len(data)):
+            return JSONResponse({"error": "unknown crash sample"}, status_code=404)
+        return JSONResponse({"stored": minimized})
+    except Exception as e:
+        logger.error(f"최소화된 크래시 입력 저장 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/corpus_advertise", methods=["POST"])
+async def corpus_advertise_endpoint(request: Request) -> JSONResponse:
+    """에이전트가 가진 새 코퍼스 항목의 해시를 받고, 서버에 없는 항목만 업로드하도록 알려 줍니다."""
+    try:
+        payload = await request.json()
+        result = fuzzing_manager.advertise_corpus(payload["agent_id"], payload["session_id"], payload.get("hashes", []))
+        if result is None:
+            return JSONResponse({"error": "unknown session"}, status_code=404)
+        return JSONResponse(result)
+    except Exception as e:
+        logger.error(f"코퍼스 해시 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/corpus_upload", methods=["POST"])
+async def corpus_upload_endpoint(request: Request) -> JSONResponse:
+    """압축된 코퍼스 항목 배치를 받아 그룹 색인에 추가합니다."""
+    try:
+        session_id = request.query_params["session_id"]
+        session = fuzzing_manager.corpus_session(request.query_params["agent_id"], session_id)
+        if session is None:
+            return JSONResponse({"error": "unknown session"}, status_code=404)
+        index = fuzzing_manager.corpus_index(session.corpus)
+        blobs = unpack_corpus_batch(await request.body())
+        entries = {}
+        for blob in blobs:
+            if len(blob) <= MAX_CORPUS_ENTRY_SIZE:
+                entries.setdefault(hashlib.sha256(blob).hexdigest(), blob)
+        new_entries = [(sha256, blob) for sha256, blob in entries.items() if sha256 not in index.hashes]
+        await asyncio.to_thread(lambda: [index.store.put(blob) for _, blob in new_entries])
+        added = sum(index.add(sha256, len(blob), session_id) for sha256, blob in new_entries)
+        fuzzing_manager.corpus_known.setdefault(session_id, set()).update(entries)
+        if added:
+            logger.info(f"코퍼스 항목 추가: {session.corpus} +{added} (총 {len(index)})")
+        return JSONResponse({"added": added, "total": len(index)})
+    except Exception as e:
+        logger.error(f"코퍼스 업로드 처리 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.custom_route("/corpus_pull", methods=["POST"])
+async def corpus_pull_endpoint(request: Request) -> Response:
+    """커서 이후 다른 세션이 올린 코퍼스 항목 중 요청한 세션에 없는 것만 압축해 돌려줍니다.
+
+    다음 커서와 epoch, 항목 수는 X-Corpus-* 응답 헤더로 전달합니다.
+    """
+    try:
+        payload = await request.json()
+        session_id = payload["session_id"]
+        session = fuzzing_manager.corpus_session(payload["agent_id"], session_id)
+        if session is None:
+            return JSONResponse({"error": "unknown session"}, status_code=404)
+        index = fuzzing_manager.corpus_index(session.corpus)
+        cursor = int(payload.get("cursor", 0)) if payload.get("epoch") == index.epoch else 0
+        max_bytes = min(int(payload.get("max_bytes", MAX_CORPUS_BATCH_SIZE)), MAX_CORPUS_BATCH_SIZE)
+        known = fuzzing_manager.corpus_known.setdefault(session_id, set())
+        selected, cursor = index.since(cursor, session_id, known, max_bytes)
+        body = await asyncio.to_thread(lambda: pack_corpus_batch([index.store.get(sha256) for sha256 in selected]))
+        return Response(body, media_type="application/octet-stream", headers={
+            "X-Corpus-Cursor": str(cursor),
+            "X-Corpus-Epoch": index.epoch,
+            "X-Corpus-Entries": str(len(selected)),
+            "X-Corpus-Remaining": str(len(index) - cursor)
+        })
+    except Exception as e:
+        logger.error(f"코퍼스 전달 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+# 에이전트 코드 생성 함수들
+# 아래 코드 조각들은 생성되는 local_agent.py에 그대로 삽입됩니다.
+_AGENT_STATS_WATCHER_CODE = r'''
+# fuzzer_stats 키 -> 세션 progress 필드 (AFL++ 4.x 이름과 구버전 이름 모두 지원)
+FUZZER_STATS_FIELDS = {
+    "execs_done": ("execs_done", int),
+    "execs_per_sec": ("execs_per_sec", float),
+    "corpus_count": ("paths_total", int),
+    "paths_total": ("paths_total", int),
+    "corpus_found": ("paths_found", int),
+    "paths_found": ("paths_found", int),
+    "saved_crashes": ("crashes", int),
+    "unique_crashes": ("crashes", int),
+    "saved_hangs": ("hangs", int),
+    "unique_hangs": ("hangs", int),
+}
+
+# 인스턴스 합산 시 합계 대신 최댓값을 쓰는 필드
+MAX_AGGREGATED_FIELDS = {"paths_total"}
+
+
+def parse_stats_changes(text, previous_raw):
+    """fuzzer_stats 텍스트에서 이전과 값이 달라진 필드만 파싱합니다."""
+    changes = {}
+    for line in text.splitlines():
+        key, sep, raw = line.partition(":")
+        if not sep:
+            continue
+        key = key.strip()
+        field = FUZZER_STATS_FIELDS.get(key)
+        if field is None:
+            continue
+        raw = raw.strip()
+        if previous_raw.get(key) == raw:
+            continue
+        previous_raw[key] = raw
+        name, cast = field
+        try:
+            changes[name] = cast(raw)
+        except ValueError:
+            continue
+    return changes
+
+
+class _Inotify:
+    """ctypes 기반의 최소 inotify 래퍼 (Linux 전용)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, libc, fd):
+        self._libc = libc
+        self.fd = fd
+        self.paths = {}  # watch descriptor -> 디렉토리 경로
+
+    @classmethod
+    def create(cls):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            return None
+        self.paths[wd] = path
+        return wd
+
+    def read_events(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & self.IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            events.append((self.paths.get(wd), mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FuzzerStatsWatcher:
+    """세션 출력 디렉토리의 */fuzzer_stats를 감시하여 바뀐 필드만 델타로 만듭니다.
+
+    inotify를 쓸 수 있으면 변경 이벤트가 온 파일만 다시 읽고,
+    쓸 수 없으면 mtime 폴링으로 바뀐 파일만 다시 읽습니다.
+    """
+
+    RESCAN_INTERVAL = 30.0  # inotify 사용 시 이벤트 유실 대비 재검사 주기 (초)
+
+    def __init__(self, use_inotify=True):
+        self._inotify = _Inotify.create() if use_inotify else None
+        self._outputs = {}  # session_id -> output_dir
+        self._dir_sessions = {}  # 감시 중인 디렉토리 -> session_id
+        self._stats = {}  # session_id -> {fuzzer_stats 경로: {필드: 값}}
+        self._raw = {}  # fuzzer_stats 경로 -> {키: 원본 문자열}
+        self._mtimes = {}  # fuzzer_stats 경로 -> mtime_ns (폴링 모드)
+        self._sent = {}  # session_id -> 마지막으로 보낸 합산 값
+        self._dirty_paths = set()
+        self._dirty_sessions = set()
+        self._unwatched = set()  # 출력 디렉토리가 아직 없어 감시를 못 건 세션
+        self._last_rescan = 0.0
+
+    @property
+    def uses_inotify(self):
+        return self._inotify is not None
+
+    def attach(self, loop):
+        if self._inotify:
+            loop.add_reader(self._inotify.fd, self._on_inotify_readable)
+
+    def close(self, loop=None):
+        if self._inotify:
+            if loop:
+                loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+
+    def add_session(self, session_id, output_dir):
+        self._outputs[session_id] = output_dir
+        self._stats[session_id] = {}
+        self._sent[session_id] = {}
+        self._scan_session(session_id)
+
+    def remove_session(self, session_id):
+        output_dir = self._outputs.pop(session_id, None)
+        for path in self._stats.pop(session_id, {}):
+            self._raw.pop(path, None)
+            self._mtimes.pop(path, None)
+            self._dirty_paths.discard(path)
+        self._sent.pop(session_id, None)
+        self._dirty_sessions.discard(session_id)
+        self._unwatched.discard(session_id)
+        if output_dir:
+            for directory in [d for d, sid in self._dir_sessions.items() if sid == session_id]:
+                del self._dir_sessions[directory]
+
+    def _watch_dir(self, directory, session_id, mask):
+        if directory in self._dir_sessions:
+            return
+        if self._inotify and self._inotify.add_watch(directory, mask | _Inotify.IN_ONLYDIR) is None:
+            return
+        self._dir_sessions[directory] = session_id
+
+    def _register_instance(self, session_id, instance_dir):
+        if self._inotify:
+            self._watch_dir(instance_dir, session_id, _Inotify.IN_CLOSE_WRITE | _Inotify.IN_MOVED_TO)
+        path = os.path.join(instance_dir, "fuzzer_stats")
+        stats = self._stats[session_id]
+        if path not in stats and os.path.exists(path):
+            stats[path] = {}
+            self._raw[path] = {}
+            self._dirty_paths.add(path)
+
+    def instance_stats(self, session_id):
+        """인스턴스 디렉토리 이름 -> 마지막으로 읽은 fuzzer_stats 값 (progress 필드 이름)."""
+        return {os.path.basename(os.path.dirname(path)): dict(values)
+                for path, values in self._stats.get(session_id, {}).items()}
+
+    def mark_dirty(self, session_id):
+        """이벤트 도착 여부와 관계없이 다음 수집 때 세션의 fuzzer_stats를 모두 다시 읽게 합니다."""
+        if session_id in self._outputs:
+            self._scan_session(session_id)
+            self._dirty_paths.update(self._stats[session_id])
+
+    def _scan_session(self, session_id):
+        output_dir = self._outputs[session_id]
+        if self._inotify:
+            self._watch_dir(output_dir, session_id, _Inotify.IN_CREATE | _Inotify.IN_MOVED_TO)
+            if output_dir in self._dir_sessions:
+                self._unwatched.discard(session_id)
+            else:
+                self._unwatched.add(session_id)
+        try:
+            entries = [entry.path for entry in os.scandir(output_dir) if entry.is_dir()]
+        except OSError:
+            return
+        for instance_dir in entries:
+            self._register_instance(session_id, instance_dir)
+        if self._inotify:
+            return
+        for path in self._stats[session_id]:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if self._mtimes.get(path) != mtime:
+                self._mtimes[path] = mtime
+                self._dirty_paths.add(path)
+
+    def _on_inotify_readable(self):
+        for directory, mask, name in self._inotify.read_events():
+            if mask & _Inotify.IN_Q_OVERFLOW:
+                self._last_rescan = 0.0
+                continue
+            session_id = self._dir_sessions.get(directory)
+            if session_id is None or session_id not in self._outputs:
+                continue
+            path = os.path.join(directory, name)
+            if directory == self._outputs[session_id]:
+                if mask & _Inotify.IN_ISDIR:
+                    self._register_instance(session_id, path)
+            elif name == "fuzzer_stats":
+                stats = self._stats[session_id]
+                if path not in stats:
+                    stats[path] = {}
+                    self._raw[path] = {}
+                self._dirty_paths.add(path)
+
+    def _aggregate(self, session_id):
+        total = {}
+        for values in self._stats[session_id].values():
+            for field, value in values.items():
+                if field in MAX_AGGREGATED_FIELDS:
+                    total[field] = max(total.get(field, 0), value)
+                else:
+                    total[field] = total.get(field, 0) + value
+        if "execs_per_sec" in total:
+            total["execs_per_sec"] = round(total["execs_per_sec"], 2)
+        return total
+
+    def collect_deltas(self):
+        """바뀐 fuzzer_stats만 다시 읽고 세션별 변경 필드를 반환합니다."""
+        now = time.monotonic()
+        if not self._inotify or now - self._last_rescan >= self.RESCAN_INTERVAL:
+            for session_id in list(self._outputs):
+                self._scan_session(session_id)
+            self._last_rescan = now
+        else:
+            for session_id in list(self._unwatched):
+                self._scan_session(session_id)
+
+        path_sessions = {}
+        for session_id, stats in self._stats.items():
+            for path in stats:
+                if path in self._dirty_paths:
+                    path_sessions[path] = session_id
+        self._dirty_paths.clear()
+
+        for path, session_id in path_sessions.items():
+            try:
+                with open(path, "r", errors="replace") as f:
+                    text = f.read()
+            except OSError:
+                continue
+            changes = parse_stats_changes(text, self._raw[path])
+            if changes:
+                self._stats[session_id][path].update(changes)
+                self._dirty_sessions.add(session_id)
+
+        deltas = {}
+        for session_id in self._dirty_sessions:
+            if session_id not in self._outputs:
+                continue
+            sent = self._sent[session_id]
+            delta = {k: v for k, v in self._aggregate(session_id).items() if sent.get(k) != v}
+            if delta:
+                sent.update(delta)
+                deltas[session_id] = delta
+        self._dirty_sessions.clear()
+        return deltas
+'''
+
+_AGENT_PARALLEL_CODE = r'''
+
+class CoreAllocator:
+    """퍼저 인스턴스를 하나씩 고정할 빈 CPU 코어를 배정합니다."""
+
+    def __init__(self):
+        self.supported = hasattr(os, "sched_setaffinity")
+        if self.supported:
+            self.cores = sorted(os.sched_getaffinity(0))
+        else:
+            self.cores = list(range(os.cpu_count() or 1))
+        self._allocated = set()
+
+    @property
+    def free_count(self):
+        return len(self.cores) - len(self._allocated)
+
+    def _cores_used_by_other_fuzzers(self):
+        """다른 afl-fuzz 프로세스가 이미 단일 코어에 고정해 둔 코어를 찾습니다."""
+        busy = set()
+        try:
+            entries = [entry.name for entry in os.scandir("/proc") if entry.name.isdigit()]
+        except OSError:
+            return busy
+        for pid in entries:
+            try:
+                with open(f"/proc/{pid}/comm") as f:
+                    if f.read().strip() != "afl-fuzz":
+                        continue
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("Cpus_allowed_list:"):
+                            value = line.split(":", 1)[1].strip()
+                            if value.isdigit():
+                                busy.add(int(value))
+                            break
+            except OSError:
+                continue
+        return busy
+
+    def allocate(self, count):
+        """최대 count개의 빈 코어를 배정합니다. 고정을 지원하지 않으면 빈 목록을 반환합니다."""
+        if not self.supported:
+            return []
+        busy = self._allocated | self._cores_used_by_other_fuzzers()
+        cores = [core for core in self.cores if core not in busy][:count]
+        self._allocated.update(cores)
+        return cores
+
+    def release(self, core):
+        if core is not None:
+            self._allocated.discard(core)
+'''
+
+_AGENT_HTTP_CLIENT_CODE = r'''
+
+class ServerClient:
+    """에이전트의 모든 서버 요청이 공유하는 비동기 HTTP 클라이언트입니다.
+
+    keep-alive 연결 풀 하나 위에서 하트비트, 통계 업로드, 크래시 업로드 같은 요청이
+    이벤트 루프를 막지 않고 겹쳐서 진행되며, 동시에 진행 중인 요청 수는 세마포어로 제한합니다.
+    """
+
+    def __init__(self, server_url, max_connections=4, max_in_flight=16, timeout=10):
+        self.server_url = server_url.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session = None
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def post_bytes(self, path, data, params=None):
+        """바이너리 본문을 POST하고 상태 코드를 반환합니다."""
+        await self.open()
+        async with self._semaphore:
+            async with self._session.post(f"{self.server_url}{path}", data=data, params=params) as response:
+                await response.read()
+                return response.status
+
+    async def post_for_bytes(self, path, payload):
+        """JSON을 POST하고 (상태 코드, 응답 헤더, 바이너리 본문)을 반환합니다."""
+        await self.open()
+        async with self._semaphore:
+            async with self._session.post(f"{self.server_url}{path}", json=payload) as response:
+                return response.status, response.headers, await response.read()
+
+    async def post(self, path, payload, timeout=None):
+        """JSON을 POST하고 (상태 코드, 응답 JSON 또는 None)을 반환합니다."""
+        await self.open()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        async with self._semaphore:
+            async with self._session.post(f"{self.server_url}{path}", json=payload, timeout=request_timeout) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except (aiohttp.ContentTypeError, ValueError):
+                    data = None
+                return response.status, data
+'''
+
+_AGENT_CRASH_TRIAGE_CODE = r'''
+
+# 새니타이저 리포트 / gdb backtrace 파싱용 정규식
+SANITIZER_FRAME_RE = re.compile(r"^\s*#\d+\s+0x[0-9a-fA-F]+\s+in\s+(\S+)")
+GDB_FRAME_RE = re.compile(r"^#\d+\s+(?:0x[0-9a-fA-F]+\s+in\s+)?([^\s(]+)\s*\(")
+SANITIZER_KIND_RE = re.compile(r"(?:ERROR|SUMMARY): (\w+Sanitizer): ([\w-]+)")
+UBSAN_KIND_RE = re.compile(r"runtime error: ([a-z][a-z -]*[a-z])")
+SIGNAL_RE = re.compile(r"Program received signal (SIG\w+)")
+
+
+def parse_crash_report(text):
+    """새니타이저 리포트나 gdb 출력에서 (크래시 종류, 첫 번째 스택의 함수 목록)을 뽑습니다."""
+    kind = ""
+    match = SANITIZER_KIND_RE.search(text)
+    if match:
+        kind = f"{match.group(1)}:{match.group(2)}"
+    else:
+        match = UBSAN_KIND_RE.search(text) or SIGNAL_RE.search(text)
+        if match:
+            kind = match.group(1)
+    frames = []
+    for line in text.splitlines():
+        match = SANITIZER_FRAME_RE.match(line) or GDB_FRAME_RE.match(line)
+        if match:
+            frames.append(match.group(1))
+        elif frames and not line.strip():
+            break  # 첫 번째 스택(크래시 지점)만 사용한다
+    return kind, frames
+
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+class CrashTriager:
+    """세션의 crashes/ 디렉토리에서 새 크래시를 찾아 재현하고 스택 시그니처를 수집합니다."""
 
-app = FastMCP("afl-plus-plus-hybrid-server")
+    REPLAY_TIMEOUT = 10
+
+    def __init__(self, max_parallel=2):
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._seen = set()  # 이미 처리한 크래시 입력의 SHA-256
+        self._known_files = set()
+        self._dir_mtimes = {}  # crashes 디렉토리 -> mtime_ns (바뀐 디렉토리만 다시 읽음)
+        self.gdb = shutil.which("gdb")
+
+    def scan(self, output_dir):
+        """마지막 검사 이후 새로 생긴 크래시 파일 경로를 반환합니다."""
+        new_files = []
+        try:
+            instance_dirs = [entry.path for entry in os.scandir(output_dir) if entry.is_dir()]
+        except OSError:
+            return new_files
+        for instance_dir in instance_dirs:
+            crash_dir = os.path.join(instance_dir, "crashes")
+            try:
+                mtime = os.stat(crash_dir).st_mtime_ns
+            except OSError:
+                continue
+            if self._dir_mtimes.get(crash_dir) == mtime:
+                continue
+            self._dir_mtimes[crash_dir] = mtime
+            for entry in os.scandir(crash_dir):
+                if entry.name.startswith("id:") and entry.path not in self._known_files:
+                    self._known_files.add(entry.path)
+                    new_files.append(entry.path)
+        return new_files
+
+    async def _run(self, cmd, stdin_data, env):
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT, env=env
+        )
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(stdin_data), timeout=self.REPLAY_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return ""
+        return output.decode(errors="replace")
+
+    async def triage(self, target_binary, path):
+        """크래시 입력을 재현해 시그니처를 만듭니다. 이미 본 입력이면 None을 반환합니다."""
+        async with self._semaphore:
+            with open(path, "rb") as f:
+                data = f.read()
+            sha256 = hashlib.sha256(data).hexdigest()
+            if sha256 in self._seen:
+                return None
+            self._seen.add(sha256)
+
+            args = shlex.split(target_binary)
+            uses_file = "@@" in args
+            cmd = [path if arg == "@@" else arg for arg in args]
+            stdin_data = None if uses_file else data
+            env = dict(os.environ, ASAN_OPTIONS="symbolize=1:abort_on_error=1:detect_leaks=0",
+                       UBSAN_OPTIONS="print_stacktrace=1:halt_on_error=1")
+            kind, frames = parse_crash_report(await self._run(cmd, stdin_data, env))
+            if not frames and self.gdb:
+                # 새니타이저가 없는 빌드는 gdb backtrace로 시그니처를 만든다
+                gdb_cmd = [self.gdb, "-q", "-batch", "-ex", "run" if uses_file else f"run < {shlex.quote(path)}",
+                           "-ex", "bt", "--args"] + cmd
+                gdb_kind, frames = parse_crash_report(await self._run(gdb_cmd, None, env))
+                kind = kind or gdb_kind
+        return {"sha256": sha256, "size": len(data), "kind": kind, "frames": frames[:16], "path": path}
+'''
+
+_AGENT_CORPUS_SYNC_CODE = r'''
+
+CORPUS_SYNC_NAME = "mcp_sync"  # 서버에서 받은 항목을 두는 가상 인스턴스 이름 (AFL++가 -S 동기화로 가져감)
+MAX_CORPUS_ENTRY_SIZE = 1024 * 1024
+CORPUS_BATCH_BYTES = 4 * 1024 * 1024  # 한 번에 올리거나 받는 항목의 최대 크기 합
+CORPUS_ADVERTISE_CHUNK = 4096  # 한 번에 알리는 최대 해시 수
+
+
+def pack_corpus_batch(blobs):
+    return zlib.compress(b"".join(struct.pack(">I", len(blob)) + blob for blob in blobs))
+
+
+def unpack_corpus_batch(data):
+    raw = zlib.decompress(data)
+    blobs, offset = [], 0
+    while offset < len(raw):
+        (size,) = struct.unpack_from(">I", raw, offset)
+        offset += 4
+        blobs.append(raw[offset:offset + size])
+        offset += size
+    return blobs
+
+
+class CorpusSyncer:
+    """세션 queue/ 항목의 해시를 관리하고 서버에서 받은 항목을 가상 인스턴스 queue/에 씁니다.
+
+    로컬 인스턴스의 새 항목은 해시만 먼저 알리고 서버가 요청한 것만 올리며,
+    서버에서 받은 항목과 같은 내용은 다시 알리지 않습니다.
+    """
 
-# 전역 상태 관리
-class HybridFuzzingManager:
     def __init__(self):
-        self.agents: Dict[str, dict] = {}  # 등록된 에이전트들
-        self.sessions: Dict[str, dict] = {}  # 퍼징 세션들
-        self.agent_connections: Dict[str, bool] = {}  # 에이전트 연결 상태
-        
-    def register_agent(self, agent_id: str, agent_info: dict) -> bool:
-        """로컬 에이전트를 등록합니다."""
+        self._sessions = {}
+
+    def add_session(self, session_id, output_dir):
+        sync_queue = os.path.join(output_dir, CORPUS_SYNC_NAME, "queue")
+        next_id = 0
         try:
-            self.agents[agent_id] = {
-                "id": agent_id,
-                "info": agent_info,
-                "registered_at": datetime.now().isoformat(),
-                "last_heartbeat": datetime.now().isoformat(),
-                "status": "active"
-            }
-            self.agent_connections[agent_id] = True
-            logger.info(f"에이전트 등록됨: {agent_id}")
-            return True
-        except Exception as e:
-            logger.error(f"에이전트 등록 실패: {e}")
-            return False
-    
-    def unregister_agent(self, agent_id: str) -> bool:
-        """로컬 에이전트를 제거합니다."""
+            for name in os.listdir(sync_queue):
+                if name.startswith("id:"):
+                    next_id = max(next_id, int(name[3:9]) + 1)
+        except (OSError, ValueError):
+            pass
+        self._sessions[session_id] = {
+            "output_dir": output_dir,
+            "sync_queue": sync_queue,
+            "next_id": next_id,
+            "local": {},  # SHA-256 -> 로컬 queue 파일 경로 (서버에서 받은 항목은 None)
+            "advertised": set(),
+            "known_files": set(),
+            "dir_mtimes": {},
+            "cursor": 0,
+            "epoch": None
+        }
+
+    def remove_session(self, session_id):
+        self._sessions.pop(session_id, None)
+
+    def move_session(self, session_id, output_dir):
+        """세션 출력 디렉토리가 옮겨졌을 때 (tmpfs -> 디스크) 알린 해시와 커서는 그대로 두고 경로만 바꿉니다."""
+        state = self._sessions.get(session_id)
+        if state is None:
+            return
+        old_dir = state["output_dir"]
+        rebase = lambda path: path and os.path.join(output_dir, os.path.relpath(path, old_dir))
+        state["output_dir"] = output_dir
+        state["sync_queue"] = rebase(state["sync_queue"])
+        state["local"] = {sha256: rebase(path) for sha256, path in state["local"].items()}
+        state["known_files"] = {rebase(path) for path in state["known_files"]}
+        state["dir_mtimes"] = {}
+
+    def sessions(self):
+        return list(self._sessions)
+
+    def scan(self, session_id):
+        """인스턴스 queue/ 디렉토리에서 새 항목을 찾아 해시하고, 아직 알리지 않은 해시를 반환합니다."""
+        state = self._sessions[session_id]
         try:
-            if agent_id in self.agents:
-                del self.agents[agent_id]
-                del self.agent_connections[agent_id]
-                logger.info(f"에이전트 제거됨: {agent_id}")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"에이전트 제거 실패: {e}")
-            return False
-    
-    def create_session(self, agent_id: str, target_binary: str, input_dir: str, output_dir: str) -> str:
-        """새로운 퍼징 세션을 생성합니다."""
+            instance_dirs = [entry.path for entry in os.scandir(state["output_dir"])
+                             if entry.is_dir() and entry.name != CORPUS_SYNC_NAME]
+        except OSError:
+            instance_dirs = []
+        for instance_dir in instance_dirs:
+            queue_dir = os.path.join(instance_dir, "queue")
+            try:
+                mtime = os.stat(queue_dir).st_mtime_ns
+            except OSError:
+                continue
+            if state["dir_mtimes"].get(queue_dir) == mtime:
+                continue
+            state["dir_mtimes"][queue_dir] = mtime
+            for entry in os.scandir(queue_dir):
+                if not entry.name.startswith("id:") or entry.path in state["known_files"]:
+                    continue
+                state["known_files"].add(entry.path)
+                try:
+                    if entry.stat().st_size > MAX_CORPUS_ENTRY_SIZE:
+                        continue
+                    with open(entry.path, "rb") as f:
+                        sha256 = hashlib.sha256(f.read()).hexdigest()
+                except OSError:
+                    continue
+                state["local"].setdefault(sha256, entry.path)
+        return [sha256 for sha256 in state["local"] if sha256 not in state["advertised"]]
+
+    def mark_advertised(self, session_id, hashes):
+        state = self._sessions.get(session_id)
+        if state is not None:
+            state["advertised"].update(hashes)
+
+    def read_batches(self, session_id, hashes):
+        """업로드할 항목을 CORPUS_BATCH_BYTES 단위 배치로 나눠 읽습니다."""
+        local = self._sessions[session_id]["local"]
+        batch, total = [], 0
+        for sha256 in hashes:
+            path = local.get(sha256)
+            if path is None:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            if batch and total + len(data) > CORPUS_BATCH_BYTES:
+                yield batch
+                batch, total = [], 0
+            batch.append(data)
+            total += len(data)
+        if batch:
+            yield batch
+
+    def cursor(self, session_id):
+        """(커서, epoch)를 반환합니다. 세션이 이미 정리됐으면 None을 반환합니다."""
+        state = self._sessions.get(session_id)
+        return None if state is None else (state["cursor"], state["epoch"])
+
+    def store_pulled(self, session_id, blobs, cursor, epoch):
+        """서버에서 받은 항목을 가상 인스턴스 queue/에 쓰고 커서를 옮깁니다. 새로 쓴 항목 수를 반환합니다."""
+        state = self._sessions.get(session_id)
+        if state is None:
+            return 0
+        if state["epoch"] is not None and epoch != state["epoch"]:
+            # 서버가 색인을 다시 만들었으면 가진 항목을 처음부터 다시 알린다
+            state["advertised"].clear()
+        state["epoch"] = epoch
+        os.makedirs(state["sync_queue"], exist_ok=True)
+        written = 0
+        for blob in blobs:
+            sha256 = hashlib.sha256(blob).hexdigest()
+            if sha256 in state["local"]:
+                continue
+            path = os.path.join(state["sync_queue"], f"id:{state['next_id']:06d},sync:{CORPUS_SYNC_NAME}")
+            tmp_path = os.path.join(state["sync_queue"], f".{state['next_id']:06d}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            state["next_id"] += 1
+            state["local"][sha256] = None
+            state["advertised"].add(sha256)
+            written += 1
+        state["cursor"] = cursor
+        return written
+'''
+
+_AGENT_CMIN_CODE = r'''
+
+CMIN_DIR_NAME = ".cmin"  # 출력 디렉토리 안에서 최소화 결과를 두는 곳 (queue/가 없으므로 AFL++ 동기화 대상이 아님)
+MAX_SEED_SIZE = 1024 * 1024  # AFL++가 받아들이는 최대 입력 크기
+
+
+def parse_showmap_trace(text):
+    """afl-showmap 출력("edge:count" 줄)을 (edge << 8 | count) 정수 배열로 바꿉니다."""
+    trace = array("Q")
+    for line in text.split():
+        edge, _, count = line.partition(":")
+        trace.append(int(edge) << 8 | int(count or 1))
+    return trace
+
+
+def select_minimal(entries):
+    """(크기, SHA-256, 트레이스 바이트) 목록에서 커버리지를 유지하는 최소 입력 집합을 고릅니다.
+
+    afl-cmin과 같이 각 튜플을 가진 입력 중 가장 작은 것을 남깁니다. 작은 입력부터 보면서
+    앞서 본 입력들에 없던 튜플이 하나라도 있는 입력만 남기는 것과 같습니다.
+    """
+    covered = set()
+    kept = []
+    for size, sha256, blob in sorted(entries):
+        trace = array("Q")
+        trace.frombytes(blob)
+        new = set(trace)
+        new.difference_update(covered)
+        if new:
+            covered.update(new)
+            kept.append(sha256)
+    return kept
+
+
+class TraceCache:
+    """afl-showmap 결과를 (타겟, 입력 SHA-256) 키로 보관하는 SQLite 캐시입니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS traces ("
+                "target TEXT NOT NULL, sha256 TEXT NOT NULL, trace BLOB NOT NULL, "
+                "PRIMARY KEY (target, sha256))"
+            )
+        return self._conn
+
+    def get_many(self, target, hashes):
+        result = {}
+        db = self._db()
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = db.execute(
+                f"SELECT sha256, trace FROM traces WHERE target = ? AND sha256 IN ({','.join('?' * len(chunk))})",
+                [target, *chunk]
+            )
+            result.update(rows)
+        return result
+
+    def put_many(self, target, items):
+        with self._db() as db:
+            db.executemany("INSERT OR REPLACE INTO traces VALUES (?, ?, ?)",
+                           [(target, sha256, blob) for sha256, blob in items])
+
+
+class CorpusMinimizer:
+    """afl-cmin처럼 입력 코퍼스를 커버리지 기준으로 최소화합니다.
+
+    입력을 샤드로 나눠 샤드마다 afl-showmap -i 배치 모드를 빈 코어에 하나씩 고정해 동시에 돌리고,
+    트레이스를 입력 내용 해시로 캐시하므로 같은 입력은 다시 실행하지 않습니다.
+    """
+
+    SHARD_SIZE = 256
+    SHOWMAP_TIMEOUT_MS = 5000
+
+    def __init__(self, cache, afl_showmap="afl-showmap"):
+        self.cache = cache
+        self.afl_showmap = afl_showmap
+
+    @staticmethod
+    def _target_key(target_binary):
+        """타겟 실행 파일 내용과 인자로 캐시 키를 만듭니다. 바이너리가 바뀌면 캐시도 바뀝니다."""
+        args = shlex.split(target_binary)
+        digest = hashlib.sha256(" ".join(args).encode())
+        path = shutil.which(args[0]) or args[0]
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _collect_inputs(source_dirs):
+        """입력 파일을 내용 해시로 중복 제거합니다. SHA-256 -> (크기, 경로)"""
+        seeds = {}
+        for source_dir in source_dirs:
+            for root, dirs, files in os.walk(source_dir):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                for name in files:
+                    if name.startswith("."):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        size = os.path.getsize(path)
+                        if size == 0 or size > MAX_SEED_SIZE:
+                            continue
+                        with open(path, "rb") as f:
+                            sha256 = hashlib.sha256(f.read()).hexdigest()
+                    except OSError:
+                        continue
+                    seeds.setdefault(sha256, (size, path))
+        return seeds
+
+    @staticmethod
+    def _stage_shard(seeds, shard, shard_in, shard_out):
+        os.makedirs(shard_in)
+        os.makedirs(shard_out)
+        for sha256 in shard:
+            source, target = seeds[sha256][1], os.path.join(shard_in, sha256)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+
+    @staticmethod
+    def _read_traces(shard, shard_out):
+        traces = {}
+        for sha256 in shard:
+            try:
+                with open(os.path.join(shard_out, sha256)) as f:
+                    traces[sha256] = parse_showmap_trace(f.read()).tobytes()
+            except OSError:
+                traces[sha256] = b""  # 크래시/타임아웃 입력은 트레이스가 없고 최소화 결과에서 빠진다
+        return traces
+
+    async def _trace_shard(self, target_binary, shard_in, shard_out, core):
+        cmd = [self.afl_showmap, "-i", shard_in, "-o", shard_out, "-m", "none",
+               "-t", str(self.SHOWMAP_TIMEOUT_MS), "-q", "--"] + shlex.split(target_binary)
+        preexec_fn = (lambda: os.sched_setaffinity(0, {core})) if core is not None else None
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            env=dict(os.environ, AFL_NO_AFFINITY="1"), preexec_fn=preexec_fn
+        )
         try:
-            session_id = str(uuid.uuid4())
-            self.sessions[session_id] = {
-                "id": session_id,
-                "agent_id": agent_id,
-                "target_binary": target_binary,
-                "input_dir": input_dir,
-                "output_dir": output_dir,
-                "status": "created",
-                "created_at": datetime.now().isoformat(),
-                "progress": {
-                    "execs_done": 0,
-                    "execs_per_sec": 0,
-                    "paths_total": 0,
-                    "paths_found": 0,
-                    "crashes": 0,
-                    "hangs": 0
-                }
-            }
-            logger.info(f"세션 생성됨: {session_id}")
-            return session_id
-        except Exception as e:
-            logger.error(f"세션 생성 실패: {e}")
-            return None
-    
-    def update_session_status(self, session_id: str, status: str, progress: dict = None):
-        """세션 상태를 업데이트합니다."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["status"] = status
-            if progress:
-                self.sessions[session_id]["progress"].update(progress)
-            self.sessions[session_id]["updated_at"] = datetime.now().isoformat()
-            logger.info(f"세션 상태 업데이트: {session_id} -> {status}")
-    
-    def get_session(self, session_id: str) -> Optional[dict]:
-        """세션 정보를 반환합니다."""
-        return self.sessions.get(session_id)
-    
-    def list_sessions(self) -> List[dict]:
-        """모든 세션 목록을 반환합니다."""
-        return list(self.sessions.values())
-    
-    def cleanup_session(self, session_id: str) -> bool:
-        """세션을 정리합니다."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            logger.info(f"세션 정리됨: {session_id}")
-            return True
-        return False
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            # 계측 없는 타겟, 잘못된 옵션, 라이브러리 누락 등 도구 자체의 실패. 트레이스가 없다고 캐시하면
+            # 이 바이너리의 모든 입력이 크래시로 취급되므로 샤드 전체를 실패로 처리한다
+            message = stderr.decode(errors="replace").strip().splitlines()
+            raise RuntimeError(f"afl-showmap 실패 (종료 코드 {process.returncode}): {message[-1] if message else ''}")
 
-# 전역 매니저 인스턴스
-fuzzing_manager = HybridFuzzingManager()
+    @staticmethod
+    def _write_output(seeds, kept, dest_dir):
+        if not kept:
+            return  # 남길 입력이 없으면 이전 결과를 빈 디렉토리로 덮어쓰지 않는다
+        if os.path.isdir(dest_dir):
+            shutil.rmtree(dest_dir)
+        os.makedirs(dest_dir)
+        for sha256 in kept:
+            shutil.copyfile(seeds[sha256][1], os.path.join(dest_dir, sha256[:16]))
 
-# 에이전트 코드 생성 함수들
-def generate_linux_agent(agent_name: str, server_url: str) -> str:
-    """Linux용 에이전트 코드 생성"""
-    return f'''#!/usr/bin/env python3
-"""
-{agent_name} - Linux용 AFL++ 로컬 에이전트
-자동 생성된 에이전트입니다.
-"""
+    async def minimize(self, target_binary, source_dirs, dest_dir, cores, on_progress):
+        """source_dirs의 입력을 최소화해 dest_dir에 쓰고 cmin_* 통계를 반환합니다.
 
-import asyncio
-import json
-import logging
-import signal
-import sys
-import uuid
-import subprocess
-import os
-import requests
-from pathlib import Path
+        cores에 든 코어 수만큼 샤드를 동시에 실행하며, 진행 상황은 샤드가 끝날 때마다 on_progress로 알립니다.
+        """
+        seeds = await asyncio.to_thread(self._collect_inputs, source_dirs)
+        target = await asyncio.to_thread(self._target_key, target_binary)
+        traces = await asyncio.to_thread(self.cache.get_many, target, list(seeds))
+        stats = {"cmin_total": len(seeds), "cmin_done": len(traces), "cmin_cached": len(traces), "cmin_kept": 0}
+        on_progress(dict(stats))
 
-class LocalAgent:
-    def __init__(self, server_url: str, agent_id: str = None):
-        self.server_url = server_url
-        self.agent_id = agent_id or str(uuid.uuid4())
-        self.afl_process = None
-        self.running_sessions = {{}}
-        self.shutdown_event = asyncio.Event()
-        
-        # 시그널 핸들러
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
-    
-    def _signal_handler(self, signum, frame):
-        logging.info(f"시그널 {{signum}} 수신, 종료 중...")
-        self.shutdown_event.set()
-    
-    async def start(self):
+        pending = [sha256 for sha256 in seeds if sha256 not in traces]
+        free_cores = asyncio.Queue()
+        for core in cores or [None]:
+            free_cores.put_nowait(core)
+        os.makedirs(os.path.dirname(dest_dir), exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="shards-", dir=os.path.dirname(dest_dir))
+
+        async def run_shard(index, shard):
+            shard_in = os.path.join(work_dir, f"{index}.in")
+            shard_out = os.path.join(work_dir, f"{index}.out")
+            await asyncio.to_thread(self._stage_shard, seeds, shard, shard_in, shard_out)
+            core = await free_cores.get()
+            try:
+                await self._trace_shard(target_binary, shard_in, shard_out, core)
+            finally:
+                free_cores.put_nowait(core)
+            result = await asyncio.to_thread(self._read_traces, shard, shard_out)
+            await asyncio.to_thread(self.cache.put_many, target, result.items())
+            traces.update(result)
+            stats["cmin_done"] += len(shard)
+            on_progress(dict(stats))
+
+        tasks = [asyncio.ensure_future(run_shard(index, pending[start:start + self.SHARD_SIZE]))
+                 for index, start in enumerate(range(0, len(pending), self.SHARD_SIZE))]
         try:
-            logging.info(f"에이전트 시작: {{self.agent_id}}")
-            
-            # AFL++ 설치 확인
-            self._check_afl_installation()
-            
-            # 서버에 등록
-            await self._register_with_server()
-            
-            # 메인 루프
-            await self._main_loop()
-            
-        except Exception as e:
-            logging.error(f"에이전트 실행 오류: {{e}}")
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # 한 샤드가 실패하면 나머지 afl-showmap도 멈춘 뒤 작업 디렉토리를 지운다
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
         finally:
-            await self._cleanup()
-    
-    def _check_afl_installation(self):
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+        kept = await asyncio.to_thread(
+            select_minimal, [(seeds[sha256][0], sha256, traces.get(sha256, b"")) for sha256 in seeds]
+        )
+        await asyncio.to_thread(self._write_output, seeds, kept, dest_dir)
+        stats["cmin_kept"] = len(kept)
+        on_progress(dict(stats))
+        return stats
+'''
+
+_AGENT_TMIN_CODE = r'''
+
+class TminFarm:
+    """크래시 입력을 afl-tmin으로 최소화하는 우선순위 작업 큐입니다.
+
+    작업마다 퍼저가 쓰지 않는 빈 코어를 하나씩 배정해 고정하므로 동시에 도는 작업 수는
+    빈 코어 수를 넘지 않습니다. 결과는 입력 내용 해시로 캐시해 같은 입력은 다시 최소화하지 않습니다.
+    """
+
+    JOB_TIMEOUT = 300  # 작업 하나의 최대 실행 시간 (초)
+    EXEC_TIMEOUT_MS = 5000
+
+    def __init__(self, core_allocator, cache_dir="tmin_cache", afl_tmin="afl-tmin"):
+        self.core_allocator = core_allocator
+        self.cache_dir = cache_dir
+        self.afl_tmin = afl_tmin
+        self._queue = []  # (우선순위, 순번, 작업) 힙
+        self._queued = set()  # 대기/실행 중인 입력의 SHA-256
+        self._failed = set()  # 시간 초과 등으로 최소화하지 못한 입력
+        self._seq = 0
+        self._running = {}  # asyncio.Task -> 작업
+        self._results = []  # (작업, 최소화된 입력)
+
+    def submit(self, priority, session_id, target_binary, path, sha256):
+        if sha256 in self._queued or sha256 in self._failed:
+            return
+        self._queued.add(sha256)
+        self._seq += 1
+        job = {"session_id": session_id, "target_binary": target_binary, "path": path, "sha256": sha256,
+               "priority": priority}
+        heapq.heappush(self._queue, (priority, self._seq, job))
+
+    def pending(self, session_id):
+        return sum(1 for job in self._iter_jobs() if job["session_id"] == session_id)
+
+    def rebase_paths(self, rebase):
+        """대기 중인 작업의 입력 경로를 rebase(경로)로 바꿉니다 (세션 출력 디렉토리를 옮길 때)."""
+        for _, _, job in self._queue:
+            job["path"] = rebase(job["path"])
+
+    def _iter_jobs(self):
+        yield from (job for _, _, job in self._queue)
+        yield from self._running.values()
+
+    def start_ready(self):
+        """빈 코어가 있는 만큼 우선순위가 높은 작업부터 시작합니다."""
+        while self._queue:
+            cores = self.core_allocator.allocate(1)
+            if not cores:
+                if self.core_allocator.supported or self._running:
+                    return
+                cores = [None]  # 코어 고정을 지원하지 않으면 한 번에 하나씩 실행한다
+            _, _, job = heapq.heappop(self._queue)
+            task = asyncio.create_task(self._run_job(job, cores[0]))
+            self._running[task] = job
+
+    def drain_results(self):
+        results, self._results = self._results, []
+        return results
+
+    async def close(self):
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _minimize(self, job, core, output_path):
+        cmd = [self.afl_tmin, "-i", job["path"], "-o", output_path, "-m", "none",
+               "-t", str(self.EXEC_TIMEOUT_MS), "--"] + shlex.split(job["target_binary"])
+        preexec_fn = (lambda: os.sched_setaffinity(0, {core})) if core is not None else None
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+            env=dict(os.environ, AFL_NO_AFFINITY="1"), preexec_fn=preexec_fn
+        )
         try:
-            subprocess.run(["afl-fuzz", "--help"], capture_output=True, check=True)
-            logging.info("AFL++ 설치 확인됨")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError("AFL++가 설치되지 않았습니다. 'sudo apt-get install afl++' 또는 'brew install afl-plus-plus'로 설치하세요.")
-    
-    async def _register_with_server(self):
+            await asyncio.wait_for(process.wait(), timeout=self.JOB_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode == 0 and os.path.exists(output_path)
+
+    async def _run_job(self, job, core):
+        sha256 = job["sha256"]
+        cached = os.path.join(self.cache_dir, sha256)
         try:
-            response = requests.post(
-                f"{{self.server_url}}/register_agent",
-                json={{
-                    "agent_id": self.agent_id,
-                    "platform": "linux",
-                    "capabilities": ["afl_fuzzing"]
-                }},
-                timeout=10
-            )
-            if response.status_code == 200:
-                logging.info("서버에 등록 성공")
-            else:
-                logging.warning("서버 등록 실패")
-        except Exception as e:
-            logging.warning(f"서버 등록 실패: {{e}}")
-    
-    async def _main_loop(self):
-        while not self.shutdown_event.is_set():
-            try:
-                # 간단한 하트비트
-                await self._send_heartbeat()
-                await asyncio.sleep(30)
-            except Exception as e:
-                logging.error(f"메인 루프 오류: {{e}}")
-                await asyncio.sleep(5)
-    
-    async def _send_heartbeat(self):
+            if not os.path.exists(cached):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cached}.tmp"
+                try:
+                    minimized = await self._minimize(job, core, tmp_path)
+                except asyncio.TimeoutError:
+                    logging.warning(f"afl-tmin 시간 초과 ({self.JOB_TIMEOUT}초): {job['path']}")
+                    minimized = False
+                if not minimized:
+                    self._failed.add(sha256)
+                    return
+                os.replace(tmp_path, cached)
+            with open(cached, "rb") as f:
+                self._results.append((job, f.read()))
+        except OSError as e:
+            logging.warning(f"afl-tmin 실행 실패 ({job['path']}): {e}")
+            self._failed.add(sha256)
+        finally:
+            self.core_allocator.release(core)
+            self._queued.discard(sha256)
+            self._running.pop(asyncio.current_task(), None)
+'''
+
+_AGENT_HARNESS_CODE = r'''
+
+# AFL++ 컴파일러가 바이너리에 넣는 표식 (afl-fuzz도 같은 문자열로 실행 방식을 정함)
+PERSISTENT_SIGNATURES = (b"##SIG_AFL_PERSISTENT##", b"__AFL_PERSISTENT")
+DEFERRED_SIGNATURES = (b"##SIG_AFL_DEFER_FORKSRV##", b"__AFL_DEFER_FORKSRV")
+INSTRUMENTED_SIGNATURES = (b"__AFL_SHM_ID", b"__afl_area_ptr")
+HARNESS_SCAN_CHUNK = 4 * 1024 * 1024
+
+def _target_path(target_binary):
+    argv = shlex.split(target_binary)
+    if not argv:
+        return None
+    path = argv[0]
+    return path if os.sep in path else (shutil.which(path) or path)
+
+def scan_harness_signatures(path):
+    """바이너리를 청크 단위로 읽으며 찾은 시그니처 묶음 이름(persistent, deferred, instrumented)의 집합을 반환합니다."""
+    groups = {"persistent": PERSISTENT_SIGNATURES, "deferred": DEFERRED_SIGNATURES,
+              "instrumented": INSTRUMENTED_SIGNATURES}
+    overlap = max(len(sig) for sigs in groups.values() for sig in sigs) - 1
+    found = set()
+    tail = b""
+    with open(path, "rb") as f:
+        while len(found) < len(groups):
+            chunk = f.read(HARNESS_SCAN_CHUNK)
+            if not chunk:
+                break
+            window = tail + chunk
+            for name, sigs in groups.items():
+                if name not in found and any(sig in window for sig in sigs):
+                    found.add(name)
+            tail = window[-overlap:]
+    return found
+
+class HarnessDetector:
+    """타겟 바이너리가 persistent 모드, 지연 포크서버, 일반 포크서버 중 무엇으로 빌드되었는지 판별합니다.
+
+    계측 표식이 없으면 uninstrumented, 파일을 읽을 수 없으면 unknown입니다. 결과는 (경로, 크기, mtime)으로 캐시합니다.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def detect(self, target_binary):
+        path = _target_path(target_binary)
         try:
-            requests.post(
-                f"{{self.server_url}}/heartbeat",
-                json={{"agent_id": self.agent_id}},
-                timeout=5
-            )
-        except Exception:
-            pass
-    
-    async def _cleanup(self):
-        if self.afl_process:
-            self.afl_process.terminate()
-        logging.info("에이전트 정리 완료")
+            stat = os.stat(path)
+            key = (path, stat.st_size, stat.st_mtime_ns)
+            mode = self._cache.get(key)
+            if mode is None:
+                found = scan_harness_signatures(path)
+                if "persistent" in found:
+                    mode = "persistent"
+                elif "deferred" in found:
+                    mode = "deferred"
+                elif "instrumented" in found:
+                    mode = "forkserver"
+                else:
+                    mode = "uninstrumented"
+                self._cache[key] = mode
+            return mode
+        except (OSError, TypeError):
+            return "unknown"
+'''
 
-async def main():
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="AFL++ 로컬 에이전트")
-    parser.add_argument("--server-url", required=True, help="서버 URL")
-    parser.add_argument("--agent-id", help="에이전트 ID")
-    
-    args = parser.parse_args()
-    
-    logging.basicConfig(level=logging.INFO)
-    
-    agent = LocalAgent(args.server_url, args.agent_id)
-    await agent.start()
+_AGENT_TMPFS_CODE = r'''
 
-if __name__ == "__main__":
-    asyncio.run(main())
+# 체크포인트하지 않는 파일 (AFL_TMPDIR을 무시하는 구버전이 출력 디렉토리에 쓰는 실행마다 바뀌는 입력)
+CHECKPOINT_SKIP_NAMES = {".cur_input"}
+
+def default_tmpfs_root():
+    """RAM 기반 작업 디렉토리를 둘 수 있는 경로(/dev/shm)를 반환합니다. 없거나 쓸 수 없으면 None."""
+    root = "/dev/shm"
+    return root if os.path.isdir(root) and os.access(root, os.W_OK) else None
+
+def process_write_bytes(pid):
+    """/proc/<pid>/io의 wchar(프로세스가 write 계열 호출로 쓴 바이트 수)를 읽습니다. 읽을 수 없으면 None."""
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+def stop_process(process, timeout=10):
+    """SIGTERM을 보내 종료를 기다리고, 시간 안에 끝나지 않으면 SIGKILL합니다."""
+    if process.poll() is None:
+        process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def _walk_files(directory):
+    """디렉토리 아래의 일반 파일 항목을 재귀적으로 나열합니다 (심볼릭 링크는 따라가지 않음)."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_files(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry
+
+class RamWorkdir:
+    """세션의 AFL++ 출력 디렉토리와 AFL_TMPDIR을 tmpfs에 두고, 바뀐 파일만 원래 출력 디렉토리로 체크포인트합니다.
+
+    체크포인트는 (크기, mtime)이 마지막으로 복사한 때와 다른 파일만 임시 파일에 쓴 뒤 os.replace로 바꾸므로
+    원래 출력 디렉토리에는 항상 완전한 파일만 있습니다. tmpfs에서 지워진 파일은 원래 출력 디렉토리에 남겨 둡니다.
+    """
+
+    def __init__(self, session_id, durable_dir, root, cap_bytes):
+        self.path = os.path.join(root, "afl-mcp", session_id)
+        self.output_dir = os.path.join(self.path, "out")
+        self.tmp_dir = os.path.join(self.path, "tmp")  # AFL_TMPDIR (.cur_input 등 실행마다 쓰는 파일)
+        self.durable_dir = durable_dir
+        self.cap_bytes = cap_bytes
+        self.used_bytes = 0
+        self.checkpoint_bytes = 0  # 원래 출력 디렉토리로 복사한 누적 바이트
+        self.errors = 0  # 마지막 체크포인트에서 복사하지 못한 파일 수
+        self._copied = {}  # 출력 디렉토리 기준 상대 경로 -> 마지막으로 복사한 (크기, mtime_ns)
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """작업 디렉토리를 만들고 원래 출력 디렉토리의 이전 결과를 복원합니다 (AFL_AUTORESUME으로 이어서 퍼징).
+
+        tmpfs 여유 공간이나 한도가 이전 결과를 담기에 부족하면 False를 반환합니다.
+        """
+        previous = [(os.path.relpath(entry.path, self.durable_dir), entry.stat(follow_symlinks=False).st_size)
+                    for entry in _walk_files(self.durable_dir) if not entry.name.endswith(".ckpt-tmp")]
+        total = sum(size for _, size in previous)
+        root = os.path.dirname(os.path.dirname(self.path))
+        if total >= self.cap_bytes or shutil.disk_usage(root).free < self.cap_bytes:
+            return False
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        for rel, _ in previous:
+            dest = os.path.join(self.output_dir, rel)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(os.path.join(self.durable_dir, rel), dest)
+            stat = os.stat(dest)
+            self._copied[rel] = (stat.st_size, stat.st_mtime_ns)
+        self.used_bytes = total
+        return True
+
+    def checkpoint(self):
+        """바뀐 파일을 원래 출력 디렉토리로 복사하고 이번에 복사한 바이트 수를 반환합니다 (스레드에서 호출)."""
+        with self._lock:
+            copied = used = errors = 0
+            prefix = self.output_dir + os.sep
+            for entry in _walk_files(self.path):
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue  # 그 사이 AFL++가 지운 파일
+                used += stat.st_size
+                if entry.name in CHECKPOINT_SKIP_NAMES or not entry.path.startswith(prefix):
+                    continue
+                rel = entry.path[len(prefix):]
+                key = (stat.st_size, stat.st_mtime_ns)
+                if self._copied.get(rel) == key:
+                    continue
+                try:
+                    copied += self._copy(entry.path, os.path.join(self.durable_dir, rel))
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logging.warning(f"체크포인트 실패 ({entry.path}): {e}")
+                    errors += 1
+                    continue
+                self._copied[rel] = key
+            self.used_bytes = used
+            self.checkpoint_bytes += copied
+            self.errors = errors
+            return copied
+
+    @staticmethod
+    def _copy(src, dest):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp_path = f"{dest}.ckpt-tmp"
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dest)
+        return os.path.getsize(dest)
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self.path))
+        except OSError:
+            pass  # 다른 세션의 작업 디렉토리가 남아 있음
 '''
 
-def generate_macos_agent(agent_name: str, server_url: str) -> str:
-    """macOS용 에이전트 코드 생성"""
-    return f'''#!/usr/bin/env python3
-"""
-{agent_name} - macOS용 AFL++ 로컬 에이전트
-자동 생성된 에이전트입니다.
-"""
+_AGENT_SCHEDULE_CODE = r'''
 
-import asyncio
-import json
-import logging
-import signal
-import sys
-import uuid
-import subprocess
-import os
-import requests
-from pathlib import Path
+# 적응형 세션의 보조 인스턴스에 배정하는 설정: AFL++ 파워 스케줄(-p) x 변이기(-L 0은 MOpt)
+SCHEDULE_ARMS = {
+    "fast": ["-p", "fast"],
+    "explore": ["-p", "explore"],
+    "exploit": ["-p", "exploit"],
+    "coe": ["-p", "coe"],
+    "rare": ["-p", "rare"],
+    "seek": ["-p", "seek"],
+    "fast+mopt": ["-p", "fast", "-L", "0"],
+    "explore+mopt": ["-p", "explore", "-L", "0"],
+}
+
+class ScheduleBandit:
+    """보조 인스턴스의 설정을 고르는 discounted Thompson sampling입니다.
+
+    설정마다 새 경로 발견을 CPU 시간에 대한 포아송 과정으로 보고 감마 사후분포를 둡니다. 라운드마다 이전 관측을
+    DISCOUNT만큼 줄여 퍼징이 진행되며 바뀌는 효율을 따라가고, 보조 인스턴스마다 사후분포에서 뽑은 값이 가장 큰
+    설정을 배정하므로 새 경로를 빨리 찾는 설정일수록 더 많은 코어를 받습니다.
+    사전분포의 평균은 모든 설정을 합친 최근 효율이라, 밀려난 설정도 관측이 줄어들수록 다시 뽑힐 기회를 얻습니다.
+    """
+
+    PRIOR_PATHS = 1.0
+    PRIOR_SECONDS = 600.0  # 관측이 전혀 없을 때의 효율: CPU 10분에 새 경로 1개
+    PRIOR_WEIGHT = 300.0  # 설정별 사전분포의 강도 (CPU 초, 라운드 하나 정도)
+    DISCOUNT = 0.8
+    HISTORY = 20  # 설정마다 보관하는 최근 보상 수
+
+    def __init__(self, arms=None, rng=None):
+        self.rng = rng or random.Random()
+        self.arms = {
+            name: {"recent_paths": 0.0, "recent_seconds": 0.0, "pulls": 0, "paths": 0,
+                   "cpu_seconds": 0.0, "execs": 0, "history": []}
+            for name in (arms or SCHEDULE_ARMS)
+        }
+
+    def initial(self, count):
+        """처음에는 설정을 돌아가며 배정해 가능한 한 많은 설정을 관측합니다."""
+        names = list(self.arms)
+        return [names[index % len(names)] for index in range(count)]
+
+    def decay(self):
+        for arm in self.arms.values():
+            arm["recent_paths"] *= self.DISCOUNT
+            arm["recent_seconds"] *= self.DISCOUNT
+
+    def _posteriors(self):
+        """설정 이름 -> 감마 사후분포의 (shape, rate)"""
+        paths = sum(arm["recent_paths"] for arm in self.arms.values())
+        seconds = sum(arm["recent_seconds"] for arm in self.arms.values())
+        prior_rate = (paths + self.PRIOR_PATHS) / (seconds + self.PRIOR_SECONDS)
+        return {name: (prior_rate * self.PRIOR_WEIGHT + arm["recent_paths"], self.PRIOR_WEIGHT + arm["recent_seconds"])
+                for name, arm in self.arms.items()}
+
+    def update(self, name, paths, cpu_seconds, execs):
+        """인스턴스 하나가 한 라운드 동안 설정 name으로 찾은 새 경로 수와 쓴 CPU 시간을 반영합니다."""
+        arm = self.arms[name]
+        arm["recent_paths"] += paths
+        arm["recent_seconds"] += cpu_seconds
+        arm["pulls"] += 1
+        arm["paths"] += paths
+        arm["cpu_seconds"] += cpu_seconds
+        arm["execs"] += execs
+        arm["history"] = (arm["history"] + [round(paths / cpu_seconds * 3600, 1)])[-self.HISTORY:]
+
+    def choose(self, current):
+        """current(인스턴스 이름 -> 설정)의 새 배정을 반환합니다. 뽑힌 설정을 이미 쓰는 인스턴스는 다시 띄우지 않도록 그대로 둡니다."""
+        posteriors = self._posteriors()
+        draws = []
+        for _ in current:
+            samples = {name: self.rng.gammavariate(shape, 1 / rate) for name, (shape, rate) in posteriors.items()}
+            draws.append(max(samples, key=samples.get))
+        assignment = {}
+        for instance, name in current.items():
+            if name in draws:
+                draws.remove(name)
+                assignment[instance] = name
+        for instance in current:
+            if instance not in assignment:
+                assignment[instance] = draws.pop()
+        return assignment
+
+    def snapshot(self, assignment):
+        """서버에 보고하는 설정별 통계입니다. score는 사후 평균 (경로/CPU시간)입니다."""
+        instances = {}
+        for instance, name in sorted(assignment.items()):
+            instances.setdefault(name, []).append(instance)
+        posteriors = self._posteriors()
+        return [
+            {"arm": name, "args": " ".join(SCHEDULE_ARMS.get(name, ())), "instances": instances.get(name, []),
+             "pulls": arm["pulls"], "paths": arm["paths"], "cpu_seconds": round(arm["cpu_seconds"], 1),
+             "execs": arm["execs"], "score": round(posteriors[name][0] / posteriors[name][1] * 3600, 1),
+             "history": arm["history"]}
+            for name, arm in self.arms.items()
+        ]
+'''
+
+_AGENT_CORE_CODE = r'''
 
 class LocalAgent:
-    def __init__(self, server_url: str, agent_id: str = None):
+    STATS_INTERVAL = 2  # 텔레메트리(하트비트, 자원 정보, fuzzer_stats 델타, 크래시 시그니처) 전송 주기 (초)
+    SESSION_SYNC_INTERVAL = 5  # 서버 세션 목록 동기화 주기 (초)
+    CRASH_INTERVAL = 10  # 새 크래시 분류 주기 (초)
+    CRASH_BATCH_SIZE = 256  # 한 주기에 재현/보고하는 최대 크래시 수 (세션별)
+    CORPUS_SYNC_INTERVAL = 30  # 에이전트 간 코퍼스 동기화 주기 (초)
+    CORPUS_PULL_ROUNDS = 8  # 한 주기에 세션별로 받아 오는 최대 배치 수
+    CMIN_CHECK_INTERVAL = 60  # 실행 중 큐 재최소화 시점 확인 주기 (초)
+    TMIN_INTERVAL = 5  # afl-tmin 작업 배정/결과 업로드 주기 (초)
+    CHECKPOINT_INTERVAL = 60  # tmpfs 작업 디렉토리를 원래 출력 디렉토리로 체크포인트하는 주기 (초)
+    SCHEDULE_INTERVAL = 300  # 적응형 세션의 보조 인스턴스 설정을 다시 고르는 주기 (초)
+
+    def __init__(self, server_url: str, agent_id: str = None, afl_fuzz: str = "afl-fuzz",
+                 afl_showmap: str = "afl-showmap", afl_tmin: str = "afl-tmin", tmpfs_root: str = None):
         self.server_url = server_url
         self.agent_id = agent_id or str(uuid.uuid4())
-        self.afl_process = None
-        self.running_sessions = {{}}
+        self.client = ServerClient(server_url)
+        self.afl_fuzz = afl_fuzz
+        self.running_sessions = {}
+        self.core_allocator = CoreAllocator()
+        self.stats_watcher = FuzzerStatsWatcher()
+        self.crash_triager = CrashTriager()
+        self.corpus_syncer = CorpusSyncer()
+        self.minimizer = CorpusMinimizer(TraceCache(os.path.join("cmin_cache", "traces.db")), afl_showmap)
+        self._minimize_tasks = {}  # session_id -> 퍼징 전 최소화 작업
+        self.tmin_farm = TminFarm(self.core_allocator, afl_tmin=afl_tmin)
+        self.harness_detector = HarnessDetector()
+        self.tmpfs_root = tmpfs_root  # tmpfs_mb 세션의 작업 디렉토리를 두는 경로 (None이면 사용 안 함)
+        self._workdir_tasks = set()  # 끝난 세션의 마지막 체크포인트 작업
+        self._pending_updates = {}  # session_id -> {"status": ..., "progress": {...}, "harness_mode": ..., "schedule_arms": [...]}
+        self._pending_crashes = {}  # session_id -> 다음 텔레메트리로 보낼 크래시 시그니처 목록
+        self._crash_paths = {}  # 보고한 크래시 SHA-256 -> 입력 파일 경로 (업로드/최소화용)
+        self._telemetry_epoch = uuid.uuid4().hex  # 서버가 재시작한 에이전트의 seq를 구분하는 값
+        self._telemetry_seq = 0
+        self._unacked = None  # 서버 응답을 받지 못해 같은 seq로 다시 보낼 텔레메트리
+        self.log_dir = Path("logs")
         self.shutdown_event = asyncio.Event()
-        
+
         # 시그널 핸들러
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
-    
+        if AGENT_PLATFORM != "windows":
+            signal.signal(signal.SIGINT, self._signal_handler)
+            signal.signal(signal.SIGTERM, self._signal_handler)
+
     def _signal_handler(self, signum, frame):
-        logging.info(f"시그널 {{signum}} 수신, 종료 중...")
+        logging.info(f"시그널 {signum} 수신, 종료 중...")
         self.shutdown_event.set()
-    
+
     async def start(self):
         try:
-            logging.info(f"에이전트 시작: {{self.agent_id}}")
-            
+            logging.info(f"에이전트 시작: {self.agent_id}")
+
             # AFL++ 설치 확인
             self._check_afl_installation()
-            
+
             # 서버에 등록
+            await self.client.open()
             await self._register_with_server()
-            
+
             # 메인 루프
+            self.stats_watcher.attach(asyncio.get_running_loop())
+            mode = "inotify" if self.stats_watcher.uses_inotify else "mtime 폴링"
+            logging.info(f"fuzzer_stats 감시 방식: {mode}")
             await self._main_loop()
-            
+
         except Exception as e:
-            logging.error(f"에이전트 실행 오류: {{e}}")
+            logging.error(f"에이전트 실행 오류: {e}")
         finally:
             await self._cleanup()
-    
+
     def _check_afl_installation(self):
         try:
-            subprocess.run(["afl-fuzz", "--help"], capture_output=True, check=True)
+            subprocess.run([self.afl_fuzz, "--help"], capture_output=True, check=True)
             logging.info("AFL++ 설치 확인됨")
         except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError("AFL++가 설치되지 않았습니다. 'brew install afl-plus-plus'로 설치하세요.")
-    
+            raise RuntimeError(f"AFL++가 설치되지 않았습니다. {AFL_INSTALL_HINT}")
+
     async def _register_with_server(self):
         try:
-            response = requests.post(
-                f"{{self.server_url}}/register_agent",
-                json={{
-                    "agent_id": self.agent_id,
-                    "platform": "darwin",
-                    "capabilities": ["afl_fuzzing"]
-                }},
-                timeout=10
-            )
-            if response.status_code == 200:
+            status, _ = await self.client.post("/register_agent", {
+                "agent_id": self.agent_id,
+                "platform": AGENT_PLATFORM,
+                "capabilities": ["afl_fuzzing"],
+                "resources": self._collect_resources()
+            })
+            if status == 200:
                 logging.info("서버에 등록 성공")
             else:
                 logging.warning("서버 등록 실패")
         except Exception as e:
-            logging.warning(f"서버 등록 실패: {{e}}")
-    
+            logging.warning(f"서버 등록 실패: {e}")
+
     async def _main_loop(self):
+        await asyncio.gather(
+            self._periodic(self._send_telemetry, self.STATS_INTERVAL),
+            self._periodic(self._sync_sessions, self.SESSION_SYNC_INTERVAL),
+            self._periodic(self._triage_crashes, self.CRASH_INTERVAL),
+            self._periodic(self._sync_corpus, self.CORPUS_SYNC_INTERVAL),
+            self._periodic(self._reminimize_queues, self.CMIN_CHECK_INTERVAL),
+            self._periodic(self._minimize_crashes, self.TMIN_INTERVAL),
+            self._periodic(self._checkpoint_workdirs, self.CHECKPOINT_INTERVAL),
+            self._periodic(self._adapt_schedules, self.SCHEDULE_INTERVAL),
+        )
+
+    async def _periodic(self, func, interval):
         while not self.shutdown_event.is_set():
             try:
-                # 간단한 하트비트
-                await self._send_heartbeat()
-                await asyncio.sleep(30)
+                await func()
             except Exception as e:
-                logging.error(f"메인 루프 오류: {{e}}")
-                await asyncio.sleep(5)
-    
-    async def _send_heartbeat(self):
+                logging.error(f"메인 루프 오류: {e}")
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _collect_resources(self):
+        """스케줄러가 배치에 사용하는 자원 정보를 수집합니다."""
+        try:
+            load_avg = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            load_avg = psutil.cpu_percent() / 100 * len(self.core_allocator.cores) if psutil else 0.0
+        mem_available = 0
+        if psutil:
+            mem_available = psutil.virtual_memory().available
+        elif os.path.exists("/proc/meminfo"):
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        mem_available = int(line.split()[1]) * 1024
+                        break
+        return {
+            "cpu_count": len(self.core_allocator.cores),
+            "free_cores": self.core_allocator.free_count,
+            "load_avg": round(load_avg, 2),
+            "mem_available": mem_available,
+            "sessions": len(self.running_sessions)
+        }
+
+    async def _sync_sessions(self):
+        """서버에 배정된 세션 목록을 받아 AFL++ 프로세스를 시작/중지합니다."""
+        status, data = await self.client.post("/agent_sessions", {"agent_id": self.agent_id})
+        if status != 200 or data is None:
+            return
+        active = set()
+        for session in data.get("sessions", []):
+            session_id = session["id"]
+            if session["status"] in ("starting", "minimizing", "running"):
+                active.add(session_id)
+                if session_id in self.running_sessions or session_id in self._minimize_tasks:
+                    continue
+                if session.get("minimize") and session["status"] != "running":
+                    self._minimize_tasks[session_id] = asyncio.create_task(self._minimize_and_start(session))
+                else:
+                    self._start_session(session)
+
+        # 서버에서 중지됐거나 더 이상 배정되지 않은 세션(예: 연결 끊김으로 error 처리)은 종료한다
+        for session_id in list(self.running_sessions):
+            if session_id not in active:
+                self._finish_session(session_id, None)
+        for session_id, task in list(self._minimize_tasks.items()):
+            if session_id not in active:
+                task.cancel()
+
+        for session_id in list(self.running_sessions):
+            self._reap_instances(session_id)
+
+    def _start_session(self, session):
+        """세션을 -M 메인 1개와 -S 보조 인스턴스들로 나누어 각각 빈 코어에 고정해 실행합니다."""
+        session_id = session["id"]
+        workdir = self._prepare_workdir(session)
+        if workdir is not None:
+            # AFL++는 tmpfs에서 돌고, 원래 출력 디렉토리에는 체크포인트만 쓴다
+            session = dict(session, output_dir=workdir.output_dir, afl_tmpdir=workdir.tmp_dir)
+        output_dir = session["output_dir"]
+        requested = max(1, int(session.get("instances", 1)))
+        cores = self.core_allocator.allocate(requested)
+        if self.core_allocator.supported and len(cores) < requested:
+            logging.warning(f"빈 코어 부족: {requested}개 요청, {len(cores)}개 배정 ({session_id})")
+            requested = max(1, len(cores))
+
+        if requested == 1:
+            plan = [("default", None)]
+        else:
+            plan = [("main", "-M")] + [(f"secondary{i}", "-S") for i in range(1, requested)]
+        state = {
+            "output_dir": output_dir,
+            "workdir": workdir,
+            "session": session,  # 인스턴스를 다시 띄울 때 쓰는 실행 정보
+            "spilling": False,  # tmpfs에서 원래 출력 디렉토리로 옮기는 중
+            "tmpfs_written": 0,  # 인스턴스들이 tmpfs에 쓴 누적 바이트 (/proc/<pid>/io)
+            "bandit": ScheduleBandit() if session.get("adaptive_schedules") and len(plan) > 1 else None,
+            "target_binary": session["target_binary"],
+            "reminimize_interval": session.get("reminimize_interval", 0),
+            "last_cmin": time.monotonic(),
+            "main": plan[0][0],
+            "instances": {},
+            "crash_backlog": []
+        }
+        self.running_sessions[session_id] = state
+        self.log_dir.mkdir(exist_ok=True)
+        harness_mode = self.harness_detector.detect(session["target_binary"])
+        if harness_mode in ("forkserver", "uninstrumented"):
+            logging.warning(f"persistent 모드가 아닌 타겟입니다 ({harness_mode}): {session['target_binary']}")
+
+        arms = dict(zip([name for name, _ in plan[1:]], state["bandit"].initial(len(plan) - 1))) \
+            if state["bandit"] else {}
+        for index, (name, role) in enumerate(plan):
+            core = cores[index] if index < len(cores) else None
+            args = SCHEDULE_ARMS[arms[name]] if name in arms else []
+            try:
+                process = self._launch_instance(session, name, role, core, args)
+            except OSError as e:
+                logging.error(f"AFL++ 실행 실패 ({name}): {e}")
+                self.core_allocator.release(core)
+                if name == state["main"]:
+                    self._finish_session(session_id, "error")
+                    return
+                continue
+            state["instances"][name] = {"process": process, "core": core, "role": role, "args": args}
+            if name in arms:
+                state["instances"][name]["arm"] = arms[name]
+            logging.info(f"AFL++ 시작됨: {session_id}/{name} (PID {process.pid}, 코어 {core}{', ' + arms[name] if name in arms else ''})")
+
+        self.stats_watcher.add_session(session_id, output_dir)
+        if session.get("corpus"):
+            self.corpus_syncer.add_session(session_id, output_dir)
+        self._queue_update(session_id, status="running", progress={"instances": len(state["instances"])},
+                           harness_mode=harness_mode, schedule_arms=self._schedule_snapshot(state))
+
+    async def _minimize_and_start(self, session):
+        """입력 코퍼스를 최소화한 뒤 최소화된 입력으로 퍼징을 시작합니다. 실패하면 원본 입력을 사용합니다."""
+        session_id = session["id"]
+        self._queue_update(session_id, status="minimizing")
+        cores = self.core_allocator.allocate(max(1, int(session.get("instances", 1))))
+        dest_dir = os.path.join(session["output_dir"], CMIN_DIR_NAME, "input")
+        try:
+            stats = await self.minimizer.minimize(
+                session["target_binary"], [session["input_dir"]], dest_dir, cores,
+                lambda progress: self._queue_update(session_id, progress=progress)
+            )
+            if stats["cmin_kept"]:
+                session = dict(session, input_dir=dest_dir)
+            logging.info(f"코퍼스 최소화 완료: {session_id} ({stats['cmin_total']} -> {stats['cmin_kept']}, "
+                         f"캐시 적중 {stats['cmin_cached']})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"코퍼스 최소화 실패, 원본 입력으로 시작합니다 ({session_id}): {e}")
+        finally:
+            for core in cores:
+                self.core_allocator.release(core)
+            self._minimize_tasks.pop(session_id, None)
+        if not self.shutdown_event.is_set():
+            self._start_session(session)
+
+    async def _reminimize_queues(self):
+        """reminimize_interval이 지난 세션의 실행 중 큐를 최소화해 .cmin/live에 스냅샷으로 남깁니다."""
+        now = time.monotonic()
+        for session_id, state in list(self.running_sessions.items()):
+            interval = state["reminimize_interval"]
+            if not interval or now - state["last_cmin"] < interval:
+                continue
+            # 퍼저 인스턴스를 방해하지 않도록 빈 코어 하나만 쓴다. 빈 코어가 없으면 고정하지 않고 돌리는 대신
+            # 이번 차례를 건너뛰고 다음 확인 때 다시 시도한다
+            cores = self.core_allocator.allocate(1)
+            if not cores:
+                logging.info(f"빈 코어가 없어 큐 재최소화를 미룹니다: {session_id}")
+                continue
+            state["last_cmin"] = now
+            try:
+                queues = [os.path.join(entry.path, "queue") for entry in os.scandir(state["output_dir"])
+                          if entry.is_dir() and entry.name != CMIN_DIR_NAME]
+                stats = await self.minimizer.minimize(
+                    state["target_binary"], queues, os.path.join(state["output_dir"], CMIN_DIR_NAME, "live"),
+                    cores, lambda progress: self._queue_update(session_id, progress=progress)
+                )
+                logging.info(f"큐 재최소화 완료: {session_id} ({stats['cmin_total']} -> {stats['cmin_kept']})")
+            except Exception as e:
+                logging.warning(f"큐 재최소화 실패 ({session_id}): {e}")
+            finally:
+                for core in cores:
+                    self.core_allocator.release(core)
+
+    def _launch_instance(self, session, name, role, core, args=()):
+        cmd = [self.afl_fuzz, "-i", session["input_dir"], "-o", session["output_dir"]]
+        if role:
+            cmd += [role, name]
+        cmd += list(args) + ["--"] + shlex.split(session["target_binary"])
+        env = dict(os.environ, AFL_NO_UI="1", AFL_AUTORESUME="1")
+        if session.get("afl_tmpdir"):
+            # AFL++는 AFL_TMPDIR/.cur_input을 쓰므로 인스턴스마다 따로 준다
+            env["AFL_TMPDIR"] = os.path.join(session["afl_tmpdir"], name)
+            os.makedirs(env["AFL_TMPDIR"], exist_ok=True)
+        preexec_fn = None
+        if core is not None:
+            # 에이전트가 직접 코어를 고정하므로 AFL++의 자동 바인딩은 끈다
+            env["AFL_NO_AFFINITY"] = "1"
+            preexec_fn = lambda: os.sched_setaffinity(0, {core})
+        with open(self.log_dir / f"{session['id']}-{name}.log", "ab") as log:
+            return subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, env=env, preexec_fn=preexec_fn)
+
+    def _reap_instances(self, session_id):
+        """종료된 인스턴스를 정리합니다. 메인 인스턴스가 끝나면 세션 전체를 종료합니다."""
+        state = self.running_sessions[session_id]
+        if state["spilling"]:
+            return  # 디스크로 옮기려고 멈춘 인스턴스는 곧 다시 띄운다
+        for name, instance in list(state["instances"].items()):
+            code = instance["process"].poll()
+            if code is None or instance.get("restarting"):
+                continue
+            logging.info(f"AFL++ 종료됨: {session_id}/{name} (코드 {code})")
+            self.core_allocator.release(instance["core"])
+            del state["instances"][name]
+            if name == state["main"]:
+                self._finish_session(session_id, "completed" if code == 0 else "error")
+                return
+            self._queue_update(session_id, progress={"instances": len(state["instances"])})
+
+    def _finish_session(self, session_id, status):
+        state = self.running_sessions.pop(session_id)
+        if state["workdir"] is not None:
+            self._sample_tmpfs_writes(state)  # 프로세스가 끝나면 /proc/<pid>/io를 읽을 수 없다
+        for instance in state["instances"].values():
+            if instance["process"].poll() is None:
+                instance["process"].terminate()
+            self.core_allocator.release(instance["core"])
+        # 종료 직전의 통계까지 반영한 뒤 감시를 해제한다
+        self.stats_watcher.mark_dirty(session_id)
+        for sid, delta in self.stats_watcher.collect_deltas().items():
+            self._queue_update(sid, progress=delta)
+        self.stats_watcher.remove_session(session_id)
+        self.corpus_syncer.remove_session(session_id)
+        if state["workdir"] is not None:
+            task = asyncio.create_task(self._finalize_workdir(session_id, state))
+            self._workdir_tasks.add(task)
+            task.add_done_callback(self._workdir_tasks.discard)
+        if status:
+            self._queue_update(session_id, status=status, progress={"instances": 0})
+
+    def _prepare_workdir(self, session):
+        """tmpfs_mb가 지정된 세션의 tmpfs 작업 디렉토리를 준비합니다. 쓸 수 없으면 None (원래 출력 디렉토리 사용)."""
+        cap_mb = int(session.get("tmpfs_mb") or 0)
+        if not cap_mb:
+            return None
+        if not self.tmpfs_root:
+            logging.warning(f"tmpfs 경로가 없어 디스크 출력 디렉토리를 사용합니다 ({session['id']})")
+            return None
+        workdir = RamWorkdir(session["id"], session["output_dir"], self.tmpfs_root, cap_mb * 2**20)
         try:
-            requests.post(
-                f"{{self.server_url}}/heartbeat",
-                json={{"agent_id": self.agent_id}},
-                timeout=5
+            if workdir.prepare():
+                logging.info(f"tmpfs 작업 디렉토리: {workdir.path} (한도 {cap_mb} MiB, {session['id']})")
+                return workdir
+            logging.warning(f"tmpfs 공간이 한도({cap_mb} MiB)보다 부족해 디스크 출력 디렉토리를 사용합니다 "
+                            f"({session['id']})")
+        except OSError as e:
+            logging.warning(f"tmpfs 작업 디렉토리 준비 실패, 디스크 출력 디렉토리를 사용합니다 ({session['id']}): {e}")
+        workdir.remove()
+        return None
+
+    def _sample_tmpfs_writes(self, state):
+        for instance in state["instances"].values():
+            written = process_write_bytes(instance["process"].pid)
+            if written is not None:
+                state["tmpfs_written"] += written - instance.get("write_bytes", 0)
+                instance["write_bytes"] = written
+
+    def _workdir_progress(self, state, workdir, used=None):
+        return {"tmpfs_written_bytes": state["tmpfs_written"], "checkpoint_bytes": workdir.checkpoint_bytes,
+                "tmpfs_used_bytes": workdir.used_bytes if used is None else used}
+
+    def _rebase_paths(self, state, old_dir, new_dir):
+        """크래시 보고/최소화 대기 중인 tmpfs 경로를 원래 출력 디렉토리 경로로 바꿉니다."""
+        prefix = old_dir + os.sep
+        rebase = lambda path: new_dir + path[len(old_dir):] if path.startswith(prefix) else path
+        self._crash_paths = {sha256: rebase(path) for sha256, path in self._crash_paths.items()}
+        state["crash_backlog"] = [rebase(path) for path in state["crash_backlog"]]
+        self.tmin_farm.rebase_paths(rebase)
+
+    async def _checkpoint_workdirs(self):
+        """tmpfs 작업 디렉토리의 바뀐 파일을 원래 출력 디렉토리로 복사하고, 한도를 넘은 세션은 디스크로 옮깁니다."""
+        for session_id, state in list(self.running_sessions.items()):
+            workdir = state["workdir"]
+            if workdir is None or state["spilling"]:
+                continue
+            self._sample_tmpfs_writes(state)
+            await asyncio.to_thread(workdir.checkpoint)
+            if self.running_sessions.get(session_id) is not state:
+                continue  # 그 사이 끝난 세션은 _finalize_workdir가 정리한다
+            self._queue_update(session_id, progress=self._workdir_progress(state, workdir))
+            if workdir.used_bytes > workdir.cap_bytes:
+                await self._spill_workdir(session_id, state)
+
+    async def _spill_workdir(self, session_id, state):
+        """tmpfs 한도를 넘은 세션을 멈추고 체크포인트한 뒤 원래 출력 디렉토리에서 이어서 퍼징합니다 (AFL_AUTORESUME)."""
+        workdir = state["workdir"]
+        logging.warning(f"tmpfs 한도 초과, 디스크 출력 디렉토리로 옮깁니다: {session_id} "
+                        f"({workdir.used_bytes / 2**20:.1f} MiB, 한도 {workdir.cap_bytes // 2**20} MiB)")
+        state["spilling"] = True
+        self._sample_tmpfs_writes(state)
+        await asyncio.gather(*(asyncio.to_thread(stop_process, instance["process"])
+                               for instance in state["instances"].values()))
+        await asyncio.to_thread(workdir.checkpoint)
+        state["spilling"] = False
+        if self.running_sessions.get(session_id) is not state:
+            return  # 그 사이 끝난 세션은 _finalize_workdir가 정리한다
+        if workdir.errors:
+            logging.error(f"체크포인트하지 못한 파일이 있어 세션을 옮기지 못했습니다: {session_id}")
+            self._finish_session(session_id, "error")
+            return
+
+        durable_dir = workdir.durable_dir
+        session = dict(state["session"], output_dir=durable_dir, afl_tmpdir=None)
+        state.update(output_dir=durable_dir, workdir=None, session=session)
+        self.stats_watcher.remove_session(session_id)
+        self.stats_watcher.add_session(session_id, durable_dir)
+        self.corpus_syncer.move_session(session_id, durable_dir)
+        self._rebase_paths(state, workdir.output_dir, durable_dir)
+        workdir.remove()
+        for name, instance in list(state["instances"].items()):
+            try:
+                instance["process"] = self._launch_instance(session, name, instance["role"], instance["core"],
+                                                            instance["args"])
+            except OSError as e:
+                logging.error(f"AFL++ 재시작 실패 ({name}): {e}")
+                if name == state["main"]:
+                    self._finish_session(session_id, "error")
+                    return
+                self.core_allocator.release(instance["core"])
+                del state["instances"][name]
+        self._queue_update(session_id, progress=dict(self._workdir_progress(state, workdir, used=0),
+                                                     instances=len(state["instances"])))
+
+    def _schedule_snapshot(self, state):
+        if state["bandit"] is None:
+            return None
+        return state["bandit"].snapshot({name: instance["arm"] for name, instance in state["instances"].items()
+                                         if "arm" in instance})
+
+    async def _adapt_schedules(self):
+        """적응형 세션마다 지난 주기에 보조 인스턴스가 찾은 새 경로와 CPU 시간으로 밴딧을 갱신하고 설정을 다시 배정합니다.
+
+        인스턴스는 코어 하나에 고정되어 있으므로 주기의 경과 시간을 그 인스턴스의 CPU 시간으로 봅니다.
+        """
+        now = time.monotonic()
+        for session_id, state in list(self.running_sessions.items()):
+            bandit = state["bandit"]
+            if bandit is None or state["spilling"]:
+                continue
+            stats = self.stats_watcher.instance_stats(session_id)
+            bandit.decay()
+            current = {}
+            for name, instance in state["instances"].items():
+                if "arm" not in instance:
+                    continue
+                current[name] = instance["arm"]
+                values = stats.get(name)
+                if values is None:
+                    continue
+                paths, execs = values.get("paths_found", 0), values.get("execs_done", 0)
+                mark, instance["bandit_mark"] = instance.get("bandit_mark"), (paths, execs, now)
+                if mark is None or now <= mark[2]:
+                    continue  # 처음 본 인스턴스는 기준값만 잡는다 (이어서 퍼징하면 이전 실행의 값이 들어 있음)
+                # AFL++가 다시 시작하며 통계를 0부터 세면 그 이후 값만 센다
+                new_paths = paths - mark[0] if paths >= mark[0] else paths
+                new_execs = execs - mark[1] if execs >= mark[1] else execs
+                bandit.update(instance["arm"], new_paths, now - mark[2], new_execs)
+            if not current:
+                continue
+            for name, arm in bandit.choose(current).items():
+                if arm != current[name] and self.running_sessions.get(session_id) is state:
+                    await self._switch_arm(session_id, state, name, arm)
+            self._queue_update(session_id, schedule_arms=self._schedule_snapshot(state))
+
+    async def _switch_arm(self, session_id, state, name, arm):
+        """보조 인스턴스를 새 설정으로 다시 띄웁니다. 같은 -S 이름과 코어를 쓰므로 AFL_AUTORESUME으로 큐를 이어받습니다."""
+        instance = state["instances"].get(name)
+        if instance is None:
+            return
+        process = instance["process"]
+        instance["restarting"] = True
+        await asyncio.to_thread(stop_process, process)
+        instance["restarting"] = False
+        if (self.running_sessions.get(session_id) is not state or state["instances"].get(name) is not instance
+                or instance["process"] is not process or state["spilling"]):
+            return  # 그 사이 세션이 끝났거나 다른 작업(디스크로 옮기기)이 인스턴스를 다시 띄움
+        args = SCHEDULE_ARMS[arm]
+        try:
+            instance["process"] = self._launch_instance(state["session"], name, instance["role"], instance["core"], args)
+        except OSError as e:
+            logging.error(f"AFL++ 재시작 실패 ({name}): {e}")
+            self.core_allocator.release(instance["core"])
+            del state["instances"][name]
+            self._queue_update(session_id, progress={"instances": len(state["instances"])})
+            return
+        logging.info(f"설정 변경: {session_id}/{name} {instance['arm']} -> {arm} (PID {instance['process'].pid})")
+        instance.update(arm=arm, args=args)
+
+    async def _finalize_workdir(self, session_id, state):
+        """끝난 세션의 tmpfs 작업 디렉토리를 마지막으로 체크포인트하고 지웁니다. 복사하지 못한 파일이 있으면 남겨 둡니다."""
+        workdir = state["workdir"]
+        await asyncio.gather(*(asyncio.to_thread(stop_process, instance["process"])
+                               for instance in state["instances"].values()))
+        await asyncio.to_thread(workdir.checkpoint)
+        self._rebase_paths(state, workdir.output_dir, workdir.durable_dir)
+        self._queue_update(session_id, progress=self._workdir_progress(state, workdir, used=0))
+        if workdir.errors:
+            logging.error(f"체크포인트하지 못한 파일 {workdir.errors}개가 있어 tmpfs 작업 디렉토리를 남겨 둡니다: "
+                          f"{workdir.path}")
+            return
+        await asyncio.to_thread(workdir.remove)
+        logging.info(f"tmpfs 작업 디렉토리 정리됨: {session_id} (체크포인트 {workdir.checkpoint_bytes / 2**20:.1f} MiB)")
+
+    async def _triage_crashes(self):
+        """새 크래시를 재현해 얻은 시그니처를 다음 텔레메트리에 싣습니다."""
+        for session_id, state in list(self.running_sessions.items()):
+            backlog = state["crash_backlog"]
+            backlog.extend(self.crash_triager.scan(state["output_dir"]))
+            batch, state["crash_backlog"] = backlog[:self.CRASH_BATCH_SIZE], backlog[self.CRASH_BATCH_SIZE:]
+            if not batch:
+                continue
+            results = await asyncio.gather(
+                *(self.crash_triager.triage(state["target_binary"], path) for path in batch),
+                return_exceptions=True
+            )
+            crashes = [result for result in results if isinstance(result, dict)]
+            for crash in crashes:
+                self._crash_paths[crash["sha256"]] = crash.pop("path")
+            if crashes:
+                self._pending_crashes.setdefault(session_id, []).extend(crashes)
+
+    async def _handle_crash_result(self, session_id, result):
+        """서버가 요청한 크래시 입력만 업로드하고, 버킷 샘플을 afl-tmin 작업으로 넣습니다.
+
+        이미 ack된 응답이라 다시 받을 수 없으므로, 항목 하나가 실패해도 기록만 하고 나머지를 계속 처리합니다.
+        """
+        for sha256 in result.get("upload", []):
+            path = self._crash_paths.get(sha256)
+            if path is None:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                await self.client.post_bytes("/crash_upload", data, {"session_id": session_id, "sha256": sha256})
+            except Exception as e:
+                logging.warning(f"크래시 입력 업로드 실패 ({session_id}, {path}): {e}")
+        if result.get("new_buckets"):
+            logging.info(f"새 크래시 버킷 {len(result['new_buckets'])}개: {session_id}")
+        state = self.running_sessions.get(session_id)
+        for item in result.get("minimize", []):
+            try:
+                path = self._crash_paths.get(item["sha256"])
+                if state is not None and path is not None:
+                    self.tmin_farm.submit(item["priority"], session_id, state["target_binary"], path, item["sha256"])
+            except Exception as e:
+                logging.warning(f"크래시 최소화 작업 추가 실패 ({session_id}): {e}")
+
+    async def _minimize_crashes(self):
+        """afl-tmin 결과를 서버에 올리고, 빈 코어가 있는 만큼 다음 최소화 작업을 시작합니다."""
+        for job, data in self.tmin_farm.drain_results():
+            status = await self.client.post_bytes("/crash_minimized", data, {
+                "agent_id": self.agent_id,
+                "session_id": job["session_id"],
+                "sha256": job["sha256"]
+            })
+            if status not in (200, 404):
+                # 결과는 캐시에 남아 있으므로 다시 넣으면 실행 없이 업로드만 재시도한다
+                self.tmin_farm.submit(job["priority"], job["session_id"], job["target_binary"],
+                                      job["path"], job["sha256"])
+        self.tmin_farm.start_ready()
+        for session_id, state in self.running_sessions.items():
+            pending = self.tmin_farm.pending(session_id)
+            if pending != state.get("tmin_pending", 0):
+                state["tmin_pending"] = pending
+                self._queue_update(session_id, progress={"tmin_pending": pending})
+
+    async def _sync_corpus(self):
+        """새 queue 항목의 해시를 알리고 서버가 요청한 항목만 올린 뒤, 다른 에이전트가 찾은 항목을 받아 옵니다."""
+        for session_id in self.corpus_syncer.sessions():
+            hashes = await asyncio.to_thread(self.corpus_syncer.scan, session_id)
+            for start in range(0, len(hashes), CORPUS_ADVERTISE_CHUNK):
+                chunk = hashes[start:start + CORPUS_ADVERTISE_CHUNK]
+                status, data = await self.client.post("/corpus_advertise", {
+                    "agent_id": self.agent_id,
+                    "session_id": session_id,
+                    "hashes": chunk
+                })
+                if status != 200 or data is None:
+                    break
+                batches = self.corpus_syncer.read_batches(session_id, data.get("upload", []))
+                uploaded = True
+                while uploaded:
+                    batch = await asyncio.to_thread(next, batches, None)
+                    if batch is None:
+                        break
+                    status = await self.client.post_bytes(
+                        "/corpus_upload", pack_corpus_batch(batch),
+                        {"agent_id": self.agent_id, "session_id": session_id}
+                    )
+                    uploaded = status == 200
+                if not uploaded:
+                    break  # 알리지 않은 것으로 남겨 다음 주기에 다시 시도한다
+                self.corpus_syncer.mark_advertised(session_id, chunk)
+            await self._pull_corpus(session_id)
+
+    async def _pull_corpus(self, session_id):
+        for _ in range(self.CORPUS_PULL_ROUNDS):
+            position = self.corpus_syncer.cursor(session_id)
+            if position is None:
+                return
+            status, headers, body = await self.client.post_for_bytes("/corpus_pull", {
+                "agent_id": self.agent_id,
+                "session_id": session_id,
+                "cursor": position[0],
+                "epoch": position[1],
+                "max_bytes": CORPUS_BATCH_BYTES
+            })
+            if status != 200:
+                return
+            written = await asyncio.to_thread(
+                self.corpus_syncer.store_pulled, session_id, unpack_corpus_batch(body),
+                int(headers["X-Corpus-Cursor"]), headers["X-Corpus-Epoch"]
             )
+            if written:
+                logging.info(f"코퍼스 항목 {written}개 받음: {session_id}")
+            if int(headers.get("X-Corpus-Remaining", "0")) == 0:
+                return
+
+    def _queue_update(self, session_id, status=None, progress=None, harness_mode=None, schedule_arms=None):
+        update = self._pending_updates.setdefault(session_id, {})
+        if status:
+            update["status"] = status
+        if harness_mode:
+            update["harness_mode"] = harness_mode
+        if schedule_arms:
+            update["schedule_arms"] = schedule_arms
+        if progress:
+            update.setdefault("progress", {}).update(progress)
+
+    async def _send_telemetry(self):
+        """하트비트, 자원 정보, 세션별 상태/통계 델타, 새 크래시 시그니처를 요청 하나로 서버에 보냅니다.
+
+        응답을 받지 못한 묶음은 다음 주기에 같은 seq로 그대로 다시 보내며, 서버는 이미 반영한 seq를 다시 반영하지 않고
+        처음 응답을 돌려줍니다. 그 사이 쌓인 변경은 응답을 받은 뒤 다음 묶음으로 보냅니다. 응답을 받으면 True를 반환합니다.
+        """
+        for session_id, delta in self.stats_watcher.collect_deltas().items():
+            self._queue_update(session_id, progress=delta)
+        if self._unacked is None:
+            self._telemetry_seq += 1
+            self._unacked = {
+                "agent_id": self.agent_id,
+                "epoch": self._telemetry_epoch,
+                "seq": self._telemetry_seq,
+                "resources": self._collect_resources(),
+                "updates": self._pending_updates,
+                "crashes": self._pending_crashes
+            }
+            self._pending_updates, self._pending_crashes = {}, {}
+        try:
+            status, data = await self.client.post("/telemetry", self._unacked, timeout=5)
         except Exception:
-            pass
-    
+            return False
+        if status == 404:
+            # 서버가 재시작됐거나 에이전트를 제거한 경우 다시 등록하고, 다음 주기에 같은 묶음을 다시 보낸다
+            await self._register_with_server()
+            return False
+        if status != 200 or data is None or data.get("ack") != self._unacked["seq"]:
+            return False
+        sent, self._unacked = self._unacked, None
+        for session_id, result in data.get("crashes", {}).items():
+            try:
+                await self._handle_crash_result(session_id, result)
+            except Exception as e:
+                logging.warning(f"크래시 응답 처리 실패 ({session_id}): {e}")
+        for crashes in sent["crashes"].values():
+            for crash in crashes:
+                self._crash_paths.pop(crash["sha256"], None)
+        return True
+
     async def _cleanup(self):
-        if self.afl_process:
-            self.afl_process.terminate()
+        for task in list(self._minimize_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._minimize_tasks.values(), return_exceptions=True)
+        await self.tmin_farm.close()
+        for session_id in list(self.running_sessions):
+            self._finish_session(session_id, "stopped")
+        await asyncio.gather(*self._workdir_tasks, return_exceptions=True)
+        try:
+            # 응답을 못 받은 묶음이 있으면 그것부터 보낸 뒤 종료 직전의 변경을 보낸다
+            while await self._send_telemetry() and (self._pending_updates or self._pending_crashes):
+                pass
+        except Exception as e:
+            logging.warning(f"마지막 진행 상황 전송 실패: {e}")
+        await self.client.close()
+        self.stats_watcher.close(asyncio.get_running_loop())
         logging.info("에이전트 정리 완료")
 
 async def main():
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="AFL++ 로컬 에이전트")
     parser.add_argument("--server-url", required=True, help="서버 URL")
     parser.add_argument("--agent-id", help="에이전트 ID")
-    
+    # AFL++ 실행 파일 경로 (시뮬레이터나 직접 빌드한 AFL++를 쓸 때)
+    parser.add_argument("--afl-fuzz", default=os.environ.get("AFL_FUZZ", "afl-fuzz"), help="afl-fuzz 경로 (환경 변수 AFL_FUZZ)")
+    parser.add_argument("--afl-showmap", default=os.environ.get("AFL_SHOWMAP", "afl-showmap"), help="afl-showmap 경로 (환경 변수 AFL_SHOWMAP)")
+    parser.add_argument("--afl-tmin", default=os.environ.get("AFL_TMIN", "afl-tmin"), help="afl-tmin 경로 (환경 변수 AFL_TMIN)")
+    # tmpfs_mb 세션의 작업 디렉토리를 둘 RAM 기반 경로 (빈 문자열이면 모든 세션을 디스크에서 실행)
+    parser.add_argument("--tmpfs-root", default=os.environ.get("AFL_MCP_TMPFS_ROOT", default_tmpfs_root()),
+                        help="tmpfs 작업 디렉토리 경로 (환경 변수 AFL_MCP_TMPFS_ROOT, 기본 /dev/shm)")
+
     args = parser.parse_args()
-    
+
     logging.basicConfig(level=logging.INFO)
-    
-    agent = LocalAgent(args.server_url, args.agent_id)
+
+    agent = LocalAgent(args.server_url, args.agent_id, args.afl_fuzz, args.afl_showmap, args.afl_tmin,
+                       args.tmpfs_root)
     await agent.start()
 
 if __name__ == "__main__":
     asyncio.run(main())
 '''
 
-def generate_windows_agent(agent_name: str, server_url: str) -> str:
-    """Windows용 에이전트 코드 생성"""
-    return f'''#!/usr/bin/env python3
+# local_agent.py에 들어가는 순서대로 나열한 공통 코드 조각
+_AGENT_CODE_FRAGMENTS = (
+    _AGENT_STATS_WATCHER_CODE,
+    _AGENT_PARALLEL_CODE,
+    _AGENT_HTTP_CLIENT_CODE,
+    _AGENT_CRASH_TRIAGE_CODE,
+    _AGENT_CORPUS_SYNC_CODE,
+    _AGENT_CMIN_CODE,
+    _AGENT_TMIN_CODE,
+    _AGENT_HARNESS_CODE,
+    _AGENT_TMPFS_CODE,
+    _AGENT_SCHEDULE_CODE,
+    _AGENT_CORE_CODE,
+)
+
+def _render_agent_code(agent_name: str, platform: str, platform_label: str, install_hint: str) -> str:
+    """플랫폼 설정과 공통 코드 조각을 합쳐 local_agent.py 소스를 만듭니다."""
+    header = f'''#!/usr/bin/env python3
 """
-{agent_name} - Windows용 AFL++ 로컬 에이전트
+{agent_name} - {platform_label}용 AFL++ 로컬 에이전트
 자동 생성된 에이전트입니다.
 """
 
 import asyncio
+import ctypes
+import ctypes.util
+import hashlib
+import heapq
 import json
 import logging
+import random
+import re
+import shlex
+import shutil
 import signal
+import sqlite3
+import struct
 import sys
+import tempfile
+import threading
+import time
 import uuid
 import subprocess
 import os
-import requests
+import zlib
+from array import array
 from pathlib import Path
 
-class LocalAgent:
-    def __init__(self, server_url: str, agent_id: str = None):
-        self.server_url = server_url
-        self.agent_id = agent_id or str(uuid.uuid4())
-        self.afl_process = None
-        self.running_sessions = {{}}
-        self.shutdown_event = asyncio.Event()
-    
-    async def start(self):
-        try:
-            logging.info(f"에이전트 시작: {{self.agent_id}}")
-            
-            # AFL++ 설치 확인
-            self._check_afl_installation()
-            
-            # 서버에 등록
-            await self._register_with_server()
-            
-            # 메인 루프
-            await self._main_loop()
-            
-        except Exception as e:
-            logging.error(f"에이전트 실행 오류: {{e}}")
-        finally:
-            await self._cleanup()
-    
-    def _check_afl_installation(self):
-        try:
-            subprocess.run(["afl-fuzz", "--help"], capture_output=True, check=True)
-            logging.info("AFL++ 설치 확인됨")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError("AFL++가 설치되지 않았습니다. Windows용 AFL++를 설치하세요.")
-    
-    async def _register_with_server(self):
-        try:
-            response = requests.post(
-                f"{{self.server_url}}/register_agent",
-                json={{
-                    "agent_id": self.agent_id,
-                    "platform": "windows",
-                    "capabilities": ["afl_fuzzing"]
-                }},
-                timeout=10
-            )
-            if response.status_code == 200:
-                logging.info("서버에 등록 성공")
-            else:
-                logging.warning("서버 등록 실패")
-        except Exception as e:
-            logging.warning(f"서버 등록 실패: {{e}}")
-    
-    async def _main_loop(self):
-        while not self.shutdown_event.is_set():
-            try:
-                # 간단한 하트비트
-                await self._send_heartbeat()
-                await asyncio.sleep(30)
-            except Exception as e:
-                logging.error(f"메인 루프 오류: {{e}}")
-                await asyncio.sleep(5)
-    
-    async def _send_heartbeat(self):
-        try:
-            requests.post(
-                f"{{self.server_url}}/heartbeat",
-                json={{"agent_id": self.agent_id}},
-                timeout=5
-            )
-        except Exception:
-            pass
-    
-    async def _cleanup(self):
-        if self.afl_process:
-            self.afl_process.terminate()
-        logging.info("에이전트 정리 완료")
+import aiohttp
 
-async def main():
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="AFL++ 로컬 에이전트")
-    parser.add_argument("--server-url", required=True, help="서버 URL")
-    parser.add_argument("--agent-id", help="에이전트 ID")
-    
-    args = parser.parse_args()
-    
-    logging.basicConfig(level=logging.INFO)
-    
-    agent = LocalAgent(args.server_url, args.agent_id)
-    await agent.start()
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
-if __name__ == "__main__":
-    asyncio.run(main())
+AGENT_PLATFORM = "{platform}"
+AFL_INSTALL_HINT = {install_hint!r}
 '''
+    return header + "".join(_AGENT_CODE_FRAGMENTS)
+
+def generate_linux_agent(agent_name: str, server_url: str) -> str:
+    """Linux용 에이전트 코드 생성"""
+    return _render_agent_code(
+        agent_name, "linux", "Linux",
+        "'sudo apt-get install afl++' 또는 'brew install afl-plus-plus'로 설치하세요."
+    )
+
+def generate_macos_agent(agent_name: str, server_url: str) -> str:
+    """macOS용 에이전트 코드 생성"""
+    return _render_agent_code(agent_name, "darwin", "macOS", "'brew install afl-plus-plus'로 설치하세요.")
+
+def generate_windows_agent(agent_name: str, server_url: str) -> str:
+    """Windows용 에이전트 코드 생성"""
+    return _render_agent_code(agent_name, "windows", "Windows", "Windows용 AFL++를 설치하세요.")
 
 def generate_requirements(platform: str) -> str:
     """플랫폼별 requirements.txt 생성"""
-    base_reqs = "requests>=2.31.0"
+    base_reqs = "aiohttp>=3.9.0"
     
     if platform == "windows":
         return base_reqs
@@ -590,9 +4851,11 @@ python local_agent.py --server-url http://localhost:8000
 ## 주의사항
 - AFL++가 시스템에 설치되어 있어야 합니다
 - 서버 URL은 올바른 형식이어야 합니다
+- PATH에 없는 AFL++를 쓰려면 `--afl-fuzz`, `--afl-showmap`, `--afl-tmin`(또는 `AFL_FUZZ`, `AFL_SHOWMAP`, `AFL_TMIN` 환경 변수)으로 경로를 지정하세요
 """
 
 @app.tool()
+@instrument_tool
 def generate_local_agent(
     agent_name: str = None,
     platform: str = None,
@@ -676,28 +4939,76 @@ chmod +x run.sh
     except Exception as e:
         return f"❌ 에이전트 생성 실패: {str(e)}"
 
+# 에이전트 목록 정렬 기준 -> (정렬 키, 내림차순 여부)
+AGENT_SORT_KEYS = {
+    "id": (lambda agent: agent.id, False),
+    "free_cores": (lambda agent: (agent.resources or {}).get("free_cores", 0), True),
+    "load": (lambda agent: (agent.resources or {}).get("load_avg", 0.0), False),
+    "last_heartbeat": (lambda agent: agent.last_heartbeat, True)
+}
+
 @app.tool()
-def list_available_agents() -> str:
-    """사용 가능한 로컬 에이전트 목록을 반환합니다."""
+@instrument_tool
+def list_available_agents(
+    connected: bool = None,
+    platform: str = None,
+    sort: str = "id",
+    cursor: str = None,
+    limit: int = 50
+) -> str:
+    """사용 가능한 로컬 에이전트 목록을 조건에 맞춰 한 페이지씩 반환합니다.
+
+    connected(연결 여부)와 platform으로 거르고 sort(id, free_cores, load, last_heartbeat)로 정렬합니다.
+    """
     try:
-        agents = fuzzing_manager.agents
+        fuzzing_manager.expire_stale_agents()
+        if limit < 1:
+            return "❌ limit은 1 이상이어야 합니다."
+        if sort not in AGENT_SORT_KEYS:
+            return f"❌ 지원하지 않는 정렬 기준입니다: {sort} ({', '.join(AGENT_SORT_KEYS)} 중 선택)"
+        agents = fuzzing_manager.list_agents()
         if not agents:
             return "📋 등록된 로컬 에이전트가 없습니다.\n\n💡 로컬 에이전트를 실행하여 연결해주세요."
         
-        result = "📋 등록된 로컬 에이전트 목록\n\n"
-        for agent_id, agent_info in agents.items():
-            status = "🟢 연결됨" if fuzzing_manager.agent_connections.get(agent_id, False) else "🔴 연결 끊김"
-            result += f"🆔 {agent_id}\n"
-            result += f"   상태: {status}\n"
-            result += f"   등록 시간: {agent_info['registered_at']}\n"
-            result += f"   마지막 연결: {agent_info['last_heartbeat']}\n"
-            result += "─" * 40 + "\n"
+        connections = {agent.id: agent_connected for agent, agent_connected in agents}
+        matched = (
+            agent for agent, agent_connected in agents
+            if (connected is None or agent_connected == connected)
+            and (platform is None or agent.info.get("platform") == platform)
+        )
+        key, descending = AGENT_SORT_KEYS[sort]
+        offset = int(cursor) if cursor else 0
+        select = heapq.nlargest if descending else heapq.nsmallest
+        top = select(offset + limit + 1, matched, key=key)
+        page = top[offset:offset + limit]
+        if not page:
+            return "📋 조건에 맞는 로컬 에이전트가 없습니다."
         
-        return result
+        lines = [f"📋 등록된 로컬 에이전트 목록 ({len(page)}개 표시, 전체 {len(agents)}개)", ""]
+        for agent_info in page:
+            agent_id = agent_info.id
+            status = "🟢 연결됨" if connections.get(agent_id, False) else "🔴 연결 끊김"
+            lines += [
+                f"🆔 {agent_id}",
+                f"   상태: {status}",
+                f"   등록 시간: {format_timestamp(agent_info.registered_at)}",
+                f"   마지막 연결: {format_timestamp(agent_info.last_heartbeat)}"
+            ]
+            resources = agent_info.resources
+            if resources:
+                lines.append(
+                    f"   자원: 빈 코어 {resources.get('free_cores', '?')}/{resources.get('cpu_count', '?')}, "
+                    f"부하 {resources.get('load_avg', 0):.2f}, 세션 {resources.get('sessions', 0)}"
+                )
+            lines.append("─" * 40)
+        if len(top) > offset + limit:
+            lines += ["", f"➡️ 다음 페이지: cursor=\"{offset + limit}\""]
+        return "\n".join(lines) + "\n"
     except Exception as e:
         return f"❌ 에이전트 목록 조회 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def register_local_agent(agent_id: str, agent_info: str = "") -> str:
     """로컬 에이전트를 등록합니다."""
     try:
@@ -710,6 +5021,7 @@ def register_local_agent(agent_id: str, agent_info: str = "") -> str:
         return f"❌ 에이전트 등록 중 오류 발생: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def unregister_local_agent(agent_id: str) -> str:
     """로컬 에이전트를 제거합니다."""
     try:
@@ -721,20 +5033,53 @@ def unregister_local_agent(agent_id: str) -> str:
         return f"❌ 에이전트 제거 중 오류 발생: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def start_hybrid_fuzzing(
     target_binary: str,
     input_dir: str,
     output_dir: str = None,
-    agent_id: str = None
+    agent_id: str = None,
+    instances: int = 1,
+    placement: str = None,
+    corpus: str = None,
+    minimize: bool = False,
+    reminimize_interval: int = 0,
+    tmpfs_mb: int = 0,
+    adaptive_schedules: bool = False
 ) -> str:
-    """하이브리드 AFL++ 퍼징을 시작합니다."""
+    """하이브리드 AFL++ 퍼징을 시작합니다.
+
+    instances가 2 이상이면 에이전트가 -M 메인 1개와 -S 보조 인스턴스들을 각각 빈 코어에 고정해
+    output_dir을 공유 동기화 디렉토리로 사용해 실행합니다.
+    agent_id를 생략하면 에이전트들이 보고한 빈 코어, 부하, 메모리, 세션 수를 기준으로
+    placement 정책(spread 또는 binpack)에 따라 에이전트를 고릅니다.
+    같은 corpus 그룹의 세션들은 에이전트가 달라도 새 queue 항목을 서버를 거쳐 서로 나눠 가집니다.
+    corpus를 생략하면 타겟 바이너리 이름을 그룹으로 쓰고, 빈 문자열이면 동기화하지 않습니다.
+    minimize가 참이면 에이전트가 퍼징 전에 afl-showmap을 빈 코어들에 나눠 돌려 input_dir을 최소화하고,
+    reminimize_interval(초)이 0보다 크면 그 주기로 실행 중인 큐를 다시 최소화해 스냅샷을 남깁니다.
+    tmpfs_mb가 0보다 크면 에이전트가 출력 디렉토리와 AFL_TMPDIR을 그 크기 한도의 tmpfs에 두고
+    바뀐 파일만 output_dir로 주기적으로 체크포인트합니다. 한도를 넘으면 output_dir에서 이어서 퍼징합니다.
+    adaptive_schedules가 참이면 에이전트가 보조 인스턴스들의 파워 스케줄(-p)과 변이기 설정을 밴딧으로 골라
+    CPU 시간당 새 경로를 가장 많이 찾는 설정에 더 많은 코어를 줍니다 (get_schedule_report로 확인).
+    """
     try:
+        if instances < 1:
+            return "❌ 인스턴스 수는 1 이상이어야 합니다."
+        if reminimize_interval < 0:
+            return "❌ 재최소화 주기는 0 이상이어야 합니다."
+        if tmpfs_mb < 0:
+            return "❌ tmpfs 한도는 0 이상이어야 합니다."
+        if adaptive_schedules and instances < 2:
+            return "❌ 적응형 스케줄은 보조 인스턴스가 필요합니다 (instances 2 이상)."
+        if placement is not None and placement not in PLACEMENT_POLICIES:
+            return f"❌ 지원하지 않는 배치 정책입니다: {placement} (spread, binpack 중 선택)"
+        fuzzing_manager.expire_stale_agents()
+        
         # 에이전트 선택
         if agent_id is None:
-            available_agents = [aid for aid, connected in fuzzing_manager.agent_connections.items() if connected]
-            if not available_agents:
+            agent_id = fuzzing_manager.select_agent(instances, placement)
+            if agent_id is None:
                 return "❌ 연결된 로컬 에이전트가 없습니다.\n\n💡 먼저 로컬 에이전트를 실행하고 연결해주세요."
-            agent_id = available_agents[0]
         
         # 에이전트 존재 확인
         if agent_id not in fuzzing_manager.agents:
@@ -750,12 +5095,17 @@ def start_hybrid_fuzzing(
             output_dir = f"afl_output_{timestamp}"
         
         # 세션 생성
-        session_id = fuzzing_manager.create_session(agent_id, target_binary, input_dir, output_dir)
+        if corpus is None:
+            corpus = default_corpus_key(target_binary)
+        session_id = fuzzing_manager.create_session(
+            agent_id, target_binary, input_dir, output_dir, instances, corpus, minimize, reminimize_interval,
+            tmpfs_mb, adaptive_schedules
+        )
         if not session_id:
-            return "❌ 퍼징 세션 생성 실패"
+            return f"❌ 퍼징 세션 생성 실패: 에이전트 {agent_id}의 연결이 끊겼을 수 있습니다"
         
-        # 세션 상태를 시작으로 업데이트
-        fuzzing_manager.update_session_status(session_id, "starting")
+        # 세션 상태를 시작으로 업데이트 (그 사이 중지/만료된 세션은 되살리지 않음)
+        fuzzing_manager.update_session_status(session_id, "starting", only_from=("created",))
         
         result = f"""
 🚀 하이브리드 AFL++ 퍼징 시작됨 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
@@ -765,6 +5115,11 @@ def start_hybrid_fuzzing(
 🎯 타겟 바이너리: {target_binary}
 📂 입력 디렉토리: {input_dir}
 📂 출력 디렉토리: {output_dir}
+🧵 인스턴스: {instances} (메인 1 + 보조 {instances - 1})
+🧬 코퍼스 그룹: {corpus or '동기화 안 함'}
+🗜️ 입력 최소화: {'사용' if minimize else '사용 안 함'}{f' (실행 중 {reminimize_interval}초마다 재최소화)' if reminimize_interval else ''}
+💾 작업 디렉토리: {f'tmpfs (최대 {tmpfs_mb} MiB, 출력 디렉토리로 체크포인트)' if tmpfs_mb else '출력 디렉토리'}
+🎰 파워 스케줄: {'적응형 (보조 인스턴스 설정을 밴딧으로 선택)' if adaptive_schedules else 'AFL++ 기본값'}
 
 💡 퍼징 상태 확인: get_hybrid_fuzzing_status("{session_id}")
 ⏹️ 퍼징 중지: stop_hybrid_fuzzing("{session_id}")
@@ -776,37 +5131,41 @@ def start_hybrid_fuzzing(
         return f"❌ 하이브리드 퍼징 시작 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def get_hybrid_fuzzing_status(session_id: str) -> str:
-    """하이브리드 퍼징 상태를 확인합니다."""
+    """하이브리드 퍼징 상태를 확인합니다. 메모리에서 내보낸 끝난 세션은 디스크 보관소에서 읽습니다."""
     try:
+        fuzzing_manager.expire_stale_agents()
         session = fuzzing_manager.get_session(session_id)
+        archived = fuzzing_manager.archived_session(session_id) if not session else None
+        if archived:
+            session = archived.record
         if not session:
             return f"❌ 세션을 찾을 수 없습니다: {session_id}"
         
-        progress = session["progress"]
-        status = session["status"]
-        
-        # 상태별 이모지
-        status_emoji = {
-            "created": "🆕",
-            "starting": "🚀",
-            "running": "🔄",
-            "completed": "✅",
-            "stopped": "⏹️",
-            "error": "❌"
-        }
+        progress = session.progress
+        status = session.status
         
-        emoji = status_emoji.get(status, "❓")
+        emoji = STATUS_EMOJI.get(status, "❓")
+        corpus_line = "동기화 안 함"
+        if session.corpus:
+            index = fuzzing_manager.corpora.get(session.corpus)
+            corpus_line = f"{session.corpus} (공유 항목 {len(index) if index else 0}개)"
         
         result = f"""
 {emoji} 퍼징 세션 상태 ({session_id})
 
 📊 상태: {status}
-🤖 에이전트: {session['agent_id']}
-🎯 타겟: {session['target_binary']}
-📂 입력: {session['input_dir']}
-📂 출력: {session['output_dir']}
-📅 생성 시간: {session['created_at']}
+🤖 에이전트: {session.agent_id}
+🎯 타겟: {session.target_binary}
+📂 입력: {session.input_dir}
+📂 출력: {session.output_dir}
+🧵 인스턴스: {progress['instances']}/{session.instances} 실행 중
+🧩 하네스: {HARNESS_MODES.get(session.harness_mode, '확인 전')}
+🎰 파워 스케줄: {'적응형 (get_schedule_report로 확인)' if session.adaptive_schedules else 'AFL++ 기본값'}
+🧬 코퍼스 그룹: {corpus_line}
+📅 생성 시간: {format_timestamp(session.created_at)}
+🕒 마지막 업데이트: {format_timestamp(session.updated_at) or '-'}
 
 📈 진행 상황:
    • 실행 횟수: {progress['execs_done']:,}
@@ -814,8 +5173,31 @@ def get_hybrid_fuzzing_status(session_id: str) -> str:
    • 총 경로: {progress['paths_total']}
    • 발견된 경로: {progress['paths_found']}
    • 크래시: {progress['crashes']}
+   • 고유 크래시 버킷: {len(fuzzing_manager.crash_bucket_list(session_id))}
+   • 최소화된 재현 입력: {fuzzing_manager.reproducer_count(session_id)} (대기 {progress.get('tmin_pending', 0)})
    • 행: {progress['hangs']}
         """.strip()
+        if progress.get("cmin_total"):
+            result += f"""
+
+🗜️ 코퍼스 최소화:
+   • 입력: {progress['cmin_total']:,} (트레이스 {progress['cmin_done']:,}개 완료, 캐시 적중 {progress['cmin_cached']:,})
+   • 유지: {progress['cmin_kept']:,}"""
+        if session.tmpfs_mb:
+            written, checkpointed = progress.get("tmpfs_written_bytes", 0), progress.get("checkpoint_bytes", 0)
+            result += f"""
+
+💾 tmpfs 작업 디렉토리 (한도 {session.tmpfs_mb} MiB):
+   • 사용량: {format_bytes(progress.get('tmpfs_used_bytes', 0))}
+   • 퍼저 쓰기: {format_bytes(written)} → 체크포인트 {format_bytes(checkpointed)}
+   • 절약한 디스크 쓰기: {format_bytes(max(0, written - checkpointed))}"""
+        if session.error:
+            result += f"\n\n⚠️ 오류: {session.error}"
+        if session.harness_mode in FORKING_HARNESS_MODES and status in ACTIVE_STATUSES:
+            result += ("\n\n💡 실행마다 fork하는 타겟입니다. generate_persistent_harness()로 __AFL_LOOP 하네스를 만들면"
+                       " 보통 10~50배 빨라집니다.")
+        if archived:
+            result += f"\n\n🗄️ 보관됨: {archived.archived_at} (디스크 보관소에서 읽음)"
         
         return result
         
@@ -823,38 +5205,342 @@ def get_hybrid_fuzzing_status(session_id: str) -> str:
         return f"❌ 퍼징 상태 조회 실패: {str(e)}"
 
 @app.tool()
-def list_fuzzing_sessions() -> str:
-    """모든 퍼징 세션 목록을 반환합니다."""
+@instrument_tool
+def get_session_history(
+    session_id: str,
+    window_seconds: int = 3600,
+    resolution: str = "auto",
+    metrics: str = ""
+) -> str:
+    """퍼징 세션의 진행 상황 이력을 JSON으로 반환합니다.
+
+    resolution은 1s(최근 1시간), 1m(최근 1일), 15m(최근 7일), auto 중 하나이며,
+    metrics는 쉼표로 구분한 지표 이름입니다 (비우면 전체).
+    """
     try:
-        sessions = fuzzing_manager.list_sessions()
-        if not sessions:
+        if not fuzzing_manager.get_session(session_id) and not fuzzing_manager.archived_session(session_id):
+            return f"❌ 세션을 찾을 수 없습니다: {session_id}"
+        resolutions = [name for name, _, _ in HISTORY_RESOLUTIONS]
+        if resolution != "auto" and resolution not in resolutions:
+            return f"❌ 지원하지 않는 해상도입니다: {resolution} ({', '.join(resolutions)}, auto 중 선택)"
+        selected = tuple(m.strip() for m in metrics.split(",") if m.strip()) or HISTORY_METRICS
+        unknown = [m for m in selected if m not in HISTORY_METRICS]
+        if unknown:
+            return f"❌ 지원하지 않는 지표입니다: {', '.join(unknown)}"
+
+        history = fuzzing_manager.session_history(session_id)
+        if history is None:
+            history = ProgressHistory()
+        data = history.window(window_seconds, resolution, selected)
+        data["session_id"] = session_id
+        return json.dumps(data, ensure_ascii=False)
+    except Exception as e:
+        return f"❌ 진행 상황 이력 조회 실패: {str(e)}"
+
+# persistent 모드 하네스 템플릿 (AFL++ 공유 메모리 테스트 케이스 + __AFL_LOOP)
+HARNESS_INPUT_STYLES = ("buffer", "string", "file")
+HARNESS_DEFAULT_LOOP_COUNT = 10000
+_C_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+_PERSISTENT_HARNESS_TEMPLATE = """/*
+ * {entry_function}용 AFL++ persistent 모드 하네스 (자동 생성)
+ *
+ * 빌드: afl-clang-fast -O2 -g -o {output} {output}.c <라이브러리 소스/오브젝트>
+ *       (LLVM LTO를 쓸 수 있으면 afl-clang-lto, ASan은 AFL_USE_ASAN=1)
+ * 실행: start_hybrid_fuzzing(target_binary="./{output}", ...)
+ *       입력은 공유 메모리로 전달되므로 @@가 필요 없습니다.
+ *
+ * 한 프로세스에서 최대 {loop_count}번 반복하므로 {entry_function}이 전역 상태를 남기면
+ * 반복 사이에 초기화하거나 반복 횟수를 줄이세요.
+ */
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+{include}
+#ifndef __AFL_FUZZ_TESTCASE_LEN
+/* afl-clang-fast 없이 빌드하면 stdin 입력 하나를 처리하고 끝나는 일반 프로그램이 됩니다 (크래시 재현용) */
+ssize_t fuzz_len;
+unsigned char fuzz_buf[1024000];
+#define __AFL_FUZZ_TESTCASE_LEN fuzz_len
+#define __AFL_FUZZ_TESTCASE_BUF fuzz_buf
+#define __AFL_FUZZ_INIT() void sync(void);
+#define __AFL_LOOP(x) ((fuzz_len = read(0, fuzz_buf, sizeof(fuzz_buf))) > 0 ? 1 : 0)
+#define __AFL_INIT() sync()
+#endif
+
+__AFL_FUZZ_INIT();
+
+int main(int argc, char **argv) {{
+{setup}#ifdef __AFL_HAVE_MANUAL_CONTROL
+  __AFL_INIT();  /* 여기까지는 포크서버가 한 번만 실행합니다 */
+#endif
+  unsigned char *buf = __AFL_FUZZ_TESTCASE_BUF;  /* __AFL_INIT() 뒤, 루프 앞에서 가져와야 합니다 */
+  while (__AFL_LOOP({loop_count})) {{
+    int len = __AFL_FUZZ_TESTCASE_LEN;
+{call}  }}
+{teardown}  return 0;
+}}
+"""
+
+_HARNESS_CALLS = {
+    "buffer": ("", "    {entry}(buf, (size_t)len);\n", ""),
+    "string": ("", """    char *text = malloc((size_t)len + 1);
+    if (!text) abort();
+    memcpy(text, buf, (size_t)len);
+    text[len] = '\\0';
+    {entry}(text);
+    free(text);
+""", ""),
+    # 포크서버는 __AFL_INIT() 시점의 상태에서 자식마다 fork하므로 임시 파일은 자식이 루프 안에서 처음 필요할 때 만든다.
+    # 만들자마자 지우고 /dev/fd/<fd> 경로를 넘기므로 크래시나 타임아웃으로 죽은 자식도 파일을 남기지 않는다
+    "file": ("""  char path[32] = "";
+  int fd = -1;
+""", """    if (fd < 0) {
+      char tmp_path[] = "/dev/shm/afl-input-XXXXXX";  /* tmpfs에 두어 디스크 쓰기를 피한다 */
+      fd = mkstemp(tmp_path);
+      if (fd < 0) {
+        strcpy(tmp_path, "/tmp/afl-input-XXXXXX");
+        fd = mkstemp(tmp_path);
+      }
+      if (fd < 0) {
+        perror("mkstemp");
+        abort();
+      }
+      unlink(tmp_path);
+      snprintf(path, sizeof(path), "/dev/fd/%d", fd);
+    }
+    if (ftruncate(fd, 0) != 0 || pwrite(fd, buf, (size_t)len, 0) != len || lseek(fd, 0, SEEK_SET) != 0) abort();
+    {entry}(path);
+""", """  if (fd >= 0) close(fd);
+""")
+}
+
+# header를 주지 않았을 때 넣는 선언 (clang 16 이상은 암시적 함수 선언을 오류로 처리)
+_HARNESS_PROTOTYPES = {
+    "buffer": "int {entry}(const uint8_t *data, size_t size);",
+    "string": "int {entry}(const char *text);",
+    "file": "int {entry}(const char *path);"
+}
+
+def render_persistent_harness(entry_function: str, header: str = "", input_style: str = "buffer",
+                              loop_count: int = HARNESS_DEFAULT_LOOP_COUNT, init_function: str = "") -> str:
+    """라이브러리 함수를 __AFL_LOOP로 반복 호출하는 C 하네스 소스를 만듭니다."""
+    for name in (entry_function, init_function):
+        if name and not _C_IDENTIFIER_RE.fullmatch(name):
+            raise ValueError(f"C 함수 이름이 아닙니다: {name}")
+    if not entry_function:
+        raise ValueError("entry_function이 필요합니다")
+    if input_style not in _HARNESS_CALLS:
+        raise ValueError(f"지원하지 않는 입력 방식입니다: {input_style} ({', '.join(HARNESS_INPUT_STYLES)} 중 선택)")
+    if loop_count < 1:
+        raise ValueError("loop_count는 1 이상이어야 합니다")
+    if any(c in header for c in '"\n'):
+        raise ValueError(f"헤더 이름이 올바르지 않습니다: {header!r}")
+    if header:
+        include = f"#include {header}\n" if header.startswith("<") else f'#include "{header}"\n'
+    else:
+        include = "\n/* 헤더가 없어 만든 선언입니다. 실제 시그니처와 다르면 고치세요 */\n"
+        include += _HARNESS_PROTOTYPES[input_style].replace("{entry}", entry_function) + "\n"
+        if init_function:
+            include += f"void {init_function}(void);\n"
+    setup, call, teardown = _HARNESS_CALLS[input_style]
+    if init_function:
+        setup = f"  {init_function}();  /* 포크서버 시작 전 한 번만 초기화 */\n" + setup
+    return _PERSISTENT_HARNESS_TEMPLATE.format(
+        entry_function=entry_function, output=f"{entry_function}_harness", include=include,
+        loop_count=loop_count, setup=setup, call=call.replace("{entry}", entry_function), teardown=teardown
+    )
+
+@app.tool()
+@instrument_tool
+def generate_persistent_harness(
+    entry_function: str,
+    header: str = "",
+    input_style: str = "buffer",
+    loop_count: int = HARNESS_DEFAULT_LOOP_COUNT,
+    init_function: str = ""
+) -> str:
+    """라이브러리 타겟용 AFL++ persistent 모드 하네스(C) 템플릿을 만듭니다.
+
+    input_style은 entry_function에 입력을 넘기는 방식입니다. buffer는 (const uint8_t *data, size_t size),
+    string은 NUL로 끝나는 문자열, file은 입력을 쓴 임시 파일 경로(이미 지운 파일의 /dev/fd/<fd>)를 받는 함수에 씁니다.
+    header를 주지 않으면 input_style에 맞는 entry_function 선언을 넣습니다.
+    init_function을 주면 포크서버가 시작되기 전에 한 번만 호출합니다.
+    """
+    try:
+        source = render_persistent_harness(entry_function, header, input_style, loop_count, init_function)
+        output = f"{entry_function}_harness"
+        return f"""🧩 persistent 모드 하네스: {entry_function} (입력 방식: {input_style}, 반복 {loop_count:,}회)
+
+```c
+{source}```
+
+📝 사용 방법:
+1. 위 코드를 {output}.c로 저장
+2. 빌드: afl-clang-fast -O2 -g -o {output} {output}.c <라이브러리>
+3. 퍼징: start_hybrid_fuzzing(target_binary="./{output}", input_dir=...)
+
+💡 에이전트가 시작할 때 persistent 모드로 판별되는지 get_hybrid_fuzzing_status에서 확인하세요.
+   포크서버 방식보다 보통 10~50배 많은 입력을 실행합니다."""
+    except Exception as e:
+        return f"❌ 하네스 생성 실패: {str(e)}"
+
+@app.tool()
+@instrument_tool
+def get_harness_report() -> str:
+    """활성 세션의 타겟별 하네스 모드(persistent/지연 포크서버/포크서버/계측 없음)와 초당 실행을 보여줍니다.
+
+    persistent 모드가 아닌 타겟을 초당 실행이 큰 순서로 먼저 보여주므로 하네스를 바꿀 대상을 고를 때 씁니다.
+    """
+    try:
+        groups = fuzzing_manager.harness_report()
+        if not groups:
             return "📋 실행 중인 퍼징 세션이 없습니다."
-        
-        result = "📋 퍼징 세션 목록\n\n"
-        for session in sessions:
-            status_emoji = {
-                "created": "🆕",
-                "starting": "🚀",
-                "running": "🔄",
-                "completed": "✅",
-                "stopped": "⏹️",
-                "error": "❌"
-            }
-            emoji = status_emoji.get(session["status"], "❓")
-            
-            result += f"{emoji} 세션: {session['id'][:8]}...\n"
-            result += f"   상태: {session['status']}\n"
-            result += f"   에이전트: {session['agent_id']}\n"
-            result += f"   타겟: {session['target_binary']}\n"
-            result += f"   생성: {session['created_at']}\n"
+        result = f"🧩 하네스 모드 보고서 (활성 세션 {sum(g['sessions'] for g in groups)}개, 타겟 {len(groups)}개)\n\n"
+        for group in groups:
+            mode = group["harness_mode"]
+            result += f"{HARNESS_MODES.get(mode, '⏳ 확인 전')}\n"
+            result += f"   타겟: {group['target_binary']}\n"
+            result += f"   세션 {group['sessions']}개, 초당 실행 합계 {group['execs_per_sec']:,.1f}\n"
+            if mode in FORKING_HARNESS_MODES:
+                result += "   💡 generate_persistent_harness()로 __AFL_LOOP 하네스를 만들면 보통 10~50배 빨라집니다\n"
+            elif mode == "uninstrumented":
+                result += "   💡 afl-clang-fast/afl-clang-lto로 다시 빌드하거나 QEMU(-Q) 모드가 필요합니다\n"
             result += "─" * 40 + "\n"
-        
+        # 아직 판별 전(None)이거나 판별하지 못한(unknown) 타겟은 경고에 넣지 않는다
+        forking = [g for g in groups if g["harness_mode"] in (*FORKING_HARNESS_MODES, "uninstrumented")]
+        if forking:
+            result += f"\n⚠️ persistent 모드가 아닌 타겟 {len(forking)}개 (초당 실행 합계 {sum(g['execs_per_sec'] for g in forking):,.1f})\n"
+        return result
+    except Exception as e:
+        return f"❌ 하네스 보고서 조회 실패: {str(e)}"
+
+@app.tool()
+@instrument_tool
+def get_schedule_report(session_id: str) -> str:
+    """적응형 스케줄 세션의 설정(파워 스케줄 x 변이기)별 배정 인스턴스, 누적 보상, 최근 보상 이력을 보여줍니다.
+
+    보상은 보조 인스턴스가 배정 주기 동안 찾은 새 경로 수를 코어 사용 시간으로 나눈 값(경로/CPU시간)이며,
+    사후 평균은 에이전트의 밴딧이 다음 배정에 쓰는, 오래된 관측일수록 적게 반영한 추정치입니다.
+    """
+    try:
+        session = fuzzing_manager.get_session(session_id)
+        if not session:
+            archived = fuzzing_manager.archived_session(session_id)
+            session = archived.record if archived else None
+        if not session:
+            return f"❌ 세션을 찾을 수 없습니다: {session_id}"
+        if not session.adaptive_schedules:
+            return f"❌ 적응형 스케줄 세션이 아닙니다: {session_id}\n\n💡 start_hybrid_fuzzing(..., adaptive_schedules=True)로 시작하세요."
+        arms = session.schedule_arms
+        if not arms:
+            return f"⏳ 에이전트가 아직 설정별 통계를 보고하지 않았습니다: {session_id}"
+
+        assigned = sum(len(arm["instances"]) for arm in arms)
+        result = f"🎰 적응형 파워 스케줄 보고서 ({session_id})\n\n"
+        result += f"📊 설정 {len(arms)}개, 보조 인스턴스 {assigned}개, 세션 상태 {session.status}\n\n"
+        for rank, arm in enumerate(sorted(arms, key=lambda a: a["score"], reverse=True)):
+            medal = ("🥇", "🥈", "🥉")[rank] if rank < 3 else "  "
+            hours = arm["cpu_seconds"] / 3600
+            result += f"{medal} {arm['arm']} ({arm['args'] or '기본값'})\n"
+            result += f"   인스턴스: {', '.join(arm['instances']) or '-'}\n"
+            result += (f"   배정 {arm['pulls']}회, CPU {hours:,.2f}시간, 새 경로 {arm['paths']:,}, "
+                       f"실행 {arm['execs']:,}\n")
+            mean = arm["paths"] / hours if hours else 0.0
+            result += f"   보상 (경로/CPU시간): 누적 평균 {mean:,.1f}, 사후 평균 {arm['score']:,.1f}\n"
+            if arm["history"]:
+                result += f"   최근 보상: {' → '.join(f'{value:,.1f}' for value in arm['history'])}\n"
+            result += "─" * 40 + "\n"
+        return result
+    except Exception as e:
+        return f"❌ 스케줄 보고서 조회 실패: {str(e)}"
+
+@app.tool()
+@instrument_tool
+def list_crash_buckets(session_id: str, limit: int = 50) -> str:
+    """퍼징 세션의 고유 크래시 버킷 목록을 반환합니다."""
+    try:
+        if not fuzzing_manager.get_session(session_id) and not fuzzing_manager.archived_session(session_id):
+            return f"❌ 세션을 찾을 수 없습니다: {session_id}"
+        buckets = fuzzing_manager.crash_bucket_list(session_id)
+        if not buckets:
+            return f"📋 분류된 크래시가 없습니다: {session_id}"
+
+        raw_crashes = fuzzing_manager.classified_crash_count(session_id)
+        result = f"🐞 크래시 버킷 목록 ({session_id})\n\n"
+        result += f"📊 고유 버킷 {len(buckets)}개 / 분류된 크래시 입력 {raw_crashes}개\n\n"
+        for bucket in sorted(buckets, key=lambda b: b["count"], reverse=True)[:limit]:
+            result += f"🆔 {bucket['id']} ({bucket['kind']})\n"
+            result += f"   크래시 수: {bucket['count']}\n"
+            result += f"   스택: {' → '.join(bucket['frames']) or '알 수 없음'}\n"
+            result += f"   처음 발견: {bucket['first_seen']}\n"
+            for sha256 in bucket["samples"]:
+                if fuzzing_manager.crash_store.has(sha256):
+                    result += f"   샘플: {fuzzing_manager.crash_store.path(sha256)}\n"
+                else:
+                    result += f"   샘플: {sha256} (업로드 대기)\n"
+                reproducer = bucket["reproducers"].get(sha256)
+                if reproducer:
+                    path = fuzzing_manager.crash_store.path(reproducer["sha256"])
+                    result += f"     ↳ 최소화: {path} ({reproducer['size']}바이트)\n"
+            result += "─" * 40 + "\n"
+        if len(buckets) > limit:
+            result += f"... 외 {len(buckets) - limit}개 버킷\n"
         return result
+    except Exception as e:
+        return f"❌ 크래시 버킷 조회 실패: {str(e)}"
+
+@app.tool()
+@instrument_tool
+def list_fuzzing_sessions(
+    status: str = None,
+    agent_id: str = None,
+    target_binary: str = None,
+    sort: str = "newest",
+    cursor: str = None,
+    limit: int = 20
+) -> str:
+    """퍼징 세션 목록을 조건에 맞춰 한 페이지씩 반환합니다.
+
+    status, agent_id, target_binary로 거르고 sort(newest, oldest, updated, execs_per_sec, paths_total, crashes)로
+    정렬합니다. 다음 페이지는 결과 끝에 표시된 cursor를 넘겨 조회합니다.
+    """
+    try:
+        fuzzing_manager.expire_stale_agents()
+        if limit < 1:
+            return "❌ limit은 1 이상이어야 합니다."
+        if sort not in SESSION_SORT_KEYS:
+            return f"❌ 지원하지 않는 정렬 기준입니다: {sort} ({', '.join(SESSION_SORT_KEYS)} 중 선택)"
+        if cursor and not (cursor.isascii() and cursor.isdigit()):
+            return f"❌ 올바르지 않은 cursor입니다: {cursor} (이전 결과 끝에 표시된 값을 그대로 넘기세요)"
+        sessions, next_cursor = fuzzing_manager.query_sessions(
+            status, agent_id, target_binary, sort, cursor, limit
+        )
+        if not sessions:
+            return "📋 조건에 맞는 퍼징 세션이 없습니다." if cursor is None else "📋 더 이상 세션이 없습니다."
+        
+        total = fuzzing_manager.count_sessions(status, agent_id, target_binary)
+        lines = [f"📋 퍼징 세션 목록 ({len(sessions)}개 표시, 조건에 맞는 세션 {total}개)", ""]
+        for session in sessions:
+            lines += [
+                f"{STATUS_EMOJI.get(session.status, '❓')} 세션: {session.id[:8]}...",
+                f"   상태: {session.status}",
+                f"   에이전트: {session.agent_id}",
+                f"   타겟: {session.target_binary}",
+                f"   생성: {format_timestamp(session.created_at)}",
+                "─" * 40
+            ]
+        if next_cursor:
+            lines += ["", f"➡️ 다음 페이지: cursor=\"{next_cursor}\""]
+        return "\n".join(lines) + "\n"
         
     except Exception as e:
         return f"❌ 세션 목록 조회 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def stop_hybrid_fuzzing(session_id: str) -> str:
     """하이브리드 퍼징을 중지합니다."""
     try:
@@ -862,18 +5548,16 @@ def stop_hybrid_fuzzing(session_id: str) -> str:
         if not session:
             return f"❌ 세션을 찾을 수 없습니다: {session_id}"
         
-        if session["status"] in ["completed", "stopped", "error"]:
-            return f"ℹ️ 세션이 이미 {session['status']} 상태입니다."
-        
-        # 세션 상태를 중지로 업데이트
-        fuzzing_manager.update_session_status(session_id, "stopped")
+        # 세션 상태를 중지로 업데이트 (이미 끝난 세션인지는 같은 락 안에서 확인)
+        if not fuzzing_manager.update_session_status(session_id, "stopped", only_from=ACTIVE_STATUSES):
+            return f"ℹ️ 세션이 이미 {session.status} 상태입니다."
         
         return f"""
 ⏹️ 퍼징 세션 중지됨
 
 🆔 세션 ID: {session_id}
 📅 중지 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-🎯 타겟: {session['target_binary']}
+🎯 타겟: {session.target_binary}
 
 💡 세션 정리: cleanup_fuzzing_session("{session_id}")
         """.strip()
@@ -882,6 +5566,7 @@ def stop_hybrid_fuzzing(session_id: str) -> str:
         return f"❌ 퍼징 중지 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def cleanup_fuzzing_session(session_id: str) -> str:
     """퍼징 세션을 정리합니다."""
     try:
@@ -893,13 +5578,16 @@ def cleanup_fuzzing_session(session_id: str) -> str:
         return f"❌ 세션 정리 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
 def get_system_status() -> str:
     """시스템 전체 상태를 확인합니다."""
     try:
-        total_agents = len(fuzzing_manager.agents)
-        connected_agents = sum(fuzzing_manager.agent_connections.values())
+        fuzzing_manager.expire_stale_agents()
+        counters = fuzzing_manager.counters
+        total_agents = counters.agents_total
+        connected_agents = counters.agents_connected
         total_sessions = len(fuzzing_manager.sessions)
-        active_sessions = sum(1 for s in fuzzing_manager.sessions.values() if s["status"] in ["starting", "running"])
+        active_sessions = sum(counters.sessions_by_status.get(status, 0) for status in ("starting", "minimizing", "running"))
         
         result = f"""
 📊 하이브리드 AFL++ 서버 상태
@@ -913,6 +5601,12 @@ def get_system_status() -> str:
    • 총 세션: {total_sessions}
    • 활성 세션: {active_sessions}
    • 완료/중지: {total_sessions - active_sessions}
+   • 디스크에 보관됨: {fuzzing_manager.archive.count() if fuzzing_manager.archive else 0}
+
+📈 전체 진행 상황:
+   • 초당 실행 (활성 세션 합계): {counters.execs_per_sec:,.1f}
+   • 총 실행 횟수: {counters.execs_done:,}
+   • 총 크래시: {counters.crashes:,}
 
 ⏰ 서버 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         """.strip()
@@ -923,6 +5617,53 @@ def get_system_status() -> str:
         return f"❌ 시스템 상태 조회 실패: {str(e)}"
 
 @app.tool()
+@instrument_tool
+def get_server_profile(tool: str = None, reset: bool = False) -> str:
+    """MCP 도구별 실행 시간, CPU 시간, 메모리 할당, 오류 종류 프로파일을 확인합니다.
+
+    서버를 AFL_MCP_PROFILE=1로 실행해야 기록되며, AFL_MCP_PROFILE_SLOW_MS를 주면 그보다 느린 호출의
+    스택 샘플이 AFL_MCP_PROFILE_DIR(기본 profiles/)에 flamegraph용 .folded 파일로 저장됩니다.
+
+    Args:
+        tool: 이 도구만 표시 (생략하면 전체)
+        reset: 표시한 뒤 기록을 초기화
+    """
+    try:
+        if not tool_profiler.enabled:
+            return "⚠️ 도구 프로파일링이 꺼져 있습니다.\n\n💡 서버를 AFL_MCP_PROFILE=1 환경 변수로 실행하면 기록됩니다."
+        profile = tool_profiler.snapshot()
+        if tool is not None:
+            profile = {name: stats for name, stats in profile.items() if name == tool}
+        slow_calls = [call for call in tool_profiler.slow_calls if tool is None or call["tool"] == tool]
+        if reset:
+            tool_profiler.reset()
+        if not profile:
+            return "📭 기록된 도구 호출이 없습니다."
+        
+        result = f"🔬 MCP 도구 프로파일 ({len(profile)}개 도구)\n"
+        for name, stats in sorted(profile.items(), key=lambda item: -item[1]["wall_us"]["p99"]):
+            wall, cpu, alloc = stats["wall_us"], stats["cpu_us"], stats["alloc_peak"]
+            result += f"\n🛠️ {name} — 호출 {stats['calls']:,}회\n"
+            result += f"   • 실행 시간(ms): p50 {wall['p50'] / 1000:.2f} / p90 {wall['p90'] / 1000:.2f} / p99 {wall['p99'] / 1000:.2f} / 최대 {wall['max'] / 1000:.2f}\n"
+            result += f"   • CPU 시간(ms): p50 {cpu['p50'] / 1000:.2f} / p99 {cpu['p99'] / 1000:.2f} / 최대 {cpu['max'] / 1000:.2f}\n"
+            result += f"   • 최대 할당(KiB): p50 {alloc['p50'] / 1024:.1f} / 최대 {alloc['max'] / 1024:.1f}\n"
+            if stats["errors"]:
+                errors = ", ".join(f"{error} {count}" for error, count in sorted(stats["errors"].items(), key=lambda item: -item[1]))
+                result += f"   • ❌ 오류: {errors}\n"
+        if slow_calls:
+            result += f"\n🐢 느린 호출 (>{tool_profiler.slow_ms:g}ms, 최근 {len(slow_calls)}개):\n"
+            for call in reversed(slow_calls):
+                result += f"   • {call['at']} {call['tool']} {call['wall_ms']}ms, 샘플 {call['samples']}개 → {call['path'] or '저장 실패'}\n"
+        if reset:
+            result += "\n🧹 프로파일 기록을 초기화했습니다."
+        
+        return result.strip()
+        
+    except Exception as e:
+        return f"❌ 서버 프로파일 조회 실패: {str(e)}"
+
+@app.tool()
+@instrument_tool
 def install_local_agent_to_client(
     agent_name: str = None,
     install_dir: str = None
@@ -1008,6 +5749,7 @@ def generate_install_script(platform: str, agent_name: str, install_dir: str, ag
     """플랫폼별 설치 스크립트 생성"""
     
     if platform == "win32":
+        escaped_agent_code = agent_code.replace(chr(10), "\\n")
         return f'''@echo off
 echo {agent_name} 설치 중...
 echo.
@@ -1018,10 +5760,10 @@ cd "{install_dir}"
 
 REM 에이전트 파일 생성
 echo {agent_name} 파일 생성 중...
-echo {agent_code.replace(chr(10), "\\n")} > local_agent.py
+echo {escaped_agent_code} > local_agent.py
 
 REM requirements.txt 생성
-echo requests>=2.31.0 > requirements.txt
+echo aiohttp>=3.9.0 > requirements.txt
 
 REM 실행 스크립트 생성
 echo @echo off > run.bat
@@ -1054,7 +5796,7 @@ EOF
 
 # requirements.txt 생성
 cat > requirements.txt << 'EOF'
-requests>=2.31.0
+aiohttp>=3.9.0
 psutil>=5.9.0
 EOF
 
@@ -1115,6 +5857,7 @@ echo ""
 '''
 
 @app.tool()
+@instrument_tool
 def get_agent_install_guide(platform: str = None) -> str:
     """특정 플랫폼용 에이전트 설치 가이드를 제공합니다."""
     
@@ -1147,7 +5890,7 @@ sudo make install
 
 2️⃣ **Python 의존성 설치:**
 ```bash
-pip3 install requests psutil
+pip3 install aiohttp psutil
 ```
 
 3️⃣ **에이전트 실행:**
@@ -1172,7 +5915,7 @@ sudo make install
 
 2️⃣ **Python 의존성 설치:**
 ```bash
-pip3 install requests psutil
+pip3 install aiohttp psutil
 ```
 
 3️⃣ **에이전트 실행:**
@@ -1189,7 +5932,7 @@ python3 local_agent.py --server-url <서버URL>
 
 2️⃣ **Python 의존성 설치:**
 ```cmd
-pip install requests psutil
+pip install aiohttp psutil
 ```
 
 3️⃣ **에이전트 실행:**
@@ -1213,5 +5956,24 @@ install_local_agent_to_client() 함수를 사용하세요!
     except Exception as e:
         return f"❌ 설치 가이드 생성 실패: {str(e)}"
 
+# MCP 클라이언트(/mcp)와 로컬 에이전트(/telemetry 등)가 같은 HTTP 서버로 접속합니다
+SERVER_HOST = os.environ.get("AFL_MCP_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("AFL_MCP_PORT", "8000"))
+
+def init_state_store(path: str = STATE_DB_PATH) -> Optional[SessionStore]:
+    """SQLite 상태 저장소를 열고 저장된 상태로 전역 매니저를 복원합니다."""
+    if not path:
+        return None
+    store = SQLiteSessionStore(path)
+    fuzzing_manager.attach_store(store)
+    atexit.register(store.close)
+    return store
+
 if __name__ == "__main__":
-    app.run()
+    parser = argparse.ArgumentParser(description="AFL++ 하이브리드 퍼징 MCP 서버")
+    parser.add_argument("--host", default=SERVER_HOST, help="바인드할 주소 (AFL_MCP_HOST)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="바인드할 포트 (AFL_MCP_PORT)")
+    args = parser.parse_args()
+    init_state_store()
+    # stdio 전송으로는 에이전트용 HTTP 엔드포인트가 열리지 않으므로 HTTP로 실행한다
+    app.run(transport="http", host=args.host, port=args.port)
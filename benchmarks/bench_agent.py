@@ -0,0 +1,228 @@
+"""에이전트/서버 수집 벤치마크.
+
+서버와 생성된 로컬 에이전트를 띄우고, afl-fuzz 대신 fake_afl_fuzz.py를 실행하게 해
+fuzzer_stats와 크래시가 디스크에 쓰인 뒤 서버 세션에 반영되기까지 걸리는 시간과
+에이전트/서버의 CPU 사용량을 잽니다. FAKE_AFL_SPEEDUP으로 실제보다 10~100배 빠른 부하를 만들 수 있습니다.
+
+사용 예:
+    python benchmarks/bench_agent.py
+    python benchmarks/bench_agent.py --instances 4 --speedup 50 --crash-rate 1 --seconds 60 --check
+    python benchmarks/bench_agent.py --tmpfs-mb 256  # tmpfs 작업 디렉토리 + 체크포인트
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import (LatencyRecorder, add_baseline_arguments, build_result, cpu_seconds, finish, print_report,
+                     rss_bytes, start_server)
+
+import afl_plus_plus_server as server
+
+FAKE_AFL_FUZZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_afl_fuzz.py")
+AGENT_ID = "bench-agent"
+SNAPSHOT_INTERVAL = 1.0  # 디스크 상태를 찍는 주기 (초)
+POLL_INTERVAL = 0.1  # 서버 상태 조회 주기 (초)
+CATCH_UP_TIMEOUT = 30.0
+
+STATUS_PATTERNS = {
+    "execs_done": re.compile(r"실행 횟수: ([\d,]+)"),
+    "crashes": re.compile(r"• 크래시: (\d+)"),
+    "buckets": re.compile(r"고유 크래시 버킷: (\d+)"),
+    "tmpfs_written": re.compile(r"퍼저 쓰기: ([\d,.]+ \w+)"),
+    "checkpoint": re.compile(r"→ 체크포인트 ([\d,.]+ \w+)")
+}
+BYTE_UNITS = {"B": 1, "KiB": 2**10, "MiB": 2**20, "GiB": 2**30}
+
+def disk_totals(output_dir: str) -> dict:
+    """인스턴스 fuzzer_stats의 execs_done 합과 crashes/의 크래시 파일 수를 셉니다."""
+    execs = crashes = 0
+    try:
+        instances = [entry.path for entry in os.scandir(output_dir) if entry.is_dir()]
+    except OSError:
+        return {"execs_done": 0, "crashes": 0}
+    for instance in instances:
+        try:
+            with open(os.path.join(instance, "fuzzer_stats")) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key.strip() == "execs_done":
+                        execs += int(value)
+        except (OSError, ValueError):
+            pass
+        try:
+            crashes += sum(1 for name in os.listdir(os.path.join(instance, "crashes")) if name.startswith("id:"))
+        except OSError:
+            pass
+    return {"execs_done": execs, "crashes": crashes}
+
+def parse_status(text: str) -> dict:
+    values = {}
+    for key, pattern in STATUS_PATTERNS.items():
+        match = pattern.search(text)
+        number, _, unit = (match.group(1).replace(",", "") if match else "0").partition(" ")
+        values[key] = round(float(number) * BYTE_UNITS[unit]) if unit else int(number)
+    return values
+
+async def run(args) -> dict:
+    from fastmcp import Client
+
+    process, base = start_server()
+    workdir = tempfile.mkdtemp(prefix="bench-agent-")
+    agent = None
+    try:
+        seeds = os.path.join(workdir, "seeds")
+        os.makedirs(seeds)
+        for number in range(8):
+            with open(os.path.join(seeds, f"seed{number}"), "wb") as f:
+                f.write(b"seed-%d" % number * (number + 1))
+        agent_path = os.path.join(workdir, "local_agent.py")
+        with open(agent_path, "w") as f:
+            f.write(server.generate_linux_agent("bench-agent", base))
+        tmpfs_root = os.path.join(workdir, "shm")
+        os.makedirs(tmpfs_root)
+        env = dict(os.environ, FAKE_AFL_SPEEDUP=str(args.speedup), FAKE_AFL_CRASH_RATE=str(args.crash_rate),
+                   FAKE_AFL_PATH_RATE=str(args.path_rate), FAKE_AFL_SEED=str(args.seed))
+        agent = subprocess.Popen([sys.executable, agent_path, "--server-url", base, "--agent-id", AGENT_ID,
+                                  "--afl-fuzz", FAKE_AFL_FUZZ, "--tmpfs-root", tmpfs_root], cwd=workdir, env=env,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        output_dir = os.path.join(workdir, "out")
+        recorder = LatencyRecorder()
+
+        async with Client(f"{base}/mcp") as mcp:
+            async def status() -> str:
+                return (await mcp.call_tool("get_system_status", {})).data
+
+            deadline = time.monotonic() + 30
+            while "연결됨: 1" not in await status():
+                if time.monotonic() > deadline or agent.poll() is not None:
+                    raise RuntimeError("에이전트가 서버에 연결되지 않았습니다")
+                await asyncio.sleep(0.2)
+
+            text = (await mcp.call_tool("start_hybrid_fuzzing", {
+                "target_binary": "/bin/true", "input_dir": seeds, "output_dir": output_dir,
+                "agent_id": AGENT_ID, "instances": args.instances, "corpus": "", "tmpfs_mb": args.tmpfs_mb
+            })).data
+            session_id = re.search(r"🆔 세션 ID: (\S+)", text).group(1)
+            durable_dir = output_dir
+            if args.tmpfs_mb:
+                # 퍼저가 실제로 쓰는 tmpfs 작업 디렉토리를 기준으로 서버 반영 시간을 잰다
+                output_dir = os.path.join(tmpfs_root, "afl-mcp", session_id, "out")
+
+            # 에이전트가 세션을 받아 인스턴스를 띄울 때까지 기다린 뒤 측정을 시작한다
+            deadline = time.monotonic() + 30
+            while not disk_totals(output_dir)["execs_done"]:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("가짜 afl-fuzz 인스턴스가 시작되지 않았습니다")
+                await asyncio.sleep(0.2)
+
+            rss_before = rss_bytes(process.pid)
+            cpu_before = {"agent": cpu_seconds(agent.pid), "server": cpu_seconds(process.pid)}
+            started = time.monotonic()
+            pending = []  # (찍은 시각, 디스크 값, 지표 이름)
+            next_snapshot = started
+            server_values = {}
+            while time.monotonic() - started < args.seconds or pending:
+                now = time.monotonic()
+                if now - started >= args.seconds + CATCH_UP_TIMEOUT:
+                    break
+                if now >= next_snapshot and now - started < args.seconds:
+                    next_snapshot += SNAPSHOT_INTERVAL
+                    totals = disk_totals(output_dir)
+                    pending += [(now, totals[key], key) for key in ("execs_done", "crashes") if totals[key]]
+                server_values = parse_status((await mcp.call_tool("get_hybrid_fuzzing_status",
+                                                                  {"session_id": session_id})).data)
+                now = time.monotonic()
+                remaining = []
+                for taken_at, value, key in pending:
+                    if server_values[key] >= value:
+                        recorder.record(f"ingest_{key}", int((now - taken_at) * 1e9))
+                    else:
+                        remaining.append((taken_at, value, key))
+                pending = remaining
+                await asyncio.sleep(POLL_INTERVAL)
+            elapsed = time.monotonic() - started
+            cpu = {"agent": cpu_seconds(agent.pid) - cpu_before["agent"],
+                   "server": cpu_seconds(process.pid) - cpu_before["server"]}
+            final_disk = disk_totals(output_dir)
+            await mcp.call_tool("stop_hybrid_fuzzing", {"session_id": session_id})
+            if args.tmpfs_mb:
+                # 마지막 체크포인트가 원래 출력 디렉토리에 쓰이고 서버에 보고될 때까지 기다린다
+                deadline = time.monotonic() + CATCH_UP_TIMEOUT
+                while time.monotonic() < deadline:
+                    server_values = parse_status((await mcp.call_tool("get_hybrid_fuzzing_status",
+                                                                      {"session_id": session_id})).data)
+                    if (not os.path.exists(output_dir) and server_values["checkpoint"]
+                            and disk_totals(durable_dir)["execs_done"] >= final_disk["execs_done"]):
+                        break
+                    await asyncio.sleep(0.5)
+
+        params = {"instances": args.instances, "speedup": args.speedup, "crash_rate": args.crash_rate,
+                  "path_rate": args.path_rate, "seconds": args.seconds, "seed": args.seed}
+        if args.tmpfs_mb:
+            params["tmpfs_mb"] = args.tmpfs_mb  # 디스크 실행의 기준선 키는 그대로 둔다
+        result = build_result("agent-ingest", params, recorder, elapsed, rss_before, pid=process.pid)
+        result.update({
+            "agent_cpu_percent": round(100 * cpu["agent"] / elapsed, 1),
+            "server_cpu_percent": round(100 * cpu["server"] / elapsed, 1),
+            "disk_execs": final_disk["execs_done"],
+            "disk_crashes": final_disk["crashes"],
+            "server_execs": server_values.get("execs_done", 0),
+            "server_crashes": server_values.get("crashes", 0),
+            "crash_buckets": server_values.get("buckets", 0),
+            "unmatched_snapshots": len(pending)
+        })
+        if args.tmpfs_mb:
+            result.update({
+                "tmpfs_written_bytes": server_values.get("tmpfs_written", 0),
+                "checkpoint_bytes": server_values.get("checkpoint", 0),
+                "durable_execs": disk_totals(durable_dir)["execs_done"],
+                "tmpfs_removed": not os.path.exists(os.path.join(tmpfs_root, "afl-mcp"))
+            })
+        return result
+    finally:
+        if agent is not None:
+            agent.terminate()
+            try:
+                agent.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                agent.kill()
+        process.terminate()
+        process.wait()
+        subprocess.run(["pkill", "-f", f"{FAKE_AFL_FUZZ} -i {workdir}"], stderr=subprocess.DEVNULL)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="가짜 afl-fuzz로 에이전트/서버 수집 속도를 잽니다")
+    parser.add_argument("--instances", type=int, default=2, help="세션 인스턴스 수")
+    parser.add_argument("--speedup", type=float, default=20.0, help="FAKE_AFL_SPEEDUP (실제 대비 부하 배수)")
+    parser.add_argument("--crash-rate", type=float, default=0.2, help="시뮬레이션 초당 크래시 수 (인스턴스별)")
+    parser.add_argument("--path-rate", type=float, default=0.5, help="시뮬레이션 초당 새 queue 항목 수 (인스턴스별)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="측정 시간 (실제 초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tmpfs-mb", type=int, default=0, help="세션 tmpfs 작업 디렉토리 한도 (MiB, 0이면 디스크)")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    print(f"   • CPU: 에이전트 {result['agent_cpu_percent']}%, 서버 {result['server_cpu_percent']}%")
+    print(f"   • 디스크 → 서버: 실행 {result['disk_execs']:,} → {result['server_execs']:,}, "
+          f"크래시 {result['disk_crashes']} → {result['server_crashes']} (버킷 {result['crash_buckets']})")
+    if args.tmpfs_mb:
+        print(f"   • tmpfs: 퍼저 쓰기 {server.format_bytes(result['tmpfs_written_bytes'])} → "
+              f"체크포인트 {server.format_bytes(result['checkpoint_bytes'])}, "
+              f"원래 출력 디렉토리 실행 {result['durable_execs']:,}, 작업 디렉토리 정리 {'됨' if result['tmpfs_removed'] else '안 됨'}")
+    if result["unmatched_snapshots"]:
+        print(f"   ⚠️ {CATCH_UP_TIMEOUT:g}초 안에 서버에 반영되지 않은 스냅샷: {result['unmatched_snapshots']}개")
+    return finish(args, [result])
+
+if __name__ == "__main__":
+    sys.exit(main())
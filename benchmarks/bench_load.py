@@ -0,0 +1,343 @@
+"""하이브리드 퍼징 서버 부하 벤치마크.
+
+N개의 에이전트가 등록해 실제 에이전트와 같은 주기로 하트비트, 세션 목록 동기화, fuzzer_stats 델타를 보내고,
+클라이언트가 M개의 세션을 만들고 상태를 조회하다가 중지/정리하는 과정을 가상 시간으로 압축해 재생합니다.
+
+시나리오:
+    manager  HybridFuzzingManager 메서드를 직접 호출 (자료 구조 비용만 측정)
+    tools    에이전트 쪽은 매니저 메서드, 클라이언트 쪽은 MCP 도구 함수를 프로세스 안에서 호출
+    http     서버를 별도 프로세스로 띄우고 에이전트 HTTP 엔드포인트와 MCP(streamable HTTP)로 호출
+
+사용 예:
+    python benchmarks/bench_load.py manager
+    python benchmarks/bench_load.py all --check
+    python benchmarks/bench_load.py manager --agents 2000 --sessions 20000 --update-baseline
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import LatencyRecorder, add_baseline_arguments, build_result, finish, print_report, rss_bytes, start_server
+
+import afl_plus_plus_server as server
+
+# LocalAgent와 같은 주기 (초)
+HEARTBEAT_INTERVAL = 30.0
+SESSION_SYNC_INTERVAL = 5.0
+STATS_INTERVAL = 2.0
+# 클라이언트(MCP 사용자) 조회 빈도 (가상 시간 초당)
+POLL_RATE = 20.0
+LIST_RATE = 1.0
+SYSTEM_RATE = 0.2
+CLEANUP_RATIO = 0.5  # 중지한 세션 중 정리까지 하는 비율
+
+PRESETS = {
+    "manager": {"agents": 1000, "sessions": 5000, "duration": 120},
+    "tools": {"agents": 200, "sessions": 1000, "duration": 120},
+    "http": {"agents": 50, "sessions": 200, "duration": 60}
+}
+
+SESSION_ID_RE = re.compile(r"🆔 세션 ID: (\S+)")
+
+class Simulation:
+    """가상 시간 순서로 이벤트를 만들고, 에이전트가 아는 세션과 보고할 진행 상황을 관리합니다."""
+
+    def __init__(self, agents: int, sessions: int, duration: float, seed: int = 1):
+        self.rng = random.Random(seed)
+        self.duration = duration
+        self.agent_ids = [f"bench-agent-{i:05d}" for i in range(agents)]
+        self.session_ids = {}  # 시뮬레이션 세션 번호 -> 서버 세션 ID
+        self.created = []  # 만든 순서대로의 서버 세션 ID
+        self.agent_sessions = {agent_id: set() for agent_id in self.agent_ids}  # 에이전트가 동기화로 받은 실행 세션
+        self.progress = {}  # 서버 세션 ID -> [execs_done, paths_total]
+        self._heap = []
+        self._seq = 0
+        rng = self.rng
+        for agent_id in self.agent_ids:
+            self._push(rng.uniform(0, HEARTBEAT_INTERVAL), "heartbeat", agent_id)
+            self._push(rng.uniform(0, SESSION_SYNC_INTERVAL), "agent_sessions", agent_id)
+            self._push(rng.uniform(0, STATS_INTERVAL), "progress", agent_id)
+        for number in range(sessions):
+            self._push(rng.uniform(0, 0.2 * duration), "create", number)
+            stop_at = rng.uniform(0.7, 0.95) * duration
+            self._push(stop_at, "stop", number)
+            if rng.random() < CLEANUP_RATIO:
+                self._push(stop_at + 1.0, "cleanup", number)
+        self._push(rng.expovariate(POLL_RATE), "poll", None)
+        self._push(rng.expovariate(LIST_RATE), "list", None)
+        self._push(rng.expovariate(SYSTEM_RATE), "system", None)
+
+    def _push(self, at: float, kind: str, arg):
+        if at < self.duration:
+            self._seq += 1
+            heapq.heappush(self._heap, (at, self._seq, kind, arg))
+
+    def events(self):
+        """(종류, 인자)를 가상 시간 순서로 내보내고, 주기 이벤트는 다음 차례를 다시 예약합니다."""
+        rng = self.rng
+        periods = {"heartbeat": HEARTBEAT_INTERVAL, "agent_sessions": SESSION_SYNC_INTERVAL, "progress": STATS_INTERVAL}
+        rates = {"poll": POLL_RATE, "list": LIST_RATE, "system": SYSTEM_RATE}
+        while self._heap:
+            at, _, kind, arg = heapq.heappop(self._heap)
+            if kind in periods:
+                self._push(at + periods[kind], kind, arg)
+            elif kind in rates:
+                self._push(at + rng.expovariate(rates[kind]), kind, arg)
+            yield kind, arg
+
+    def resources(self, agent_id: str) -> dict:
+        running = len(self.agent_sessions[agent_id])
+        return {"cpu_count": 8, "free_cores": max(0, 8 - running), "load_avg": float(min(running, 8)),
+                "mem_available": 8 << 30, "sessions": running}
+
+    def random_session(self):
+        """조회할 세션을 고릅니다. 정리된 세션도 조회 대상입니다 (없는 세션 응답 경로)."""
+        return self.rng.choice(self.created) if self.created else None
+
+    def on_agent_sessions(self, agent_id: str, sessions: list):
+        self.agent_sessions[agent_id] = {s["id"] for s in sessions if s["status"] in ("starting", "running")}
+
+    def updates(self, agent_id: str) -> dict:
+        """에이전트가 다음 보고에 담을 세션별 델타를 만듭니다."""
+        updates = {}
+        for session_id in self.agent_sessions[agent_id]:
+            progress = self.progress.setdefault(session_id, [0, 1])
+            execs_per_sec = self.rng.randint(500, 5000)
+            progress[0] += int(execs_per_sec * STATS_INTERVAL)
+            delta = {"execs_done": progress[0], "execs_per_sec": execs_per_sec}
+            if self.rng.random() < 0.1:
+                progress[1] += 1
+                delta["paths_total"] = progress[1]
+            updates[session_id] = {"status": "running", "progress": delta}
+        return updates
+
+    def on_created(self, number: int, session_id):
+        if session_id:
+            self.session_ids[number] = session_id
+            self.created.append(session_id)
+
+def new_manager() -> server.HybridFuzzingManager:
+    """상태 저장소 없이 새 매니저를 만들고 도구들이 쓰는 전역 매니저로 설치합니다."""
+    manager = server.HybridFuzzingManager()
+    server.fuzzing_manager = manager
+    return manager
+
+class ManagerBackend:
+    """매니저 메서드를 직접 호출합니다 (HTTP 엔드포인트와 MCP 도구가 내부에서 부르는 것과 같음)."""
+
+    def __init__(self):
+        self.manager = new_manager()
+
+    def register(self, agent_id, resources):
+        self.manager.register_agent(agent_id, {"platform": "linux", "resources": resources})
+
+    def heartbeat(self, agent_id, resources):
+        self.manager.expire_stale_agents()
+        self.manager.record_heartbeat(agent_id, resources)
+
+    def agent_sessions(self, agent_id):
+        return self.manager.get_agent_sessions(agent_id)
+
+    def progress(self, agent_id, updates):
+        self.manager.apply_agent_updates(agent_id, updates)
+
+    def create(self, instances):
+        agent_id = self.manager.select_agent(instances)
+        session_id = self.manager.create_session(agent_id, "/bench/target", "/bench/in", "/bench/out", instances)
+        self.manager.update_session_status(session_id, "starting")
+        return session_id
+
+    def poll(self, session_id):
+        return self.manager.get_session(session_id)
+
+    def list(self):
+        return self.manager.query_sessions(status="running", limit=20)
+
+    def system(self):
+        return self.manager.counters.snapshot()
+
+    def stop(self, session_id):
+        self.manager.update_session_status(session_id, "stopped")
+
+    def cleanup(self, session_id):
+        self.manager.cleanup_session(session_id)
+
+class ToolBackend(ManagerBackend):
+    """클라이언트 쪽 연산을 MCP 도구 함수로 호출합니다 (응답 문자열 생성 비용 포함)."""
+
+    def create(self, instances):
+        match = SESSION_ID_RE.search(server.start_hybrid_fuzzing("/bench/target", "/bench/in", instances=instances))
+        return match.group(1) if match else None
+
+    def poll(self, session_id):
+        return server.get_hybrid_fuzzing_status(session_id)
+
+    def list(self):
+        return server.list_fuzzing_sessions(status="running")
+
+    def system(self):
+        return server.get_system_status()
+
+    def stop(self, session_id):
+        return server.stop_hybrid_fuzzing(session_id)
+
+    def cleanup(self, session_id):
+        return server.cleanup_fuzzing_session(session_id)
+
+def run_sync(name: str, backend, agents: int, sessions: int, duration: float, seed: int) -> dict:
+    sim = Simulation(agents, sessions, duration, seed)
+    recorder = LatencyRecorder()
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    for agent_id in sim.agent_ids:
+        recorder.call("register", backend.register, agent_id, sim.resources(agent_id))
+    for kind, arg in sim.events():
+        if kind == "heartbeat":
+            recorder.call(kind, backend.heartbeat, arg, sim.resources(arg))
+        elif kind == "agent_sessions":
+            sim.on_agent_sessions(arg, recorder.call(kind, backend.agent_sessions, arg))
+        elif kind == "progress":
+            updates = sim.updates(arg)
+            if updates:
+                recorder.call(kind, backend.progress, arg, updates)
+        elif kind == "create":
+            sim.on_created(arg, recorder.call(kind, backend.create, sim.rng.choice((1, 1, 2, 4))))
+        elif kind in ("stop", "cleanup"):
+            session_id = sim.session_ids.get(arg)
+            if session_id:
+                recorder.call(kind, getattr(backend, kind), session_id)
+        elif kind == "poll":
+            session_id = sim.random_session()
+            if session_id:
+                recorder.call(kind, backend.poll, session_id)
+        else:
+            recorder.call(kind, getattr(backend, kind))
+    elapsed = time.perf_counter() - started
+    return build_result(name, {"agents": agents, "sessions": sessions, "duration": duration, "seed": seed},
+                        recorder, elapsed, rss_before)
+
+async def _run_http(agents: int, sessions: int, duration: float, seed: int, concurrency: int) -> dict:
+    import aiohttp
+    from fastmcp import Client
+
+    process, base = start_server()
+    sim = Simulation(agents, sessions, duration, seed)
+    recorder = LatencyRecorder()
+    try:
+        async with aiohttp.ClientSession() as http:
+            rss_before = rss_bytes(process.pid)
+
+            async with Client(f"{base}/mcp") as mcp:
+                async def timed(op, coro):
+                    started = time.perf_counter_ns()
+                    result = await coro
+                    recorder.record(op, time.perf_counter_ns() - started)
+                    return result
+
+                async def post(path, payload):
+                    async with http.post(f"{base}{path}", json=payload) as response:
+                        return await response.json()
+
+                async def tool(name, **arguments):
+                    return (await mcp.call_tool(name, arguments)).data
+
+                async def handle(kind, arg):
+                    if kind == "heartbeat":
+                        await timed(kind, post("/heartbeat", {"agent_id": arg, "resources": sim.resources(arg)}))
+                    elif kind == "agent_sessions":
+                        result = await timed(kind, post("/agent_sessions", {"agent_id": arg}))
+                        sim.on_agent_sessions(arg, result.get("sessions", []))
+                    elif kind == "progress":
+                        updates = sim.updates(arg)
+                        if updates:
+                            await timed(kind, post("/session_progress", {"agent_id": arg, "updates": updates}))
+                    elif kind == "create":
+                        text = await timed(kind, tool("start_hybrid_fuzzing", target_binary="/bench/target",
+                                                      input_dir="/bench/in", instances=sim.rng.choice((1, 1, 2, 4))))
+                        match = SESSION_ID_RE.search(text)
+                        sim.on_created(arg, match.group(1) if match else None)
+                    elif kind in ("stop", "cleanup"):
+                        session_id = sim.session_ids.get(arg)
+                        if session_id:
+                            name = "stop_hybrid_fuzzing" if kind == "stop" else "cleanup_fuzzing_session"
+                            await timed(kind, tool(name, session_id=session_id))
+                    elif kind == "poll":
+                        session_id = sim.random_session()
+                        if session_id:
+                            await timed(kind, tool("get_hybrid_fuzzing_status", session_id=session_id))
+                    elif kind == "list":
+                        await timed(kind, tool("list_fuzzing_sessions", status="running"))
+                    else:
+                        await timed(kind, tool("get_system_status"))
+
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    timed("register", post("/register_agent", {"agent_id": agent_id, "platform": "linux",
+                                                               "resources": sim.resources(agent_id)}))
+                    for agent_id in sim.agent_ids
+                ))
+                # 가상 시간 순서대로 내보내되 최대 concurrency개까지 동시에 보낸다
+                in_flight = set()
+                for kind, arg in sim.events():
+                    if len(in_flight) >= concurrency:
+                        _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    in_flight.add(asyncio.ensure_future(handle(kind, arg)))
+                if in_flight:
+                    await asyncio.gather(*in_flight)
+                elapsed = time.perf_counter() - started
+            params = {"agents": agents, "sessions": sessions, "duration": duration, "seed": seed, "concurrency": concurrency}
+            return build_result("http", params, recorder, elapsed, rss_before, pid=process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="하이브리드 퍼징 서버 부하 벤치마크")
+    parser.add_argument("scenario", choices=("manager", "tools", "http", "all"), nargs="?", default="manager")
+    parser.add_argument("--agents", type=int, help="에이전트 수 (기본값은 시나리오별 PRESETS)")
+    parser.add_argument("--sessions", type=int, help="세션 수")
+    parser.add_argument("--duration", type=float, help="재생할 가상 시간(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32, help="http 시나리오의 동시 요청 수")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.scenario == "all":
+        # 시나리오마다 새 프로세스에서 실행해 앞 시나리오가 남긴 메모리가 RSS 측정에 섞이지 않게 한다
+        results = []
+        for name in PRESETS:
+            with tempfile.NamedTemporaryFile(suffix=".json") as output:
+                command = [sys.executable, os.path.abspath(__file__), name, "--seed", str(args.seed),
+                           "--concurrency", str(args.concurrency), "--json", output.name]
+                for option in ("agents", "sessions", "duration"):
+                    if getattr(args, option):
+                        command += [f"--{option}", str(getattr(args, option))]
+                subprocess.run(command, check=True)
+                with open(output.name) as f:
+                    results.extend(json.load(f))
+        return finish(args, results)
+
+    preset = PRESETS[args.scenario]
+    agents = args.agents or preset["agents"]
+    sessions = args.sessions or preset["sessions"]
+    duration = float(args.duration or preset["duration"])
+    if args.scenario == "http":
+        result = asyncio.run(_run_http(agents, sessions, duration, args.seed, args.concurrency))
+    else:
+        backend = ManagerBackend() if args.scenario == "manager" else ToolBackend()
+        result = run_sync(args.scenario, backend, agents, sessions, duration, args.seed)
+    print_report(result)
+    return finish(args, [result])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""세션 레코드 메모리 벤치마크.
+
+세션 N개(기본 100,000개)를 이전 dict 레이아웃(ISO-8601 문자열 시각, 필드별 int/float 객체를 담은 진행 상황 dict)과
+SessionRecord 레이아웃(slots, 단조 시계 밀리초 정수, 상태 enum, array('d') 진행 상황)으로 각각 만들어
+tracemalloc으로 세션당 바이트를 잽니다. 두 레이아웃 모두 에이전트가 보낸 것처럼 진행 상황을 한 번 반영한 상태입니다.
+매니저 전체(색인, 카운터, 메트릭 포함)의 세션당 바이트와, 진행 상황 이력(ProgressHistory) 하나의 크기도 함께 보여 줍니다.
+
+사용 예:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sessions 20000 --json memory.json
+"""
+import argparse
+import gc
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from harness import rss_bytes
+
+import afl_plus_plus_server as server
+
+AGENTS = 100
+TARGETS = 20
+
+def progress_report(rng: random.Random) -> dict:
+    """에이전트가 JSON으로 보내는 것과 같은 진행 상황 (큰 정수와 실수가 새 객체로 만들어짐)."""
+    return json.loads(json.dumps({
+        "execs_done": rng.randrange(10**6, 10**10),
+        "execs_per_sec": round(rng.uniform(100, 5000), 2),
+        "paths_total": rng.randrange(100, 20000),
+        "paths_found": rng.randrange(100, 20000),
+        "crashes": rng.randrange(0, 500),
+        "hangs": rng.randrange(0, 50),
+        "instances": rng.choice((1, 2, 4, 8))
+    }))
+
+def request_strings(number: int) -> tuple:
+    """도구 호출 인자처럼 세션마다 새로 만들어지는 (에이전트 ID, 타겟, 입력, 출력) 문자열."""
+    return (f"agent-{number % AGENTS:04d}", f"/targets/target-{number % TARGETS:02d}",
+            f"/fuzz/in/target-{number % TARGETS:02d}", f"afl_output_{1760000000 + number}")
+
+def legacy_session(number: int, rng: random.Random) -> dict:
+    """SessionRecord 이전의 세션 dict 레이아웃."""
+    agent_id, target, input_dir, output_dir = request_strings(number)
+    session = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "agent_id": agent_id,
+        "target_binary": target,
+        "input_dir": input_dir,
+        "output_dir": output_dir,
+        "instances": 1,
+        "corpus": target.rsplit("/", 1)[-1],
+        "minimize": False,
+        "reminimize_interval": 0,
+        "status": "created",
+        "created_at": datetime.now().isoformat(),
+        "progress": {field: 0 for field in server.PROGRESS_FIELDS}
+    }
+    session["status"] = json.loads('"running"')
+    session["progress"].update(progress_report(rng))
+    session["updated_at"] = datetime.now().isoformat()
+    return session
+
+def record_session(number: int, rng: random.Random) -> server.SessionRecord:
+    agent_id, target, input_dir, output_dir = request_strings(number)
+    session = server.SessionRecord(str(uuid.UUID(int=rng.getrandbits(128))), agent_id, target, input_dir, output_dir,
+                                   corpus=target.rsplit("/", 1)[-1])
+    session.status = server.SessionStatus(json.loads('"running"'))
+    session.progress.update(progress_report(rng))
+    session.updated_at = server.now_ms()
+    return session
+
+def measure(build) -> int:
+    """build()가 만든 객체가 살아 있는 동안 늘어난 할당 바이트(tracemalloc)를 반환합니다."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    gc.collect()
+    return after - before
+
+def build_manager(sessions: int, seed: int) -> server.HybridFuzzingManager:
+    """세션 N개를 가진 매니저를 만듭니다. 이력이 생기지 않도록 진행 상황은 레코드에 직접 반영합니다."""
+    rng = random.Random(seed)
+    manager = server.HybridFuzzingManager()
+    for number in range(AGENTS):
+        manager.register_agent(f"agent-{number:04d}", {"platform": "linux", "resources": {"free_cores": 64}})
+    for number in range(sessions):
+        agent_id, target, input_dir, output_dir = request_strings(number)
+        session_id = manager.create_session(agent_id, target, input_dir, output_dir, corpus=target.rsplit("/", 1)[-1])
+        manager.sessions[session_id].progress.update(progress_report(rng))
+        manager.update_session_status(session_id, "running")
+    return manager
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="세션 레코드 메모리 벤치마크")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="결과를 이 파일에 JSON으로 저장")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    server.logger.setLevel(logging.WARNING)
+
+    count = args.sessions
+    rows = []
+    for name, factory in (("dict", legacy_session), ("record", record_session)):
+        rng = random.Random(args.seed)
+        total = measure(lambda: {session_id: session for session_id, session in
+                                 ((s["id"] if isinstance(s, dict) else s.id, s)
+                                  for s in (factory(number, rng) for number in range(count)))})
+        rows.append({"layout": name, "sessions": count, "bytes": total, "bytes_per_session": round(total / count, 1)})
+    started = time.perf_counter()
+    total = measure(lambda: build_manager(count, args.seed))
+    rows.append({"layout": "manager", "sessions": count, "bytes": total, "bytes_per_session": round(total / count, 1),
+                 "build_sec": round(time.perf_counter() - started, 2)})
+    history = measure(lambda: [server.ProgressHistory()])
+    rows.append({"layout": "progress_history", "sessions": 1, "bytes": history, "bytes_per_session": history})
+
+    print(f"\n🧮 세션 {count:,}개 메모리 (프로세스 RSS {rss_bytes() / 2**20:.0f} MiB)")
+    print(f"   {'레이아웃':<18} {'세션당(B)':>10} {'합계(MiB)':>10}")
+    for row in rows:
+        print(f"   {row['layout']:<18} {row['bytes_per_session']:>10,.0f} {row['bytes'] / 2**20:>10.1f}")
+    dict_row, record_row = rows[0], rows[1]
+    print(f"\n   • record/dict: {record_row['bytes'] / dict_row['bytes']:.2f} "
+          f"(세션당 {dict_row['bytes_per_session'] - record_row['bytes_per_session']:,.0f}바이트 절약)")
+    print("   • manager는 레코드에 색인/카운터/메트릭을 더한 값이며, 진행 상황을 보고한 세션은 progress_history가 추가됩니다")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
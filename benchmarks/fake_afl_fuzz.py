@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""afl-fuzz 대신 실행하는 결정적 시뮬레이터.
+
+에이전트 입장에서 afl-fuzz와 똑같이 보이도록 afl-fuzz의 명령행 옵션을 받고,
+출력 디렉토리에 fuzzer_stats, plot_data, queue/, crashes/, hangs/를 AFL++와 같은 형식으로 씁니다.
+타겟은 실행하지 않으며, 새 경로/크래시/행은 시드로 정해지는 난수로 만들어지므로
+같은 시드와 같은 실행 시간(-V 또는 -E)이면 같은 파일이 만들어집니다 (시각 필드 제외).
+
+    AFL_FUZZ=benchmarks/fake_afl_fuzz.py python local_agent.py --server-url ...
+    benchmarks/fake_afl_fuzz.py -i seeds -o out -S fake1 -s 7 -V 30 -- ./target @@
+
+속도와 발견 빈도는 환경 변수로 조절합니다:
+    FAKE_AFL_EXECS_PER_SEC   초당 실행 수 (기본 2000)
+    FAKE_AFL_PATH_RATE       초당 새 queue 항목 수 (기본 0.5)
+    FAKE_AFL_CRASH_RATE      초당 새 크래시 수 (기본 0.02)
+    FAKE_AFL_HANG_RATE       초당 새 행 수 (기본 0.005)
+    FAKE_AFL_SPEEDUP         실제 1초에 시뮬레이션할 시간 (기본 1, 10~100이면 10~100배 부하)
+    FAKE_AFL_STATS_INTERVAL  fuzzer_stats를 다시 쓰는 주기, 실제 초 (기본 1)
+    FAKE_AFL_CRASH_KINDS     서로 다른 크래시 내용 종류 수 (기본 8, 같은 종류는 같은 접두어를 가짐)
+    FAKE_AFL_CUR_INPUT_WRITES  fuzzer_stats 주기마다 .cur_input을 다시 쓰는 횟수 (기본 100, AFL_TMPDIR이 있으면 그 아래)
+    FAKE_AFL_SCHEDULE_RATES  파워 스케줄(-p)별 새 queue 항목 빈도 배수 (예: "rare=4,seek=0.5", 나머지는 1)
+"""
+import getopt
+import os
+import random
+import signal
+import sys
+import time
+import zlib
+
+# afl-fuzz(AFL++ 4.x)의 getopt 문자열
+AFL_GETOPT = "+Ab:B:c:CdDe:E:hi:I:f:F:g:G:l:L:m:M:nNOo:p:P:QRs:S:t:T:UV:WXx:YzZ"
+VERSION = "4.21c"
+MAP_SIZE = 65536
+PLOT_INTERVAL = 5.0  # plot_data 줄을 추가하는 주기 (시뮬레이션 초)
+MAX_ENTRY_SIZE = 4096
+
+USAGE = f"""afl-fuzz++{VERSION} (simulator) based on afl by Michal Zalewski and a large online community
+
+{os.path.basename(sys.argv[0])} [ options ] -- /path/to/fuzzed_app [ ... ]
+
+Required parameters:
+  -i dir        - input directory with test cases
+  -o dir        - output directory for fuzzer findings
+
+Execution control settings:
+  -s seed       - use a fixed seed for the RNG
+  -V seconds    - fuzz for a specified time then terminate
+  -E execs      - fuzz for an approx. no. of total executions then terminate
+
+Other stuff:
+  -M/-S id      - distributed mode
+"""
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def poisson(rng, mean):
+    """평균 mean인 포아송 난수 (작은 평균용 곱셈법, 큰 평균은 정규 근사)."""
+    if mean <= 0:
+        return 0
+    if mean > 30:
+        return max(0, int(rng.gauss(mean, mean ** 0.5) + 0.5))
+    limit, count, product = pow(2.718281828459045, -mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+class FakeFuzzer:
+    def __init__(self, opts, target_args):
+        self.input_dir = opts["-i"]
+        self.role, self.name = ("-M", opts["-M"]) if "-M" in opts else (("-S", opts["-S"]) if "-S" in opts else (None, "default"))
+        self.out_dir = os.path.join(opts["-o"], self.name)
+        seed = int(opts.get("-s", os.environ.get("FAKE_AFL_SEED", "0")))
+        # 인스턴스마다 다른 결과가 나오도록 이름을 섞되, 같은 시드/이름이면 항상 같은 순서
+        self.rng = random.Random(seed * 1000003 + zlib.crc32(self.name.encode()))
+        self.max_seconds = float(opts["-V"]) if "-V" in opts else None
+        self.max_execs = int(opts["-E"]) if "-E" in opts else None
+        self.command_line = " ".join(sys.argv)
+        self.target_args = target_args
+        self.execs_per_sec = env_float("FAKE_AFL_EXECS_PER_SEC", 2000)
+        self.path_rate = env_float("FAKE_AFL_PATH_RATE", 0.5)
+        self.schedule = opts.get("-p", "fast")
+        for item in os.environ.get("FAKE_AFL_SCHEDULE_RATES", "").split(","):
+            schedule, _, factor = item.partition("=")
+            if schedule.strip() == self.schedule and factor:
+                self.path_rate *= float(factor)
+        self.crash_rate = env_float("FAKE_AFL_CRASH_RATE", 0.02)
+        self.hang_rate = env_float("FAKE_AFL_HANG_RATE", 0.005)
+        self.speedup = max(env_float("FAKE_AFL_SPEEDUP", 1), 0.001)
+        self.stats_interval = max(env_float("FAKE_AFL_STATS_INTERVAL", 1), 0.01)
+        self.crash_kinds = max(1, int(env_float("FAKE_AFL_CRASH_KINDS", 8)))
+        self.cur_input_writes = int(env_float("FAKE_AFL_CUR_INPUT_WRITES", 100))
+        self.cur_input = os.path.join(os.environ.get("AFL_TMPDIR") or self.out_dir, ".cur_input")
+        self.queue = []  # (이름, 내용)
+        self.crashes = 0
+        self.hangs = 0
+        self.execs = 0
+        self.sim_time = 0.0  # 시뮬레이션 경과 시간 (초)
+        self.last_find = self.last_crash = self.last_hang = 0
+        self.last_plot = -PLOT_INTERVAL
+        self.cycles = 0
+        self.edges = 0
+        self.start_time = int(time.time())
+        self.stopping = False
+
+    def _prepare(self):
+        for sub in ("queue", "crashes", "hangs"):
+            os.makedirs(os.path.join(self.out_dir, sub), exist_ok=True)
+        queue_dir = os.path.join(self.out_dir, "queue")
+        existing = sorted(name for name in os.listdir(queue_dir) if name.startswith("id:"))
+        if existing:
+            # AFL_AUTORESUME처럼 이어서 번호를 매긴다
+            for name in existing:
+                with open(os.path.join(queue_dir, name), "rb") as f:
+                    self.queue.append((name, f.read()))
+            self.crashes = sum(1 for name in os.listdir(os.path.join(self.out_dir, "crashes")) if name.startswith("id:"))
+            self.hangs = sum(1 for name in os.listdir(os.path.join(self.out_dir, "hangs")) if name.startswith("id:"))
+        else:
+            seeds = sorted(entry.name for entry in os.scandir(self.input_dir) if entry.is_file() and not entry.name.startswith("."))
+            if not seeds:
+                raise SystemExit(f"[-] PROGRAM ABORT : No usable test cases in '{self.input_dir}'")
+            for number, seed in enumerate(seeds):
+                with open(os.path.join(self.input_dir, seed), "rb") as f:
+                    data = f.read()[:MAX_ENTRY_SIZE]
+                self._write("queue", f"id:{number:06d},time:0,execs:0,orig:{seed}", data)
+        self.edges = 32 * len(self.queue)
+        with open(os.path.join(self.out_dir, "plot_data"), "a") as f:
+            if f.tell() == 0:
+                f.write("# relative_time, cycles_done, cur_item, corpus_count, pending_total, pending_favs, "
+                        "map_size, saved_crashes, saved_hangs, max_depth, execs_per_sec, total_execs, edges_found\n")
+
+    def _write(self, sub, name, data):
+        with open(os.path.join(self.out_dir, sub, name), "wb") as f:
+            f.write(data)
+        if sub == "queue":
+            self.queue.append((name, data))
+
+    def _mutate(self, data):
+        rng = self.rng
+        data = bytearray(data or b"\0")
+        for _ in range(rng.randint(1, 8)):
+            op = rng.random()
+            position = rng.randrange(len(data))
+            if op < 0.5:
+                data[position] ^= 1 << rng.randrange(8)
+            elif op < 0.8 and len(data) < MAX_ENTRY_SIZE:
+                data[position:position] = bytes(rng.randrange(256) for _ in range(rng.randint(1, 16)))
+            elif len(data) > 1:
+                del data[position]
+        return bytes(data[:MAX_ENTRY_SIZE])
+
+    def _step(self, seconds):
+        """시뮬레이션 시간 seconds초만큼 퍼징을 진행합니다."""
+        rng = self.rng
+        self.sim_time += seconds
+        rate = self.execs_per_sec * rng.uniform(0.9, 1.1)
+        self.execs += int(rate * seconds)
+        elapsed_ms = int(self.sim_time * 1000)
+        for _ in range(poisson(rng, self.path_rate * seconds)):
+            number = len(self.queue)
+            parent = rng.randrange(number)
+            self.edges = min(MAP_SIZE, self.edges + rng.randint(1, 12))
+            self._write("queue", f"id:{number:06d},src:{parent:06d},time:{elapsed_ms},execs:{self.execs},op:havoc,rep:{rng.choice((2, 4, 8))},+cov",
+                        self._mutate(self.queue[parent][1]))
+            self.last_find = elapsed_ms
+        for _ in range(poisson(rng, self.crash_rate * seconds)):
+            if self.crashes == 0:
+                with open(os.path.join(self.out_dir, "crashes", "README.txt"), "w") as f:
+                    f.write(f"Command line used to find this crash:\n\n{self.command_line}\n")
+            parent = rng.randrange(len(self.queue))
+            kind = rng.randrange(self.crash_kinds)
+            data = b"CRASH%02d:" % kind + self._mutate(self.queue[parent][1])
+            self._write("crashes", f"id:{self.crashes:06d},sig:{rng.choice((6, 11))},src:{parent:06d},time:{elapsed_ms},"
+                        f"execs:{self.execs},op:havoc,rep:{rng.choice((2, 4, 8, 16))}", data)
+            self.crashes += 1
+            self.last_crash = elapsed_ms
+        for _ in range(poisson(rng, self.hang_rate * seconds)):
+            parent = rng.randrange(len(self.queue))
+            self._write("hangs", f"id:{self.hangs:06d},src:{parent:06d},time:{elapsed_ms},execs:{self.execs},op:havoc,rep:2",
+                        self._mutate(self.queue[parent][1]))
+            self.hangs += 1
+            self.last_hang = elapsed_ms
+        if rng.random() < seconds / 600:
+            self.cycles += 1
+        self.current_rate = rate
+        # afl-fuzz는 실행마다 테스트 케이스를 .cur_input에 쓴다 (난수는 쓰지 않아 결과에 영향 없음)
+        data = self.queue[-1][1]
+        with open(self.cur_input, "wb") as f:
+            for _ in range(self.cur_input_writes):
+                f.seek(0)
+                f.write(data)
+                f.truncate()
+
+    def _write_stats(self):
+        now = int(time.time())
+        found = sum(1 for name, _ in self.queue if ",orig:" not in name)
+        pending = max(0, len(self.queue) - self.cycles * len(self.queue) // 4)
+        stats = [
+            ("start_time", self.start_time),
+            ("last_update", now),
+            ("run_time", int(self.sim_time)),
+            ("fuzzer_pid", os.getpid()),
+            ("cycles_done", self.cycles),
+            ("cycles_wo_finds", 0),
+            ("time_wo_finds", max(0, int(self.sim_time) - self.last_find // 1000)),
+            ("fuzz_time", int(self.sim_time)),
+            ("calibration_time", 0),
+            ("cmplog_time", 0),
+            ("sync_time", 0),
+            ("trim_time", 0),
+            ("execs_done", self.execs),
+            ("execs_per_sec", f"{self.current_rate:.2f}"),
+            ("execs_ps_last_min", f"{self.current_rate:.2f}"),
+            ("corpus_count", len(self.queue)),
+            ("corpus_favored", max(1, len(self.queue) // 8)),
+            ("corpus_found", found),
+            ("corpus_imported", 0),
+            ("corpus_variable", 0),
+            ("max_depth", 1 + found // 16),
+            ("cur_item", self.execs % len(self.queue)),
+            ("pending_favs", min(pending, max(1, len(self.queue) // 8))),
+            ("pending_total", pending),
+            ("stability", "100.00%"),
+            ("bitmap_cvg", f"{100 * self.edges / MAP_SIZE:.2f}%"),
+            ("saved_crashes", self.crashes),
+            ("saved_hangs", self.hangs),
+            ("last_find", self.last_find // 1000),
+            ("last_crash", self.last_crash // 1000),
+            ("last_hang", self.last_hang // 1000),
+            ("execs_since_crash", 0),
+            ("exec_timeout", 20),
+            ("slowest_exec_ms", 0),
+            ("peak_rss_mb", 0),
+            ("cpu_affinity", -1),
+            ("edges_found", self.edges),
+            ("total_edges", MAP_SIZE),
+            ("var_byte_count", 0),
+            ("havoc_expansion", 0),
+            ("auto_dict_entries", 0),
+            ("testcache_size", sum(len(data) for _, data in self.queue)),
+            ("testcache_count", len(self.queue)),
+            ("testcache_evict", 0),
+            ("afl_banner", os.path.basename(self.target_args[0]) if self.target_args else ""),
+            ("afl_version", f"++{VERSION}"),
+            ("target_mode", "shmem_testcase default"),
+            ("command_line", self.command_line)
+        ]
+        # afl-fuzz처럼 제자리에 다시 쓴다 (에이전트는 IN_CLOSE_WRITE로 감지)
+        with open(os.path.join(self.out_dir, "fuzzer_stats"), "w") as f:
+            f.writelines(f"{key:<18}: {value}\n" for key, value in stats)
+        if self.sim_time - self.last_plot >= PLOT_INTERVAL:
+            self.last_plot = self.sim_time
+            with open(os.path.join(self.out_dir, "plot_data"), "a") as f:
+                f.write(f"{int(self.sim_time)}, {self.cycles}, 0, {len(self.queue)}, {pending}, 0, {MAP_SIZE}, "
+                        f"{self.crashes}, {self.hangs}, {1 + found // 16}, {self.current_rate:.2f}, {self.execs}, {self.edges}\n")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self._prepare()
+        self.current_rate = self.execs_per_sec
+        print(f"[+] afl-fuzz++{VERSION} simulator: {self.name} ({self.role or 'single'}), "
+              f"{len(self.queue)} seeds, speedup x{self.speedup:g}", flush=True)
+        step = self.stats_interval * self.speedup
+        started = time.monotonic()
+        ticks = 0
+        while not self.stopping:
+            self._step(step)
+            self._write_stats()
+            ticks += 1
+            if self.max_seconds is not None and self.sim_time >= self.max_seconds * self.speedup:
+                break
+            if self.max_execs is not None and self.execs >= self.max_execs:
+                break
+            delay = started + ticks * self.stats_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        print(f"[+] We're done here. execs={self.execs} corpus={len(self.queue)} crashes={self.crashes} hangs={self.hangs}", flush=True)
+        return 0
+
+def main(argv):
+    if argv[:1] in (["--help"], ["-help"]):
+        print(USAGE)
+        return 0
+    try:
+        opts, args = getopt.getopt(argv, AFL_GETOPT.lstrip("+"))
+    except getopt.GetoptError as e:
+        print(f"[-] PROGRAM ABORT : {e}", file=sys.stderr)
+        return 1
+    opts = dict(opts)
+    if "-h" in opts:
+        print(USAGE)
+        return 0
+    if "-i" not in opts or "-o" not in opts or not args:
+        print(USAGE)
+        return 1
+    return FakeFuzzer(opts, args).run()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
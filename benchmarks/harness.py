@@ -0,0 +1,230 @@
+"""벤치마크 공통 도구: 연산별 지연 기록, 백분위, RSS 측정, 기준선 저장/비교.
+
+벤치마크 스크립트는 저장소 루트의 afl_plus_plus_server를 가져오므로 이 모듈을 먼저 import합니다.
+"""
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_TOLERANCE = 0.3  # 기준선보다 이 비율 이상 나빠지면 회귀로 봅니다
+P99_NOISE_FLOOR_US = 50.0  # p99 증가가 이보다 작으면 측정 잡음으로 보고 무시합니다
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def rss_bytes(pid: int = None) -> int:
+    """프로세스(기본은 현재 프로세스)의 RSS(바이트)를 반환합니다."""
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def peak_rss_bytes(pid: int = None) -> int:
+    """프로세스가 지금까지 쓴 최대 RSS(바이트)를 반환합니다. 알 수 없으면 0입니다."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is not None:
+        return 0
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def cpu_seconds(pid: int = None) -> float:
+    """프로세스(기본은 현재 프로세스)가 쓴 user+system CPU 시간(초)을 반환합니다."""
+    if psutil is not None:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    if pid is None:
+        times = os.times()
+        return times.user + times.system
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+SERVER_BOOT = ("import sys, uvicorn, afl_plus_plus_server as s; "
+               "uvicorn.run(s.app.http_app(), host='127.0.0.1', port=int(sys.argv[1]), log_level='warning')")
+
+def start_server(env: dict = None, timeout: float = 15.0):
+    """상태 저장소와 세션 보관소 없이 서버를 별도 프로세스로 띄우고 (프로세스, 기본 URL)을 반환합니다."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, "-c", SERVER_BOOT, str(port)], cwd=ROOT,
+                               env=dict(os.environ, AFL_MCP_STATE_DB="", AFL_MCP_ARCHIVE_DIR="", PYTHONPATH=ROOT,
+                                        **(env or {})),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/metrics", timeout=1) as response:
+                if response.status == 200:
+                    return process, base
+        except OSError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    process.kill()
+    process.wait()
+    raise RuntimeError("벤치마크 서버가 시작되지 않았습니다")
+
+def percentile(sorted_values: List[int], q: float) -> int:
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class LatencyRecorder:
+    """연산 이름별 지연(나노초)을 모아 처리량과 백분위를 계산합니다."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[int]] = {}
+
+    def record(self, op: str, elapsed_ns: int):
+        samples = self.samples.get(op)
+        if samples is None:
+            samples = self.samples[op] = []
+        samples.append(elapsed_ns)
+
+    def call(self, op: str, func, *args, **kwargs):
+        """func를 실행하고 걸린 시간을 op에 기록합니다."""
+        started = time.perf_counter_ns()
+        result = func(*args, **kwargs)
+        self.record(op, time.perf_counter_ns() - started)
+        return result
+
+    def summary(self) -> Dict[str, dict]:
+        result = {}
+        for op, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            result[op] = {
+                "count": len(samples),
+                "p50_us": round(percentile(samples, 50) / 1000, 2),
+                "p99_us": round(percentile(samples, 99) / 1000, 2),
+                "max_us": round(samples[-1] / 1000, 2)
+            }
+        return result
+
+def build_result(name: str, params: dict, recorder: LatencyRecorder, elapsed: float, rss_before: int,
+                 pid: int = None) -> dict:
+    """실행 결과를 만듭니다. pid를 주면 그 프로세스(예: 별도로 띄운 서버)의 메모리를 잽니다."""
+    ops = recorder.summary()
+    rss = rss_bytes(pid)
+    total = sum(op["count"] for op in ops.values())
+    return {
+        "name": name,
+        "params": params,
+        "elapsed_sec": round(elapsed, 3),
+        "total_ops": total,
+        "ops_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "rss_mb": round(rss / 2**20, 1),
+        "rss_growth_mb": round((rss - rss_before) / 2**20, 1),
+        "peak_rss_mb": round(peak_rss_bytes(pid) / 2**20, 1),
+        "ops": ops
+    }
+
+def baseline_key(result: dict) -> str:
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+def print_report(result: dict):
+    print(f"\n📊 {result['name']} {result['params']}")
+    print(f"   • 총 연산: {result['total_ops']:,}회 / {result['elapsed_sec']}초 → {result['ops_per_sec']:,.1f} ops/s")
+    print(f"   • RSS: {result['rss_mb']} MiB (실행 중 증가 {result['rss_growth_mb']} MiB, 최대 {result['peak_rss_mb']} MiB)")
+    print(f"   {'연산':<20} {'횟수':>9} {'p50(µs)':>10} {'p99(µs)':>10} {'최대(µs)':>11}")
+    for op, stats in result["ops"].items():
+        print(f"   {op:<20} {stats['count']:>9,} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} {stats['max_us']:>11.1f}")
+
+def load_baselines(path: str = BASELINE_PATH) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_baselines(results: List[dict], path: str = BASELINE_PATH):
+    """결과를 기준선 파일에 합쳐 저장합니다. 같은 시나리오/파라미터의 기존 기준선은 덮어씁니다."""
+    baselines = load_baselines(path)
+    for result in results:
+        baselines[baseline_key(result)] = dict(result, machine=f"{platform.machine()} {platform.python_version()} cpus={os.cpu_count()}")
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+def compare(result: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """기준선보다 처리량이 떨어지거나 p99 지연/RSS 증가가 늘어난 항목을 반환합니다."""
+    regressions = []
+    if result["ops_per_sec"] < baseline["ops_per_sec"] * (1 - tolerance):
+        regressions.append(f"처리량 {result['ops_per_sec']:,.1f} < 기준 {baseline['ops_per_sec']:,.1f} ops/s")
+    if result["rss_growth_mb"] > max(baseline["rss_growth_mb"] * (1 + tolerance), baseline["rss_growth_mb"] + 8):
+        regressions.append(f"RSS 증가 {result['rss_growth_mb']} > 기준 {baseline['rss_growth_mb']} MiB")
+    for op, stats in result["ops"].items():
+        base = baseline["ops"].get(op)
+        if base is None:
+            continue
+        if stats["p99_us"] > base["p99_us"] * (1 + tolerance) and stats["p99_us"] - base["p99_us"] > P99_NOISE_FLOOR_US:
+            regressions.append(f"{op} p99 {stats['p99_us']:.1f} > 기준 {base['p99_us']:.1f} µs")
+    return regressions
+
+def add_baseline_arguments(parser):
+    parser.add_argument("--json", help="결과를 이 파일에 JSON으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준선과 비교해 회귀가 있으면 종료 코드 1")
+    parser.add_argument("--update-baseline", action="store_true", help="결과를 기준선으로 저장")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="회귀로 볼 상대 변화량 (기본 0.3)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준선 파일 경로")
+
+def finish(args, results: List[dict]) -> int:
+    """--json/--check/--update-baseline을 처리하고 종료 코드를 반환합니다."""
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.update_baseline:
+        save_baselines(results, args.baseline)
+        print(f"\n💾 기준선 저장됨: {args.baseline}")
+    if not args.check:
+        return 0
+    baselines = load_baselines(args.baseline)
+    failed = False
+    for result in results:
+        key = baseline_key(result)
+        baseline = baselines.get(key)
+        if baseline is None:
+            print(f"\n⚠️ 기준선 없음: {key}")
+            continue
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            failed = True
+            print(f"\n❌ 회귀 발견: {key}")
+            for regression in regressions:
+                print(f"   • {regression}")
+        else:
+            print(f"\n✅ 기준선 이내: {key}")
+    return 1 if failed else 0
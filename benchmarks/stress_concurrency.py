@@ -0,0 +1,309 @@
+"""HybridFuzzingManager 동시성 스트레스 테스트.
+
+FastMCP는 동기 도구를 스레드 풀에서 동시에 실행하므로, 여러 스레드가 같은 매니저에 등록/해제, 세션 생성,
+진행 상황 갱신, 크래시 분류, 중지/정리, 조회를 섞어 호출한 뒤 다음을 확인합니다.
+
+    • 진행 상황 유실 없음: 세션마다 마지막으로 보낸 값이 남아 있음
+    • 크래시 중복/유실 없음: 여러 스레드가 겹쳐 보낸 입력이 한 번씩만 분류되고 샘플 업로드도 한 번씩만 요청됨
+    • 고아 세션 없음: 해제되었거나 끊긴 에이전트에는 세션이 만들어지지 않음
+    • 보관 유실 없음: 끝난 세션은 메모리나 디스크 보관소 중 한 곳에 남고, 메모리의 끝난 세션은 보관 한도 이하
+    • 카운터/색인 일관성: check_consistency()가 비어 있음, 조회 중 예외 없음
+
+그다음 저장소 쓰기가 --io-ms만큼 걸린다고 가정하고 호출자 수를 1, 2, 4, 8, 16으로 늘리며 진행 상황 갱신
+처리량을 잽니다. 저장은 세션 락만 잡고 하므로 서로 다른 세션의 갱신은 겹쳐 실행되어 처리량이 호출자 수에
+따라 늘어나야 합니다 (CPU 작업 자체는 GIL 때문에 한 번에 하나씩 실행됩니다).
+
+사용 예:
+    python benchmarks/stress_concurrency.py
+    python benchmarks/stress_concurrency.py --threads 32 --ops 5000 --io-ms 2 --check
+"""
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from harness import LatencyRecorder, add_baseline_arguments, build_result, finish, print_report, rss_bytes
+
+import afl_plus_plus_server as server
+
+CALLER_COUNTS = (1, 2, 4, 8, 16)
+STABLE_AGENTS = 8
+CRASH_POOL = 500  # 스레드들이 겹쳐 보내는 크래시 입력 수
+RETAINED_SESSIONS = 16  # 불변식 검사에서 메모리에 두는 끝난 세션 수 (넘으면 보관소로 옮겨짐)
+
+class SlowStore:
+    """쓰기마다 io_seconds만큼 기다리는 상태 저장소 대역입니다 (SQLite 쓰기/네트워크 대기 흉내)."""
+
+    def __init__(self, io_seconds: float = 0.0):
+        self.io_seconds = io_seconds
+        self.writes = 0
+
+    def load(self):
+        return [], []
+
+    def _write(self):
+        self.writes += 1
+        if self.io_seconds:
+            time.sleep(self.io_seconds)
+
+    def save_agent(self, agent):
+        pass
+
+    def delete_agent(self, agent_id):
+        pass
+
+    def save_session(self, session):
+        self._write()
+
+    def save_progress(self, session_id, progress):
+        self._write()
+
+    def delete_session(self, session_id):
+        self._write()
+
+def new_manager(io_seconds: float = 0.0, archive_dir: str = None) -> server.HybridFuzzingManager:
+    manager = server.HybridFuzzingManager()
+    manager.archive = server.SessionArchive(archive_dir) if archive_dir else None
+    manager.retention = server.RetentionPolicy(max_sessions=RETAINED_SESSIONS, max_age=0, max_bytes=0)
+    manager.attach_store(SlowStore(io_seconds))
+    server.fuzzing_manager = manager
+    return manager
+
+def resources(cores: int = 64) -> dict:
+    return {"cpu_count": cores, "free_cores": cores, "load_avg": 0.0, "sessions": 0}
+
+def crash(sha_number: int) -> dict:
+    return {"sha256": f"{sha_number:064x}", "kind": "SEGV", "frames": [f"frame_{sha_number % 7}", "main"]}
+
+class Worker(threading.Thread):
+    """무작위로 섞은 매니저 연산을 ops번 실행하고, 검증에 필요한 기록을 남깁니다."""
+
+    def __init__(self, number: int, manager: server.HybridFuzzingManager, sessions: list, ops: int, seed: int,
+                 barrier: threading.Barrier):
+        super().__init__(daemon=True)
+        self.number = number
+        self.manager = manager
+        self.sessions = sessions  # 이 스레드만 진행 상황을 보내는 세션 (에이전트 하나가 세션을 소유하는 것과 같음)
+        self.ops = ops
+        self.rng = random.Random(seed * 1000 + number)
+        self.barrier = barrier
+        self.last_progress = {}  # 세션 ID -> 마지막으로 보낸 execs_done
+        self.uploads = []
+        self.orphans = []
+        self.finished = []  # 정리하지 않고 끝낸 세션 (메모리나 보관소에 남아야 함)
+        self.errors = []
+
+    def run(self):
+        self.barrier.wait()
+        for step in range(self.ops):
+            try:
+                self.step(step)
+            except Exception:
+                self.errors.append(traceback.format_exc())
+
+    def step(self, step: int):
+        manager, rng = self.manager, self.rng
+        choice = rng.random()
+        if choice < 0.45:
+            session_id = rng.choice(self.sessions)
+            execs = self.last_progress.get(session_id, 0) + rng.randint(1, 1000)
+            agent_id = manager.sessions[session_id].agent_id
+            manager.apply_agent_updates(agent_id, {session_id: {"status": "running", "progress": {
+                "execs_done": execs, "execs_per_sec": rng.uniform(100, 5000), "crashes": execs % 13}}})
+            self.last_progress[session_id] = execs
+        elif choice < 0.6:
+            session_id = rng.choice(self.sessions)
+            numbers = rng.sample(range(CRASH_POOL), 5)
+            result = manager.record_crashes(manager.sessions[session_id].agent_id, session_id,
+                                            [crash(number) for number in numbers])
+            self.uploads += [(session_id, sha256) for sha256 in result["upload"]]
+        elif choice < 0.7:
+            # 에이전트 등록 → 세션 생성 → 해제를 다른 스레드의 생성과 겹치게 한다
+            agent_id = f"churn-{self.number}-{step}"
+            manager.register_agent(agent_id, {"platform": "linux", "resources": resources()})
+            unregistered = rng.random() < 0.5
+            if unregistered:
+                manager.unregister_agent(agent_id)
+            session_id = manager.create_session(agent_id, "/stress/target", "/stress/in", "/stress/out")
+            if session_id is not None:
+                if unregistered:
+                    self.orphans.append(session_id)
+                if not manager.update_session_status(session_id, "starting", only_from=("created",)):
+                    self.errors.append(f"새 세션을 시작할 수 없음: {session_id}")
+                manager.update_session_status(session_id, "stopped", only_from=server.ACTIVE_STATUSES)
+                if unregistered or rng.random() < 0.5:
+                    manager.cleanup_session(session_id)
+                else:
+                    self.finished.append(session_id)
+            manager.unregister_agent(agent_id)
+        elif choice < 0.75:
+            agent_id = f"stable-{rng.randrange(STABLE_AGENTS)}"
+            manager.expire_stale_agents()
+            manager.record_heartbeat(agent_id, resources())
+        elif choice < 0.85:
+            manager.query_sessions(status=rng.choice((None, "running", "stopped")),
+                                   sort=rng.choice(("newest", "execs_per_sec", "updated")), limit=20)
+            manager.get_agent_sessions(f"stable-{rng.randrange(STABLE_AGENTS)}")
+        elif choice < 0.92:
+            manager.render_metrics()
+            self.check_tool(server.list_available_agents(limit=50))
+        else:
+            session_id = rng.choice(self.sessions)
+            self.check_tool(server.list_crash_buckets(session_id))
+            self.check_tool(server.get_hybrid_fuzzing_status(session_id))
+            self.check_tool(server.get_system_status())
+
+    def check_tool(self, text: str):
+        if text.startswith("❌"):
+            self.errors.append(text)
+
+def run_invariants(threads: int, ops: int, seed: int) -> list:
+    """여러 스레드로 연산을 섞어 실행하고, 어긋난 불변식을 설명하는 문자열 목록을 반환합니다."""
+    with tempfile.TemporaryDirectory(prefix="stress-archive-") as archive_dir:
+        return check_invariants(new_manager(archive_dir=archive_dir), threads, ops, seed)
+
+def check_invariants(manager: server.HybridFuzzingManager, threads: int, ops: int, seed: int) -> list:
+    for number in range(STABLE_AGENTS):
+        manager.register_agent(f"stable-{number}", {"platform": "linux", "resources": resources()})
+    owned = [[] for _ in range(threads)]
+    for number in range(threads * 4):
+        agent_id = f"stable-{number % STABLE_AGENTS}"
+        session_id = manager.create_session(agent_id, "/stress/target", "/stress/in", "/stress/out")
+        manager.update_session_status(session_id, "running")
+        owned[number % threads].append(session_id)
+
+    barrier = threading.Barrier(threads)
+    workers = [Worker(number, manager, owned[number], ops, seed, barrier) for number in range(threads)]
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+
+    problems = []
+    for worker in workers:
+        problems += [f"스레드 {worker.number} 예외:\n{error}" for error in worker.errors[:3]]
+        for session_id, execs in worker.last_progress.items():
+            actual = manager.sessions[session_id].progress["execs_done"]
+            if actual != execs:
+                problems.append(f"진행 상황 유실: {session_id} execs_done {actual} != 마지막으로 보낸 {execs}")
+    uploads = [upload for worker in workers for upload in worker.uploads]
+    if len(uploads) != len(set(uploads)):
+        problems.append(f"같은 크래시 샘플 업로드를 {len(uploads) - len(set(uploads))}번 중복 요청")
+    for session_id in (session_id for sessions in owned for session_id in sessions):
+        seen = manager.crash_hashes.get(session_id, set())
+        classified = sum(bucket["count"] for bucket in manager.crash_bucket_list(session_id))
+        if classified != len(seen):
+            problems.append(f"크래시 분류 불일치: {session_id} 버킷 합계 {classified} != 입력 {len(seen)}")
+    orphans = [session_id for worker in workers for session_id in worker.orphans]
+    if orphans:
+        problems.append(f"해제된 에이전트에 세션이 생성됨: {len(orphans)}개")
+    if any(agent_id.startswith("churn-") for agent_id in manager.agents):
+        problems.append("해제되지 않은 churn 에이전트가 남음")
+    manager.wait_for_retention()  # 백그라운드 보관 스레드가 끝난 뒤 남은 분량을 직접 옮긴다
+    while manager.enforce_retention():
+        pass
+    finished = [session_id for worker in workers for session_id in worker.finished]
+    lost = [session_id for session_id in finished
+            if session_id not in manager.sessions and manager.archived_session(session_id) is None]
+    if lost:
+        problems.append(f"끝난 세션이 메모리와 보관소 어디에도 없음: {len(lost)}개")
+    if len(manager.retention) > RETAINED_SESSIONS:
+        problems.append(f"메모리의 끝난 세션 {len(manager.retention)}개 > 보관 한도 {RETAINED_SESSIONS}")
+    archived = manager.archive.count()
+    problems += manager.check_consistency()
+    total = sum(worker.ops for worker in workers)
+    print(f"🧵 불변식 검사: 스레드 {threads}개 × {ops:,}회 = {total:,}회 / {elapsed:.2f}초 "
+          f"({total / elapsed:,.0f} ops/s), 세션 {len(manager.sessions)}개, 보관 {archived}개")
+    return problems
+
+def run_scaling(callers: int, seconds: float, io_seconds: float, seed: int) -> dict:
+    """callers개 스레드가 각자의 세션에 진행 상황을 보내며 seconds 동안의 처리량과 지연을 잽니다."""
+    manager = new_manager(io_seconds)
+    for number in range(STABLE_AGENTS):
+        manager.register_agent(f"stable-{number}", {"platform": "linux", "resources": resources()})
+    owned = []
+    for number in range(callers):
+        sessions = []
+        for _ in range(4):
+            session_id = manager.create_session(f"stable-{number % STABLE_AGENTS}", "/stress/target",
+                                                "/stress/in", "/stress/out")
+            manager.update_session_status(session_id, "running")
+            sessions.append(session_id)
+        owned.append(sessions)
+
+    recorders = [LatencyRecorder() for _ in range(callers)]
+    barrier = threading.Barrier(callers + 1)
+    deadline = [0.0]
+
+    def caller(number: int):
+        rng = random.Random(seed * 1000 + number)
+        recorder, sessions = recorders[number], owned[number]
+        execs = 0
+        barrier.wait()
+        while time.monotonic() < deadline[0]:
+            session_id = rng.choice(sessions)
+            execs += rng.randint(1, 1000)
+            recorder.call("progress", manager.update_session_status, session_id, None,
+                          {"execs_done": execs, "execs_per_sec": rng.uniform(100, 5000)})
+            if rng.random() < 0.1:
+                recorder.call("query", manager.query_sessions, status="running", sort="execs_per_sec", limit=20)
+
+    threads = [threading.Thread(target=caller, args=(number,), daemon=True) for number in range(callers)]
+    for thread in threads:
+        thread.start()
+    rss_before = rss_bytes()
+    deadline[0] = time.monotonic() + seconds
+    started = time.monotonic()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    merged = LatencyRecorder()
+    for recorder in recorders:
+        for op, samples in recorder.samples.items():
+            merged.samples.setdefault(op, []).extend(samples)
+    params = {"callers": callers, "io_ms": round(io_seconds * 1000, 3), "seconds": seconds}
+    return build_result("concurrency", params, merged, elapsed, rss_before)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="HybridFuzzingManager 동시성 스트레스 테스트")
+    parser.add_argument("--threads", type=int, default=16, help="불변식 검사 스레드 수")
+    parser.add_argument("--ops", type=int, default=2000, help="스레드당 연산 수")
+    parser.add_argument("--io-ms", type=float, default=1.0, help="처리량 측정 시 저장소 쓰기 한 번에 걸리는 시간 (밀리초)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="호출자 수마다 처리량을 재는 시간 (초)")
+    parser.add_argument("--seed", type=int, default=1)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    server.logger.setLevel(logging.ERROR)  # 연결 끊긴 에이전트에 대한 세션 생성 거부 경고는 예상된 결과
+    # 짧은 임계 구역에서 스레드 전환이 자주 일어나도록 해 경쟁 상태를 드러낸다
+    sys.setswitchinterval(1e-5)
+
+    problems = run_invariants(args.threads, args.ops, args.seed)
+    sys.setswitchinterval(0.005)
+    if problems:
+        print(f"❌ 불변식 위반 {len(problems)}건")
+        for problem in problems[:20]:
+            print(f"   • {problem}")
+        return 1
+    print("✅ 진행 상황/크래시 유실 없음, 고아 세션 없음, 카운터 일치")
+
+    results = [run_scaling(callers, args.seconds, args.io_ms / 1000, args.seed) for callers in CALLER_COUNTS]
+    for result in results:
+        print_report(result)
+    single = results[0]["ops_per_sec"] or 1
+    print("\n📈 호출자 수별 처리량")
+    for result in results:
+        print(f"   • {result['params']['callers']:>2}개: {result['ops_per_sec']:>10,.1f} ops/s "
+              f"(×{result['ops_per_sec'] / single:.2f})")
+    return finish(args, results)
+
+if __name__ == "__main__":
+    sys.exit(main())